@@ -38,6 +38,8 @@ __docformat__ = 'restructuredtext'
 
 __all__ = ["Constraint"]
 
+from fipy.tools import numerix
+
 class Constraint(object):
     def __init__(self, value, where=None):
         """Object to hold a `Variable` to `value` at `where`
@@ -49,3 +51,51 @@ class Constraint(object):
 
     def __repr__(self):
         return "Constraint(value=%s, where=%s)" % (repr(self.value), repr(self.where))
+
+    @staticmethod
+    def _identify(obj):
+        # a `Variable` is identified by its latest change, too, and
+        # `None` or a number by itself. Anything else, such as an
+        # array, can be changed in place without notice, so it cannot
+        # be identified and is `None`.
+        if hasattr(obj, '_lastModified'):
+            return (id(obj), obj._lastModified())
+        elif obj is None or isinstance(obj, (bool, int, long, float, complex)):
+            return id(obj)
+        else:
+            return None
+
+    def _stamp(self):
+        """Identify the current `value` and `where`, for a cached
+        application of the constraint to tell when either has changed,
+        or `None` if either cannot be identified and the constraint must
+        be applied afresh.
+        """
+        value, where = self._identify(self.value), self._identify(self.where)
+        if value is None or where is None:
+            return None
+        return (value, where)
+
+    _indexStamp = None
+
+    @property
+    def _index(self):
+        """The locations `where` the constraint applies, as an index into
+        the constrained value. A mask that is a `Variable` is converted to
+        indices only when it has changed.
+        """
+        stamp = self._identify(self.where)
+        if stamp is None or stamp != self._indexStamp:
+            mask = self.where
+            if not hasattr(mask, 'dtype') or mask.dtype != bool:
+                mask = numerix.array(mask, dtype=numerix.NUMERIX.bool)
+            mask = numerix.asarray(mask)
+            if mask.shape == ():
+                index = (Ellipsis, mask)
+            else:
+                index = (Ellipsis,) + tuple(numerix.nonzero(mask))
+            if stamp is None:
+                return index
+            self._indexCache = index
+            self._indexStamp = stamp
+        return self._indexCache
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "blockLayout.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.tools import numerix
+
+class _BlockLayout(object):
+    """
+    Where the rows and columns of each (equation, variable) block of a
+    coupled matrix go in the global matrix.
+
+    With the ``"blocked"`` ordering, all the unknowns of the first
+    variable come first, then all those of the second, and so on,
+
+        >>> layout = _BlockLayout(numberOfCells=3, numberOfEquations=2, numberOfVariables=2)
+        >>> print layout.rows[1], layout.cols[0]
+        [3 4 5] [0 1 2]
+
+    while with the ``"interleaved"`` ordering, the unknowns of all the
+    variables in the first cell come first, then those in the second
+    cell, and so on.
+
+        >>> layout = _BlockLayout(numberOfCells=3, numberOfEquations=2, numberOfVariables=2,
+        ...                       ordering="interleaved")
+        >>> print layout.rows[1], layout.cols[0]
+        [1 3 5] [0 2 4]
+
+    The `fields` give the equation of each row.
+
+        >>> print layout.fields
+        [0 1 0 1 0 1]
+
+        >>> _BlockLayout(numberOfCells=3, numberOfEquations=2, numberOfVariables=2,
+        ...              ordering="shuffled") # doctest: +IGNORE_EXCEPTION_DETAIL
+        Traceback (most recent call last):
+            ...
+        ValueError: unknown ordering 'shuffled'
+    """
+
+    orderings = ("blocked", "interleaved")
+
+    def __init__(self, numberOfCells, numberOfEquations, numberOfVariables, ordering="blocked"):
+        """
+        :Parameters:
+          - `numberOfCells`: The number of rows and columns of each block.
+          - `numberOfEquations`: The number of blocks down the matrix.
+          - `numberOfVariables`: The number of blocks across the matrix.
+          - `ordering`: ``"blocked"`` or ``"interleaved"``.
+        """
+        if ordering not in self.orderings:
+            raise ValueError("unknown ordering '%s'" % ordering)
+
+        self.numberOfCells = numberOfCells
+        self.numberOfEquations = numberOfEquations
+        self.numberOfVariables = numberOfVariables
+        self.ordering = ordering
+
+        ids = numerix.arange(numberOfCells, dtype=numerix.INT_DTYPE)
+        self.rows = [self._globalIDs(ids, index, numberOfEquations) for index in range(numberOfEquations)]
+        self.cols = [self._globalIDs(ids, index, numberOfVariables) for index in range(numberOfVariables)]
+
+    def _globalIDs(self, ids, index, numberOfBlocks):
+        if self.ordering == "blocked":
+            return ids + index * self.numberOfCells
+        else:
+            return ids * numberOfBlocks + index
+
+    @property
+    def fields(self):
+        fields = numerix.empty((self.numberOfCells * self.numberOfEquations,), numerix.INT_DTYPE)
+        for index, rows in enumerate(self.rows):
+            fields[rows] = index
+        return fields
+
+    def _fieldsOfGlobalRows(self, rows, globalNumberOfCells):
+        """
+        The equation of each of the `rows` of the global matrix, numbered
+        across all processors.
+
+            >>> layout = _BlockLayout(numberOfCells=3, numberOfEquations=2, numberOfVariables=2)
+            >>> print layout._fieldsOfGlobalRows(numerix.array([5, 2]), globalNumberOfCells=3)
+            [1 0]
+        """
+        if self.ordering == "blocked":
+            return rows // globalNumberOfCells
+        else:
+            return rows % self.numberOfEquations
+
+    def _matches(self, numberOfCells, numberOfEquations, numberOfVariables, ordering):
+        return ((self.numberOfCells, self.numberOfEquations, self.numberOfVariables, self.ordering)
+                == (numberOfCells, numberOfEquations, numberOfVariables, ordering))
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
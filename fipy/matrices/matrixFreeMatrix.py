@@ -0,0 +1,338 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "matrixFreeMatrix.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.matrices.sparseMatrix import _SparseMatrix
+from fipy.tools import numerix
+
+class _MatrixFreeMeshMatrix(_SparseMatrix):
+    """
+    A matrix-free stand-in for `_ScipyMeshMatrix`.
+
+    No matrix is ever stored. Only the diagonal, as one value per cell,
+    and the off-diagonal coupling across the interior faces of the mesh,
+    as one value per face in each direction, are kept. Products with a
+    vector are formed by gathering the neighbouring cell values across
+    each face. When every term couples the cells on either side of a face
+    symmetrically, as diffusion does, only one value per face is kept.
+    This takes less than half the storage of the assembled sparse matrix.
+
+    Only the terms of second order equations for a scalar variable can be
+    built this way: entries off the diagonal that are not across an
+    interior face, products of two matrices (as in higher order diffusion)
+    and vector or coupled solution variables raise `NotImplementedError`.
+
+    Use the `matrix` attribute with the iterative solvers of
+    `scipy.sparse.linalg`; see `_ScipyKrylovSolver.useMatrixFree()`.
+
+        >>> from fipy import Grid2D, CellVariable, TransientTerm, DiffusionTerm
+        >>> from fipy import ExponentialConvectionTerm, ImplicitSourceTerm
+        >>> from fipy.solvers.scipy import LinearGMRESSolver
+        >>> mesh = Grid2D(nx=4, ny=3)
+        >>> var = CellVariable(mesh=mesh, value=mesh.cellCenters[0], hasOld=True)
+        >>> var.constrain(1., mesh.facesLeft)
+        >>> eq = (TransientTerm() == DiffusionTerm(coeff=2.)
+        ...       + ExponentialConvectionTerm(coeff=(1., 0.5))
+        ...       - ImplicitSourceTerm(coeff=0.5))
+
+        >>> assembled = LinearGMRESSolver(tolerance=1e-12)
+        >>> eq.solve(var=var, dt=0.1, solver=assembled)
+        >>> value = var.value.copy()
+        >>> var.value = mesh.cellCenters[0]
+
+        >>> matrixFree = LinearGMRESSolver(tolerance=1e-12)
+        >>> matrixFree.useMatrixFree()
+        >>> eq.solve(var=var, dt=0.1, solver=matrixFree)
+        >>> print isinstance(matrixFree.matrix, _MatrixFreeMeshMatrix)
+        True
+        >>> print numerix.allclose(matrixFree.matrix.numpyArray,
+        ...                        assembled.matrix.numpyArray)
+        True
+        >>> print numerix.allclose(var.value, value)
+        True
+
+    Operators that cannot be applied without a matrix are refused.
+
+        >>> DiffusionTerm(coeff=(1., 1.)).solve(var=var, solver=matrixFree)
+        Traceback (most recent call last):
+            ...
+        NotImplementedError: matrix-free operators cannot be multiplied together
+    """
+
+    def __init__(self, mesh, bandwidth=0, sizeHint=None, numberOfVariables=1, numberOfEquations=1):
+        """
+        :Parameters:
+          - `mesh`: The `Mesh` to build the operator for.
+          - `bandwidth`: *unused*
+          - `sizeHint`: *unused*
+          - `numberOfVariables`: Must be 1.
+          - `numberOfEquations`: Must be 1.
+        """
+        if numberOfVariables != 1 or numberOfEquations != 1:
+            raise NotImplementedError, "matrix-free operators are only available for scalar variables"
+
+        self.mesh = mesh
+        self.diagonal = numerix.zeros((mesh.numberOfCells,), 'd')
+        self.upper = None
+        self.lower = None
+
+    @property
+    def _faceCellIDs(self):
+        """
+        The cells on either side of each interior face. They are gathered
+        from the mesh on every use rather than kept, so that the operator
+        holds no index arrays of its own.
+        """
+        id1, id2 = self.mesh._adjacentCellIDs
+        interiorFaces = self.mesh.interiorFaceIDs
+        return numerix.take(id1, interiorFaces), numerix.take(id2, interiorFaces)
+
+    def _scatter(self, ids, vector):
+        return numerix.bincount(ids, weights=vector, minlength=len(self.diagonal))
+
+    def _addFaces(self, upper, lower):
+        if upper is None:
+            return
+
+        symmetric = lower is None or lower is upper
+
+        if self.upper is None:
+            self.upper = numerix.array(upper, 'd')
+            if not symmetric:
+                self.lower = numerix.array(lower, 'd')
+        else:
+            if self.lower is None and not symmetric:
+                self.lower = self.upper.copy()
+            self.upper += upper
+            if self.lower is not None:
+                if symmetric:
+                    self.lower += upper
+                else:
+                    self.lower += lower
+
+    def addAtInteriorFaces(self, cell1diag, cell1offdiag, cell2offdiag, cell2diag, id1, id2):
+        """
+        Add the coupling across the interior faces of the mesh. `id1` and
+        `id2` are not kept; the cells on either side of each face are
+        taken from the mesh.
+
+            >>> from fipy import Grid1D
+            >>> L = _MatrixFreeMeshMatrix(mesh=Grid1D(nx=3))
+            >>> L.addAtInteriorFaces(cell1diag=numerix.array((1., 2.)),
+            ...                      cell1offdiag=numerix.array((-1., -2.)),
+            ...                      cell2offdiag=numerix.array((-3., -4.)),
+            ...                      cell2diag=numerix.array((3., 4.)),
+            ...                      id1=None, id2=None)
+            >>> print L
+             1.000000  -1.000000      ---    
+            -3.000000   5.000000  -2.000000  
+                ---    -4.000000   4.000000  
+            >>> print L * numerix.array((1., 2., 3.))
+            [-1.  1.  4.]
+        """
+        faceID1, faceID2 = self._faceCellIDs
+        self.diagonal += self._scatter(faceID1, cell1diag) + self._scatter(faceID2, cell2diag)
+        self._addFaces(cell1offdiag, cell2offdiag)
+
+    def addAt(self, vector, id1, id2):
+        """
+        Add `vector` on the diagonal at `id1`, which must equal `id2`.
+
+            >>> from fipy import Grid1D
+            >>> L = _MatrixFreeMeshMatrix(mesh=Grid1D(nx=3))
+            >>> L.addAt(numerix.array((1., 2., 3.)), numerix.array((0, 2, 0)), numerix.array((0, 2, 0)))
+            >>> print L.takeDiagonal()
+            [ 4.  0.  2.]
+            >>> L.addAt(numerix.array((1.,)), numerix.array((0,)), numerix.array((1,)))
+            Traceback (most recent call last):
+                ...
+            NotImplementedError: matrix-free operators only take off-diagonal entries across interior faces
+        """
+        if not numerix.array_equal(id1, id2):
+            raise NotImplementedError, "matrix-free operators only take off-diagonal entries across interior faces"
+
+        self.diagonal += self._scatter(numerix.asarray(id1).ravel(), numerix.asarray(vector).ravel())
+
+    def put(self, vector, id1, id2):
+        if not numerix.array_equal(id1, id2):
+            raise NotImplementedError, "matrix-free operators only take off-diagonal entries across interior faces"
+
+        self.diagonal[id1] = vector
+
+    def addAtDiagonal(self, vector):
+        self.diagonal += numerix.asarray(vector)
+
+    def putDiagonal(self, vector):
+        self.diagonal[:] = vector
+
+    def takeDiagonal(self):
+        return self.diagonal.copy()
+
+    def copy(self):
+        other = self.__class__(mesh=self.mesh)
+        other += self
+        return other
+
+    def __iadd__(self, other):
+        return self._iadd(other)
+
+    def __isub__(self, other):
+        return self._iadd(other, sign=-1)
+
+    def _iadd(self, other, sign=1):
+        if isinstance(other, _MatrixFreeMeshMatrix):
+            self.diagonal += sign * other.diagonal
+            if other.upper is not None:
+                if other.lower is None:
+                    self._addFaces(sign * other.upper, None)
+                else:
+                    self._addFaces(sign * other.upper, sign * other.lower)
+        elif not (numerix.shape(other) == () and other == 0):
+            raise NotImplementedError, "matrix-free operators can only be added together"
+
+        return self
+
+    def __add__(self, other):
+        return self.copy()._iadd(other)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self.copy()._iadd(other, sign=-1)
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def _scaled(self, factor):
+        other = self.__class__(mesh=self.mesh)
+        other.diagonal = self.diagonal * factor
+        if self.upper is not None:
+            other.upper = self.upper * factor
+        if self.lower is not None:
+            other.lower = self.lower * factor
+        return other
+
+    def _matvec(self, x, transpose=False):
+        x = numerix.asarray(x).ravel()
+        y = self.diagonal * x
+
+        if self.upper is not None:
+            faceID1, faceID2 = self._faceCellIDs
+            upper = self.upper
+            if self.lower is None:
+                lower = upper
+            else:
+                lower = self.lower
+            if transpose:
+                upper, lower = lower, upper
+            y += self._scatter(faceID1, upper * numerix.take(x, faceID2))
+            y += self._scatter(faceID2, lower * numerix.take(x, faceID1))
+
+        return y
+
+    def __mul__(self, other):
+        if isinstance(other, _SparseMatrix):
+            raise NotImplementedError, "matrix-free operators cannot be multiplied together"
+
+        shape = numerix.shape(other)
+        if shape == ():
+            return self._scaled(other)
+        elif shape == self.diagonal.shape:
+            return self._matvec(other)
+        else:
+            raise TypeError
+
+    def __rmul__(self, other):
+        if numerix.shape(other) == ():
+            return self._scaled(other)
+        else:
+            return self._matvec(other, transpose=True)
+
+    @property
+    def matrix(self):
+        """
+        A `scipy.sparse.linalg.LinearOperator` that applies this operator.
+        """
+        from scipy.sparse.linalg import LinearOperator
+
+        operator = LinearOperator(self._shape,
+                                  matvec=self._matvec,
+                                  rmatvec=lambda x: self._matvec(x, transpose=True),
+                                  dtype=float)
+        # for the `JacobiPreconditioner`
+        operator.diagonal = self.takeDiagonal
+
+        return operator
+
+    @property
+    def _shape(self):
+        N = len(self.diagonal)
+        return (N, N)
+
+    @property
+    def _nnz(self):
+        # the diagonal and both sides of each interior face
+        if self.upper is None:
+            return len(self.diagonal)
+        else:
+            return len(self.diagonal) + 2 * len(self.upper)
+
+    @property
+    def _range(self):
+        return range(self._shape[1]), range(self._shape[0])
+
+    @property
+    def numpyArray(self):
+        """
+        The dense matrix that this operator applies, for inspection of
+        small problems.
+        """
+        return numerix.array([self._matvec(column) for column in numerix.identity(len(self.diagonal))]).transpose()
+
+    def __getitem__(self, index):
+        return self.numpyArray[index]
+
+    def __repr__(self):
+        return "%s(mesh=%s)" % (self.__class__.__name__, repr(self.mesh))
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -180,6 +180,10 @@ class _PysparseMatrix(_SparseMatrix):
     def _shape(self):
         return self.matrix.shape
 
+    @property
+    def _nnz(self):
+        return self.matrix.nnz
+
     @property
     def _range(self):
         return range(self._shape[1]), range(self._shape[0])
@@ -255,6 +259,30 @@ class _PysparseMatrix(_SparseMatrix):
             ids = numerix.arange(len(vector))
             self.addAt(vector, ids, ids)
 
+    _assemblesBlocks = True
+
+    def _entries(self):
+        values, rows, cols = self.matrix.find()
+        return (values, rows, cols)
+
+    def _sameValues(self, other):
+        """
+            >>> L = _PysparseMatrixFromShape(rows=2, cols=2)
+            >>> L.addAt([1., 2.], [0, 1], [1, 1])
+            >>> M = _PysparseMatrixFromShape(rows=2, cols=2)
+            >>> M.addAt([1., 2.], [0, 1], [1, 1])
+            >>> print L._sameValues(M)
+            True
+            >>> M.addAt([1.], [0], [0])
+            >>> print L._sameValues(M)
+            False
+        """
+        if self.matrix.shape != other.matrix.shape:
+            return False
+        difference = self.matrix.copy()
+        difference.shift(-1, other.matrix)
+        return difference.norm('inf') == 0
+
     @property
     def numpyArray(self):
         shape = self._shape
@@ -274,6 +302,14 @@ class _PysparseMatrix(_SparseMatrix):
         """
         self.matrix.export_mtx(filename)
 
+    def _storeSparsityPattern(self):
+        """Record the number of nonzeros, so that later `ll_mat` assemblies
+        of the same system are preallocated instead of grown.
+        """
+        if self._sparsityPattern is not None:
+            self._sparsityPattern.shape = self.matrix.shape
+            self._sparsityPattern.nnz = self.matrix.nnz
+
 class _PysparseMatrixFromShape(_PysparseMatrix):
 
     def __init__(self, rows, cols, bandwidth=0, sizeHint=None, matrix=None, storeZeros=True):
@@ -289,6 +325,8 @@ class _PysparseMatrixFromShape(_PysparseMatrix):
 
         """
         sizeHint = sizeHint or max(rows, cols) * bandwidth
+        if not sizeHint and self._sparsityPattern is not None:
+            sizeHint = self._sparsityPattern.nnz or 0
         if matrix is None:
             tmpMatrix = spmatrix.ll_mat(1, 1, 1)
             if hasattr(tmpMatrix, 'storeZeros'):
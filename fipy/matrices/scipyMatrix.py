@@ -49,6 +49,13 @@ class _ScipyMatrix(_SparseMatrix):
     `_ScipyMatrix` is always NxN.
     Allows basic python operations __add__, __sub__ etc.
     Facilitate matrix populating in an easy way.
+
+    Calls to `addAt`, `addAtDiagonal` and `put` do not rebuild the CSR
+    structure. Instead, the arrays of (row, column, value) triplets are
+    kept, as they are, and summed into `matrix` in a single pass the
+    next time `matrix` is accessed (e.g., by a solver or `matvec`).
+    Adding one such matrix to another passes its arrays on, so the
+    matrices of the `Term` objects of an equation are summed only once.
     """
 
     def __init__(self, matrix):
@@ -59,6 +66,170 @@ class _ScipyMatrix(_SparseMatrix):
         """
         self.matrix = matrix
 
+    def _appendTriplets(self, vector, id1, id2):
+        """Record `vector` to be added at (`id1`, `id2`) when `matrix` is next needed
+
+        The arrays are kept, not copied, until then.
+
+            >>> L = _ScipyMatrixFromShape(size=3)
+            >>> L.addAt([1., 2.], [0, 1], [0, 1])
+            >>> L.addAt([3., 4., 5.], [2, 0, 1], [2, 0, 1])
+            >>> print L._tripletCount, len(L._triplets)
+            5 2
+            >>> print L.matrix.nnz, L._tripletCount
+            3 0
+            >>> print L
+             5.000000      ---        ---    
+                ---     7.000000      ---    
+                ---        ---     3.000000  
+        """
+        vector = numerix.asarray(vector, dtype='d').ravel()
+        if len(vector) > 0:
+            self._triplets.append((vector,
+                                   numerix.asarray(id1).ravel(),
+                                   numerix.asarray(id2).ravel()))
+            self._tripletCount += len(vector)
+
+    def _concatenatedTriplets(self):
+        """Return the pending values, rows and columns, each as one array,
+        and keep them that way.
+        """
+        if len(self._triplets) > 1:
+            self._triplets = [tuple([numerix.concatenate(arrays) for arrays in zip(*self._triplets)])]
+        elif len(self._triplets) == 0:
+            return (numerix.zeros((0,), 'd'),
+                    numerix.zeros((0,), numerix.INT_DTYPE),
+                    numerix.zeros((0,), numerix.INT_DTYPE))
+        return self._triplets[0]
+
+    _scatterPattern = None
+
+    def _assemble(self):
+        """Sum the accumulated triplets into the CSR `matrix`
+        """
+        n = self._tripletCount
+        if n > 0:
+            pattern = self._scatterPattern
+            self._scatterPattern = None
+            if (pattern is not None
+                and self._matrix.nnz == 0
+                and len(pattern.scatter) == n):
+                values = numerix.concatenate([values for values, rows, cols in self._triplets])
+                data = numerix.bincount(pattern.scatter,
+                                        weights=values,
+                                        minlength=len(pattern.indices))
+                self._matrix = sp.csr_matrix((data,
+                                              pattern.indices.copy(),
+                                              pattern.indptr.copy()),
+                                             shape=self._matrix.shape)
+            else:
+                # summing the arrays one at a time merges small, ordered
+                # CSR matrices, which is faster than sorting them all at once
+                for values, rows, cols in self._triplets:
+                    temp = sp.coo_matrix((values, (rows, cols)),
+                                         shape=self._matrix.shape).tocsr()
+                    if self._matrix.nnz == 0:
+                        self._matrix = temp
+                    else:
+                        self._matrix = self._matrix + temp
+            self._triplets = []
+            self._tripletCount = 0
+
+    def _storeSparsityPattern(self):
+        """Record (or recognize) the CSR structure of the accumulated triplets
+
+        The next assembly of this matrix then only sums the values into
+        the data array of the recorded structure. The structure is
+        recognized by the lengths of the arrays of triplets alone, which
+        costs nothing, as the stencil of a `Term` tree is fixed by its
+        mesh.
+
+            >>> from fipy.matrices.sparsityPattern import _SparsityPattern
+            >>> from fipy.matrices.sparsityPattern import SparsityPatternMatrix
+            >>> pattern = _SparsityPattern(vars=())
+            >>> SparseMatrix = SparsityPatternMatrix(_ScipyMatrixFromShape, pattern)
+            >>> L = SparseMatrix(size=3)
+            >>> L.addAt([1., 2., 3., 4.], [2, 0, 2, 1], [0, 0, 0, 2])
+            >>> L._storeSparsityPattern()
+            >>> print pattern.indptr, pattern.indices, pattern.scatter
+            [0 1 2 3] [0 2 0] [2 0 2 1]
+            >>> print L
+             2.000000      ---        ---    
+                ---        ---     4.000000  
+             4.000000      ---        ---    
+
+            >>> L = SparseMatrix(size=3)
+            >>> L.addAt([5., 6., 7., 8.], [2, 0, 2, 1], [0, 0, 0, 2])
+            >>> L._storeSparsityPattern()
+            >>> L._scatterPattern is pattern
+            True
+            >>> print L
+             6.000000      ---        ---    
+                ---        ---     8.000000  
+            12.000000      ---        ---    
+
+        Triplets of other lengths rebuild the pattern.
+
+            >>> L = SparseMatrix(size=3)
+            >>> L.addAt([5., 6., 7.], [2, 0, 1], [0, 1, 2])
+            >>> L._storeSparsityPattern()
+            >>> print pattern.indptr, pattern.indices, pattern.scatter
+            [0 1 2 3] [1 2 0] [2 0 1]
+            >>> print L
+                ---     6.000000      ---    
+                ---        ---     7.000000  
+             5.000000      ---        ---    
+        """
+        pattern = self._sparsityPattern
+        n = self._tripletCount
+
+        if pattern is None or n == 0 or self._matrix.nnz > 0:
+            return
+
+        lengths = tuple([len(values) for values, rows, cols in self._triplets])
+
+        if lengths != pattern.tripletLengths or self._matrix.shape != pattern.shape:
+            values, rows, cols = self._concatenatedTriplets()
+
+            order = numerix.lexsort((cols, rows))
+            sortedRows = numerix.take(rows, order)
+            sortedCols = numerix.take(cols, order)
+
+            isNew = numerix.ones((n,), 'bool')
+            isNew[1:] = ((sortedRows[1:] != sortedRows[:-1])
+                         | (sortedCols[1:] != sortedCols[:-1]))
+
+            scatter = numerix.empty((n,), numerix.INT_DTYPE)
+            scatter[order] = numerix.cumsum(isNew) - 1
+
+            N = self._matrix.shape[0]
+            indptr = numerix.zeros((N + 1,), numerix.INT_DTYPE)
+            indptr[1:] = numerix.cumsum(numerix.bincount(sortedRows[isNew], minlength=N))
+
+            pattern.shape = self._matrix.shape
+            pattern.indptr = indptr
+            pattern.indices = sortedCols[isNew]
+            pattern.scatter = scatter
+            pattern.tripletLengths = lengths
+
+        self._scatterPattern = pattern
+
+    def _getMatrix(self):
+        self._assemble()
+        return self._matrix
+
+    def _setMatrix(self, matrix):
+        self._matrix = matrix
+        self._triplets = []
+        self._tripletCount = 0
+
+    def _delMatrix(self):
+        del self._matrix
+        self._triplets = []
+        self._tripletCount = 0
+
+    matrix = property(_getMatrix, _setMatrix, _delMatrix)
+
     def getCoupledClass(self):
         return _CoupledScipyMeshMatrix
 
@@ -76,7 +247,16 @@ class _ScipyMatrix(_SparseMatrix):
         return self._iadd(other)
 
     def _iadd(self, other, sign=1):
-        if hasattr(other, "matrix"):
+        if isinstance(other, _ScipyMatrix):
+            # keep deferring assembly; `other`'s pending triplets
+            # simply join ours
+            for values, rows, cols in other._triplets:
+                if sign < 0:
+                    values = -values
+                self._appendTriplets(values, rows, cols)
+            if other._matrix.nnz > 0:
+                self._matrix = self._matrix + (sign * other._matrix)
+        elif hasattr(other, "matrix"):
             self.matrix = self.matrix + (sign * other.matrix)
         elif type(other) in [float, int]:
             fillVec = numerix.repeat(other, self.matrix.nnz)
@@ -186,7 +366,11 @@ class _ScipyMatrix(_SparseMatrix):
 
     @property
     def _shape(self):
-        return self.matrix.shape
+        return self._matrix.shape
+
+    @property
+    def _nnz(self):
+        return self.matrix.nnz
 
     @property
     def _range(self):
@@ -207,9 +391,8 @@ class _ScipyMatrix(_SparseMatrix):
 
         # done in such a way to vectorize everything
         tempVec = numerix.array(vector) - self.matrix[id1, id2].flat
-        tempMat = sp.csr_matrix((tempVec, (id1, id2)), self.matrix.shape)
 
-        self.matrix = self.matrix + tempMat
+        self._appendTriplets(tempVec, id1, id2)
 
     def putDiagonal(self, vector):
         """
@@ -252,9 +435,7 @@ class _ScipyMatrix(_SparseMatrix):
         """
         assert(len(id1) == len(id2) == len(vector))
 
-        temp = sp.csr_matrix((vector, (id1, id2)), self.matrix.shape)
-
-        self.matrix = self.matrix + temp
+        self._appendTriplets(vector, id1, id2)
 
     def addAtDiagonal(self, vector):
         if type(vector) in [type(1), type(1.)]:
@@ -263,6 +444,46 @@ class _ScipyMatrix(_SparseMatrix):
         ids = numerix.arange(len(vector))
         self.addAt(vector, ids, ids)
 
+    _assemblesBlocks = True
+
+    def _entries(self):
+        """
+        The pending triplets are passed on as they are, without assembly.
+
+            >>> L = _ScipyMatrixFromShape(size=2)
+            >>> L.addAt([1., 2.], [0, 1], [1, 1])
+            >>> values, rows, cols = L._entries()
+            >>> print values, rows, cols, L._tripletCount
+            [ 1.  2.] [0 1] [1 1] 2
+            >>> M = _ScipyMatrixFromShape(size=4)
+            >>> M._addBlock(L, rows=numerix.array([2, 3]), cols=numerix.array([1, 3]))
+            >>> print numerix.allequal(M.numpyArray, [[0, 0, 0, 0],
+            ...                                       [0, 0, 0, 0],
+            ...                                       [0, 0, 0, 1],
+            ...                                       [0, 0, 0, 2]])
+            True
+        """
+        if self._matrix.nnz == 0:
+            return self._concatenatedTriplets()
+        else:
+            coo = self.matrix.tocoo()
+            return (coo.data, coo.row, coo.col)
+
+    def _sameValues(self, other):
+        """
+            >>> L = _ScipyMatrixFromShape(size=2)
+            >>> L.addAt([1., 2.], [0, 1], [1, 1])
+            >>> M = _ScipyMatrixFromShape(size=2)
+            >>> M.addAt([1., 2.], [0, 1], [1, 1])
+            >>> print L._sameValues(M)
+            True
+            >>> M.addAt([1.], [0], [0])
+            >>> print L._sameValues(M)
+            False
+        """
+        A, B = self.matrix, other.matrix
+        return A.shape == B.shape and (A != B).nnz == 0
+
     @property
     def numpyArray(self):
         return self.matrix.toarray()
@@ -311,7 +532,7 @@ class _ScipyMeshMatrix(_ScipyMatrixFromShape):
         self.numberOfVariables = numberOfVariables
         size = self.numberOfVariables * self.mesh.numberOfCells
         assert numberOfEquations == self.numberOfVariables
-        _ScipyMatrixFromShape.__init__(self, size=size, matrix=matrix)
+        _ScipyMatrixFromShape.__init__(self, size=size, bandwidth=bandwidth, matrix=matrix)
 
     def __mul__(self, other):
         if isinstance(other, _ScipyMeshMatrix):
@@ -384,6 +605,277 @@ class _ScipyMeshMatrix(_ScipyMatrixFromShape):
         """
         pass
 
+class _ScipyDiaMeshMatrix(_ScipyMeshMatrix):
+    """
+    A `_ScipyMeshMatrix` kept in diagonal (DIA) storage.
+
+    The matrices of a structured grid have nonzeros on a handful of
+    diagonals only, at offsets of 0, 1 and the numbers of cells in a
+    row and in a layer of the grid. Each diagonal is kept as one dense
+    array, with no indices, and `addAt` sums into it directly by the
+    offset of each entry. This needs less memory than CSR, and the
+    products with a vector run over contiguous arrays.
+
+    The diagonals are found as entries are added, so any matrix can be
+    stored, but only those with few diagonals benefit.
+
+        >>> from fipy import Grid2D
+        >>> L = _ScipyDiaMeshMatrix(mesh=Grid2D(nx=2, ny=2))
+        >>> L.addAt([1., 2., 3., 4.], [0, 1, 2, 0], [1, 0, 0, 0])
+        >>> L.addAtDiagonal(5.)
+        >>> print L._offsets
+        [-2 -1  0  1]
+        >>> print L
+         9.000000   1.000000      ---        ---    
+         2.000000   5.000000      ---        ---    
+         3.000000      ---     5.000000      ---    
+            ---        ---        ---     5.000000  
+        >>> print L * numerix.array((1., 2., 3., 4.))
+        [ 11.  12.  18.  20.]
+        >>> print numerix.allclose(L.numpyArray,
+        ...                        _ScipyMatrix(matrix=L.matrix.tocsr()).numpyArray)
+        True
+
+    Assembling the diagonals costs more than the triplets that are summed
+    into CSR, and the solves are no faster, so the SciPy solvers keep CSR
+    for every mesh,
+
+        >>> from fipy import Tri2D
+        >>> from fipy.solvers.scipy import LinearPCGSolver
+        >>> print LinearPCGSolver()._meshMatrixClass(Grid2D(nx=3, ny=3)).__name__
+        _ScipyMeshMatrix
+        >>> print LinearPCGSolver()._meshMatrixClass(Tri2D(nx=3, ny=3)).__name__
+        _ScipyMeshMatrix
+
+    unless a solver asks for diagonal storage, which works with or
+    without the diagonal-based preconditioners.
+
+        >>> class _DiaPCGSolver(LinearPCGSolver):
+        ...     def _meshMatrixClass(self, mesh):
+        ...         return _ScipyDiaMeshMatrix
+        >>> from fipy import CellVariable, DiffusionTerm
+        >>> from fipy.solvers.scipy import JacobiPreconditioner, SSORPreconditioner
+        >>> mesh = Grid2D(nx=10, ny=10)
+        >>> var = CellVariable(mesh=mesh)
+        >>> var.constrain(1., mesh.facesLeft)
+        >>> var.constrain(0., mesh.facesRight)
+        >>> for precon in (None, JacobiPreconditioner(), SSORPreconditioner(omega=1.5)):
+        ...     var.value = 0.
+        ...     solver = _DiaPCGSolver(tolerance=1e-10, iterations=1000, precon=precon)
+        ...     DiffusionTerm().solve(var=var, solver=solver)
+        ...     print isinstance(solver.matrix, _ScipyDiaMeshMatrix),
+        ...     print numerix.allclose(var, 1 - mesh.cellCenters[0] / 10., atol=1e-6)
+        True True
+        True True
+        True True
+    """
+
+    def __init__(self, mesh, bandwidth=0, sizeHint=None, matrix=None, numberOfVariables=1, numberOfEquations=1, storeZeros=True):
+        """
+        :Parameters:
+          - `mesh`: The `Mesh` to assemble the matrix for.
+          - `bandwidth`: *unused*
+          - `sizeHint`: *unused*
+          - `matrix`: A scipy sparse matrix to start from.
+          - `numberOfVariables`: The columns of the matrix is determined by numberOfVariables * self.mesh.numberOfCells.
+          - `numberOfEquations`: The rows of the matrix is determined by numberOfEquations * self.mesh.numberOfCells.
+          - `storeZeros`: *unused*
+        """
+        self.mesh = mesh
+        self.numberOfVariables = numberOfVariables
+        self.numberOfEquations = numberOfEquations
+        assert numberOfEquations == self.numberOfVariables
+        self._size = self.numberOfVariables * self.mesh.numberOfCells
+        self._delMatrix()
+        if matrix is not None:
+            self.matrix = matrix
+
+    # entries are summed into the diagonals as they are added, so there
+    # are never any triplets to assemble
+    _triplets = ()
+    _tripletCount = 0
+
+    def _storeSparsityPattern(self):
+        """Record the offsets of the diagonals, so that later assemblies
+        allocate them all at once.
+
+            >>> from fipy import Grid1D
+            >>> from fipy.matrices.sparsityPattern import _SparsityPattern
+            >>> from fipy.matrices.sparsityPattern import SparsityPatternMatrix
+            >>> pattern = _SparsityPattern(vars=())
+            >>> SparseMatrix = SparsityPatternMatrix(_ScipyDiaMeshMatrix, pattern)
+            >>> L = SparseMatrix(mesh=Grid1D(nx=3))
+            >>> L.addAt([1., 2.], [0, 1], [1, 1])
+            >>> L._storeSparsityPattern()
+            >>> print pattern.offsets
+            [0 1]
+            >>> print SparseMatrix(mesh=Grid1D(nx=3))._data.shape
+            (2, 3)
+        """
+        pattern = self._sparsityPattern
+        if pattern is not None and len(self._offsets) > 0:
+            pattern.shape = (self._size, self._size)
+            pattern.offsets = self._offsets.copy()
+
+    def _diagonalIndices(self, offsets):
+        """
+        Return the rows of `_data` holding the diagonals at `offsets`,
+        adding any that are not stored yet.
+        """
+        if len(offsets) == 0:
+            return numerix.zeros((0,), numerix.INT_DTYPE)
+
+        new = numerix.setdiff1d(numerix.unique(offsets), self._offsets)
+        if len(new) > 0:
+            allOffsets = numerix.union1d(self._offsets, new)
+            data = numerix.zeros((len(allOffsets), self._size), 'd')
+            data[numerix.searchsorted(allOffsets, self._offsets)] = self._data
+            self._offsets, self._data = allOffsets, data
+
+        return numerix.searchsorted(self._offsets, offsets)
+
+    def _appendTriplets(self, vector, id1, id2):
+        """
+        Repeated entries are summed.
+
+            >>> from fipy import Grid1D
+            >>> L = _ScipyDiaMeshMatrix(mesh=Grid1D(nx=3))
+            >>> L.addAt([1., 2., 3.], [1, 1, 0], [1, 1, 1])
+            >>> print numerix.allequal(L.numpyArray, [[0, 3, 0],
+            ...                                       [0, 3, 0],
+            ...                                       [0, 0, 0]])
+            True
+        """
+        id1 = numerix.asarray(id1, dtype=numerix.INT_DTYPE).ravel()
+        id2 = numerix.asarray(id2, dtype=numerix.INT_DTYPE).ravel()
+        vector = numerix.asarray(vector, dtype='d').ravel()
+
+        # scipy keeps A[i, j] at data[k, j] with offsets[k] = j - i
+        k = self._diagonalIndices(id2 - id1)
+
+        # sum the repeats among the touched entries only, rather than
+        # over the whole of `_data`
+        touched, repeats = numerix.unique(k * self._size + id2, return_inverse=True)
+        data = self._data.reshape(-1)
+        data[touched] += numerix.bincount(repeats, weights=vector, minlength=len(touched))
+
+    def _getMatrix(self):
+        return sp.dia_matrix((self._data, self._offsets), shape=(self._size, self._size))
+
+    def _setMatrix(self, matrix):
+        matrix = sp.coo_matrix(matrix)
+        self._delMatrix()
+        self._appendTriplets(matrix.data, matrix.row, matrix.col)
+
+    def _delMatrix(self):
+        pattern = self._sparsityPattern
+        if pattern is not None and pattern.offsets is not None:
+            self._offsets = pattern.offsets.copy()
+        else:
+            self._offsets = numerix.zeros((0,), numerix.INT_DTYPE)
+        self._data = numerix.zeros((len(self._offsets), self._size), 'd')
+
+    matrix = property(_getMatrix, _setMatrix, _delMatrix)
+    _matrix = matrix
+
+    def _entries(self):
+        coo = self.matrix.tocoo()
+        return (coo.data, coo.row, coo.col)
+
+    def copy(self):
+        other = self.__class__(mesh=self.mesh, numberOfVariables=self.numberOfVariables, numberOfEquations=self.numberOfEquations)
+        other._offsets = self._offsets.copy()
+        other._data = self._data.copy()
+        return other
+
+    def _iadd(self, other, sign=1):
+        """
+        A number is added to the nonzero entries, as for a
+        `_ScipyMatrix`, and adding zero changes nothing.
+
+            >>> from fipy import Grid1D
+            >>> L = _ScipyDiaMeshMatrix(mesh=Grid1D(nx=3))
+            >>> L.addAt([1., 2., 3.], [0, 1, 2], [0, 1, 1])
+            >>> L += 0
+            >>> L += 1.
+            >>> print numerix.allequal(L.numpyArray, [[2, 0, 0],
+            ...                                       [0, 3, 0],
+            ...                                       [0, 4, 0]])
+            True
+
+        The boundary conditions of a higher-order `DiffusionTerm` add
+        zero to its matrix this way.
+
+            >>> from fipy import CellVariable, DiffusionTerm, NthOrderBoundaryCondition
+            >>> from fipy.solvers.scipy import LinearLUSolver
+            >>> class _DiaLUSolver(LinearLUSolver):
+            ...     def _meshMatrixClass(self, mesh):
+            ...         return _ScipyDiaMeshMatrix
+            >>> mesh = Grid1D(nx=10)
+            >>> var = CellVariable(mesh=mesh)
+            >>> var.constrain(0., mesh.facesLeft)
+            >>> var.constrain(1., mesh.facesRight)
+            >>> BCs = (NthOrderBoundaryCondition(faces=mesh.facesLeft, value=0, order=2),
+            ...        NthOrderBoundaryCondition(faces=mesh.facesRight, value=0, order=2))
+            >>> DiffusionTerm(coeff=(1., 1.)).solve(var=var, boundaryConditions=BCs,
+            ...                                     solver=_DiaLUSolver())
+            >>> print numerix.allclose(var, mesh.x / 10., atol=1e-10)
+            True
+        """
+        if isinstance(other, _ScipyDiaMeshMatrix) and other._size == self._size:
+            k = self._diagonalIndices(other._offsets)
+            self._data[k] += sign * other._data
+            return self
+        elif type(other) in [float, int]:
+            # `dia_matrix.nnz` counts the padding of the diagonals, so the
+            # entries are found in `_data` itself
+            if other != 0:
+                self._data[self._data != 0] += sign * other
+            return self
+        else:
+            return _ScipyMeshMatrix._iadd(self, other, sign=sign)
+
+    def __getitem__(self, index):
+        return _ScipyMatrix(matrix=self.matrix.tocsr())[index]
+
+    def take(self, id1, id2):
+        id1 = numerix.asarray(id1, dtype=numerix.INT_DTYPE)
+        id2 = numerix.asarray(id2, dtype=numerix.INT_DTYPE)
+        offsets = id2 - id1
+        k = numerix.searchsorted(self._offsets, offsets)
+        k = numerix.minimum(k, max(len(self._offsets) - 1, 0))
+        if len(self._offsets) == 0:
+            return numerix.zeros(offsets.shape, 'd')
+        present = numerix.take(self._offsets, k) == offsets
+        return numerix.where(present, self._data[k, id2], 0.)
+
+    def put(self, vector, id1, id2):
+        """
+        Put elements of `vector` at positions of the matrix corresponding to (`id1`, `id2`)
+
+            >>> from fipy import Grid1D
+            >>> L = _ScipyDiaMeshMatrix(mesh=Grid1D(nx=3))
+            >>> L.addAt([1., 1.], [0, 1], [0, 2])
+            >>> L.put([3., 4.], [0, 2], [0, 1])
+            >>> print L
+             3.000000      ---        ---    
+                ---        ---     1.000000  
+                ---     4.000000      ---    
+        """
+        vector = numerix.asarray(vector, dtype='d')
+        self._appendTriplets(vector - self.take(id1, id2), id1, id2)
+
+    def putDiagonal(self, vector):
+        if type(vector) in [int, float]:
+            vector = numerix.repeat(vector, self._size)
+
+        ids = numerix.arange(len(vector))
+        self.put(vector, ids, ids)
+
+    def takeDiagonal(self):
+        ids = numerix.arange(self._size)
+        return self.take(ids, ids)
+
 class _ScipyIdentityMatrix(_ScipyMatrixFromShape):
     """
     Represents a sparse identity matrix for scipy.
@@ -53,6 +53,11 @@ class _SparseMatrix(object):
     numpyArray = property()
     _shape     = property()
 
+    @property
+    def _nnz(self):
+        """The number of stored entries, or `None` if unknown."""
+        return None
+
     __array_priority__ = 100.0
 
     def __array_wrap(self, arr, context=None):
@@ -150,9 +155,62 @@ class _SparseMatrix(object):
     def addAtDiagonal(self, vector):
         pass
 
+    def addAtInteriorFaces(self, cell1diag, cell1offdiag, cell2offdiag, cell2diag, id1, id2):
+        """
+        Add the coupling across the interior faces of the mesh, between
+        the cells `id1` and the cells `id2` on either side of each face.
+        `id1` and `id2` are shaped by `Term._reshapeIDs()`.
+
+        :Parameters:
+          - `cell1diag`: Added at (`id1`, `id1`).
+          - `cell1offdiag`: Added at (`id1`, `id2`).
+          - `cell2offdiag`: Added at (`id2`, `id1`).
+          - `cell2diag`: Added at (`id2`, `id2`).
+        """
+        self.addAt(cell1diag, id1.ravel(), id1.swapaxes(0,1).ravel())
+        self.addAt(cell1offdiag, id1.ravel(), id2.swapaxes(0,1).ravel())
+        self.addAt(cell2offdiag, id2.ravel(), id1.swapaxes(0,1).ravel())
+        self.addAt(cell2diag, id2.ravel(), id2.swapaxes(0,1).ravel())
+
     def exportMmf(self, filename):
         pass
 
+    # the `fipy.matrices.blockLayout._BlockLayout` of the matrix of
+    # coupled equations
+    _blockLayout = None
+
+    # whether `_entries()` is available, so that the blocks of coupled
+    # equations can be assembled by `_addBlock()`
+    _assemblesBlocks = False
+
+    def _entries(self):
+        """Return the values, rows and columns of the stored entries,
+        possibly with repeats to be summed.
+        """
+        raise NotImplementedError
+
+    def _addBlock(self, block, rows, cols):
+        """Add the entries of the matrix `block` to this matrix, with
+        row ``i`` and column ``j`` of `block` going to row ``rows[i]``
+        and column ``cols[j]`` of this matrix.
+        """
+        values, id1, id2 = block._entries()
+        self.addAt(values, numerix.take(rows, id1), numerix.take(cols, id2))
+
+    def _sameValues(self, other):
+        """Whether `other` is known to hold the same entries as this
+        matrix. Backends that cannot tell cheaply answer `False`.
+        """
+        return False
+
+    _sparsityPattern = None
+
+    def _storeSparsityPattern(self):
+        """Record the structure of this assembled matrix in `_sparsityPattern`
+        (see `fipy.matrices.sparsityPattern`) for reuse by later assemblies.
+        """
+        pass
+
 ##     def __array__(self):
 ##      shape = self._shape
 ##      indices = numerix.indices(shape)
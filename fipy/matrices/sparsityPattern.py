@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "sparsityPattern.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.tools import numerix
+
+class _SparsityPattern(object):
+    """
+    Symbolic structure of the matrix assembled for one `Term` tree and
+    one set of solution variables.
+
+    The sparsity pattern depends only on the mesh and the structure of
+    the `Term` tree, so it is recorded by the matrix backend after the
+    first assembly and reused by every later sweep and time step.
+    Each backend stores what it is able to reuse:
+
+      - `_ScipyMatrix` stores the CSR `indptr` and `indices` arrays and
+        the `scatter` map from each accumulated (row, column, value)
+        triplet into the CSR data array, so that later assemblies only
+        sum the values. It recognizes the pattern again by the
+        `tripletLengths` of the arrays of triplets added.
+      - `_ScipyDiaMeshMatrix` stores the `offsets` of its diagonals,
+        which later assemblies allocate up front.
+      - `_PysparseMatrix` and `_TrilinosMatrix` store the number of
+        nonzeros `nnz` and the widest row `bandwidth`, which are used to
+        preallocate the matrices of later assemblies.
+
+    Every backend also stores the `shape` of the matrix.
+    """
+    def __init__(self, vars, boundaryConditions=()):
+        """
+        :Parameters:
+          - `vars`: The solution variables the pattern was assembled for.
+          - `boundaryConditions`: The boundary conditions applied during
+            assembly.
+        """
+        self.vars = tuple(vars)
+        self.boundaryConditions = tuple(boundaryConditions)
+
+        self.shape = None
+
+        self.indptr = None
+        self.indices = None
+        self.scatter = None
+        self.tripletLengths = None
+
+        self.offsets = None
+
+        self.nnz = None
+        self.bandwidth = None
+
+    def _sameStructure(self, other):
+        """
+        Whether the matrices assembled for `self` and for `other`, which
+        may belong to different `Term` trees, have the same sparsity
+        structure, as far as the backend recorded it.
+
+        Matrices of different shapes never do, even when their
+        diagonals lie at the same offsets.
+
+            >>> a, b = _SparsityPattern(vars=()), _SparsityPattern(vars=())
+            >>> a.shape, a.offsets = (10, 10), numerix.array([-1, 0, 1])
+            >>> b.shape, b.offsets = (5, 5), numerix.array([-1, 0, 1])
+            >>> print a._sameStructure(b)
+            False
+            >>> b.shape = (10, 10)
+            >>> print a._sameStructure(b)
+            True
+        """
+        if other is self:
+            return True
+        elif self.shape is None or self.shape != other.shape:
+            return False
+        elif self.indptr is not None and other.indptr is not None:
+            return (numerix.array_equal(self.indptr, other.indptr)
+                    and numerix.array_equal(self.indices, other.indices))
+        elif self.offsets is not None and other.offsets is not None:
+            return numerix.array_equal(self.offsets, other.offsets)
+        else:
+            return (self.nnz is not None
+                    and (self.nnz, self.bandwidth) == (other.nnz, other.bandwidth))
+
+    def _matches(self, vars, boundaryConditions):
+        return (len(vars) == len(self.vars)
+                and len(boundaryConditions) == len(self.boundaryConditions)
+                and all([a is b for a, b in zip(vars, self.vars)])
+                and all([a is b for a, b in zip(boundaryConditions, self.boundaryConditions)]))
+
+def SparsityPatternMatrix(SparseMatrix, pattern):
+    """
+    Used by `Term._prepareLinearSystem()` so that every matrix built for a
+    `Term` tree can consult the `_SparsityPattern` recorded by previous
+    assemblies.
+    """
+
+    class SparsityPatternMatrixClass(SparseMatrix):
+        _sparsityPattern = pattern
+
+    return SparsityPatternMatrixClass
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -43,12 +43,14 @@ if solver == 'trilinos':
 elif solver == 'no-pysparse':
     docTestModuleNames = ('trilinosMatrix',)
 elif solver == 'scipy' or solver == 'pyamg':
-    docTestModuleNames = ('scipyMatrix',)
+    docTestModuleNames = ('scipyMatrix', 'matrixFreeMatrix')
 elif solver == 'pysparse':
     docTestModuleNames = ('pysparseMatrix',)
 else:
     raise ImportError, 'Unknown solver package %s' % solver
 
+docTestModuleNames += ('blockLayout', 'sparsityPattern')
+
 def _suite():
     return _LateImportDocTestSuite(docTestModuleNames=docTestModuleNames, base=__name__)
 
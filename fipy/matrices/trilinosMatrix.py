@@ -37,6 +37,8 @@ __docformat__ = 'restructuredtext'
 
 __all__ = []
 
+import weakref
+
 from PyTrilinos import Epetra
 from PyTrilinos import EpetraExt
 
@@ -300,6 +302,10 @@ class _TrilinosMatrix(_SparseMatrix):
         N = self.matrix.NumGlobalRows()
         return (N,N)
 
+    @property
+    def _nnz(self):
+        return self.matrix.NumGlobalNonzeros()
+
 
 
     def put(self, vector, id1, id2):
@@ -520,6 +526,17 @@ class _TrilinosMatrix(_SparseMatrix):
 
             return DistMatrix
 
+    def _storeSparsityPattern(self):
+        """Record the widest row, so that later assemblies of the same
+        system preallocate their `Epetra.CrsMatrix` rows.
+        """
+        if self._sparsityPattern is not None:
+            self.fillComplete()
+            self._sparsityPattern.shape = (self.matrix.NumGlobalRows(),
+                                           self.matrix.NumGlobalCols())
+            self._sparsityPattern.nnz = self.matrix.NumGlobalNonzeros()
+            self._sparsityPattern.bandwidth = self.matrix.MaxNumEntries()
+
     def fillComplete(self):
         if not self.matrix.Filled():
             self.matrix.FillComplete(self.domainMap, self.rangeMap)
@@ -541,7 +558,11 @@ class _TrilinosMatrixFromShape(_TrilinosMatrix):
           - `map`: The Epetra `Map` for the rows that this processor holds
         """
         size = max(rows, cols)
-        if sizeHint is not None and bandwidth == 0:
+        if (sizeHint is None and bandwidth == 0
+            and self._sparsityPattern is not None
+            and self._sparsityPattern.bandwidth is not None):
+            bandwidth = self._sparsityPattern.bandwidth
+        elif sizeHint is not None and bandwidth == 0:
             bandwidth = (sizeHint + size - 1) / (size or 1)
         else:
             bandwidth = bandwidth
@@ -588,9 +609,7 @@ class _TrilinosMeshMatrix(_TrilinosMatrixFromShape):
         self.numberOfVariables = numberOfVariables
         self.numberOfEquations = numberOfEquations
 
-        comm = mesh.communicator.epetra_comm
-        rowMap = Epetra.Map(-1, list(self._globalNonOverlappingRowIDs), 0, comm)
-        colMap = Epetra.Map(-1, list(self._globalOverlappingColIDs), 0, comm)
+        rowMap, colMap, self._importer = self._getMaps()
         domainMap = rowMap
 
         _TrilinosMatrixFromShape.__init__(self,
@@ -602,6 +621,42 @@ class _TrilinosMeshMatrix(_TrilinosMatrixFromShape):
                                  colMap=colMap,
                                  domainMap=domainMap)
 
+    def _getMaps(self):
+        """
+        Return the row and column `Epetra.Map` objects for this matrix and
+        the `Epetra.Import` from its (non-overlapping) domain to its
+        (overlapping) columns.
+
+        Building them involves global communication, so they are built
+        once for each combination of mesh, number of variables and number
+        of equations, kept on the mesh, and shared by every matrix and
+        solver that needs them.
+
+            >>> from fipy import Grid1D
+            >>> mesh = Grid1D(nx=5)
+            >>> L1 = _TrilinosMeshMatrix(mesh=mesh)
+            >>> L2 = _TrilinosMeshMatrix(mesh=mesh)
+            >>> print L1.colMap is L2.colMap, L1._importer is L2._importer
+            True True
+            >>> print _TrilinosMeshMatrix(mesh=mesh, numberOfVariables=2).colMap is L1.colMap
+            False
+        """
+        key = (self.numberOfVariables, self.numberOfEquations)
+
+        if not hasattr(self.mesh, '_epetraMaps'):
+            self.mesh._epetraMaps = {}
+
+        maps = self.mesh._epetraMaps.get(key)
+
+        if maps is None:
+            comm = self.mesh.communicator.epetra_comm
+            rowMap = Epetra.Map(-1, list(self._globalNonOverlappingRowIDs), 0, comm)
+            colMap = Epetra.Map(-1, list(self._globalOverlappingColIDs), 0, comm)
+            maps = (rowMap, colMap, Epetra.Import(colMap, rowMap))
+            self.mesh._epetraMaps[key] = maps
+
+        return maps
+
     def _cellIDsToGlobalRowIDs(self, IDs):
          N = len(IDs)
          M = self.numberOfEquations
@@ -660,15 +715,79 @@ class _TrilinosMeshMatrix(_TrilinosMatrixFromShape):
         self.finalize()
         return self
 
+    def _getStencilTables(self):
+        """
+        Return the local-to-global translation of overlapping rows and
+        columns, a mask of the local overlapping rows that this processor
+        owns, and a dictionary of stencils already derived from them.
+
+        Like the maps, these are kept on the mesh for each combination of
+        number of variables and number of equations, so every term and
+        boundary condition assembling on the mesh shares them.
+
+            >>> from fipy import Grid1D
+            >>> mesh = Grid1D(nx=5)
+            >>> L1 = _TrilinosMeshMatrix(mesh=mesh)
+            >>> L2 = _TrilinosMeshMatrix(mesh=mesh)
+            >>> print L1._getStencilTables() is L2._getStencilTables()
+            True
+        """
+        key = (self.numberOfVariables, self.numberOfEquations)
+
+        if not hasattr(self.mesh, '_trilinosStencilTables'):
+            self.mesh._trilinosStencilTables = {}
+
+        tables = self.mesh._trilinosStencilTables.get(key)
+
+        if tables is None:
+            rowIDs = self._globalOverlappingRowIDs
+            colIDs = self._globalOverlappingColIDs
+            owned = numerix.in1d(rowIDs, self._globalNonOverlappingRowIDs)
+            tables = (rowIDs, colIDs, owned, {})
+            self.mesh._trilinosStencilTables[key] = tables
+
+        return tables
+
     def _getStencil(self, id1, id2):
-        id1 = self._globalOverlappingRowIDs[id1]
-        id2 = self._globalOverlappingColIDs[id2]
+        """
+        Translate local overlapping row and column indices to the global
+        indices of the rows owned by this processor.
+
+        The translation is a lookup in the tables from
+        `_getStencilTables()`, so no search is done per call. The result
+        for a given pair of index arrays is also remembered for as long
+        as both arrays are alive, so recurring patterns, such as the
+        adjacent cells of a boundary condition, are only translated
+        once. Index arrays must not be modified in place after they have
+        been passed here.
+
+            >>> from fipy import Grid1D
+            >>> L = _TrilinosMeshMatrix(mesh=Grid1D(nx=5))
+            >>> ids = numerix.array((0, 2, 4))
+            >>> id1, id2, mask = L._getStencil(ids, ids)
+            >>> print numerix.allequal(id1, L._globalOverlappingRowIDs[ids][mask])
+            True
+            >>> print L._getStencil(ids, ids) is L._getStencil(ids, ids)
+            True
+        """
+        rowIDs, colIDs, owned, stencils = self._getStencilTables()
+
+        key = (id(id1), id(id2))
+        cached = stencils.get(key)
+        if cached is not None and cached[0]() is id1 and cached[1]() is id2:
+            return cached[2]
+
+        mask = owned[id1]
+        stencil = (rowIDs[id1][mask], colIDs[id2][mask], mask)
 
-        mask = numerix.in1d(id1, self._globalNonOverlappingRowIDs)
-        id1 = id1[mask]
-        id2 = id2[mask]
+        if isinstance(id1, numerix.ndarray) and isinstance(id2, numerix.ndarray):
+            def forget(ref, key=key):
+                stencils.pop(key, None)
+            stencils[key] = (weakref.ref(id1, forget),
+                             weakref.ref(id2, forget),
+                             stencil)
 
-        return id1, id2, mask
+        return stencil
 
     def _globalNonOverlapping(self, vector, id1, id2):
         """Transforms and subsets local overlapping values and coordinates to global non-overlapping
@@ -713,8 +832,7 @@ class _TrilinosMeshMatrix(_TrilinosMatrixFromShape):
 
         overlapping_result = Epetra.Vector(self.colMap)
         overlapping_result.Import(nonoverlapping_result,
-                                  Epetra.Import(self.colMap,
-                                                self.domainMap),
+                                  self._importer,
                                   Epetra.Insert)
 
         return overlapping_result
@@ -795,8 +913,7 @@ class _TrilinosMeshMatrix(_TrilinosMatrixFromShape):
                     if other_map.SameAs(self.colMap):
                         overlapping_result = Epetra.Vector(self.colMap)
                         overlapping_result.Import(nonoverlapping_result,
-                                                  Epetra.Import(self.colMap,
-                                                                self.domainMap),
+                                                  self._importer,
                                                   Epetra.Insert)
 
                         return overlapping_result
@@ -84,6 +84,10 @@ class CylindricalNonUniformGrid1D(NonUniformGrid1D):
                                                           *args,
                                                           **kwargs)
 
+        # the geometry is that of the vertices before they are shifted
+        # by `origin` below
+        self._pinGeometry()
+
         self.vertexCoords += origin
         self.args['origin'] = origin
 
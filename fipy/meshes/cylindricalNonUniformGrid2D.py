@@ -60,6 +60,10 @@ class CylindricalNonUniformGrid2D(NonUniformGrid2D):
         super(CylindricalNonUniformGrid2D, self).__init__(dx=dx, dy=dy, nx=nx, ny=ny, overlap=overlap,
                         communicator=communicator, *args, **kwargs)
 
+        # the geometry is that of the vertices before they are shifted
+        # by `origin` below
+        self._pinGeometry()
+
         self._faceAreas *= self.faceCenters[0]
 
         self._scaledFaceAreas = self._scale['area'] * self._faceAreas
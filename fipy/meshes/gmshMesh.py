@@ -39,6 +39,7 @@
 
 __docformat__ = 'restructuredtext'
 
+import hashlib
 import os
 from subprocess import Popen, PIPE
 import sys
@@ -82,6 +83,16 @@ def parprint(str):
         if parallelComm.procID == 0:
             print >> sys.stderr, str
 
+# number of nodes of each type of MSH element
+_nodesPerElement = { 1: 2,  2: 3,  3: 4,  4: 4,  5: 8,  6: 6,  7: 5,  8: 3,
+                     9: 6, 10: 9, 11: 10, 12: 27, 13: 18, 14: 14, 15: 1, 16: 8,
+                    17: 20, 18: 15, 19: 13, 20: 9, 21: 10, 22: 12, 23: 15, 24: 15,
+                    25: 21, 26: 4, 27: 5, 28: 6, 29: 20, 30: 35, 31: 56, 92: 64,
+                    93: 125}
+
+# bytes of ASCII lines, or number of binary records, read at once
+_chunkSize = 2**24
+
 class GmshException(Exception):
     pass
 
@@ -120,6 +131,92 @@ def _gmshVersion(communicator=parallelComm):
     version = gmshVersion(communicator) or "0.0"
     return StrictVersion(version)
 
+def _gmshCacheDirectory():
+    """
+    The directory in which meshes generated by Gmsh are kept, or `None`
+    if they are not to be kept.  Meshes are only kept when the
+    `FIPY_GMSH_CACHE` environment variable names a directory.
+
+        >>> saved = os.environ.pop('FIPY_GMSH_CACHE', None)
+        >>> print _gmshCacheDirectory()
+        None
+        >>> directory = tempfile.mkdtemp()
+        >>> os.environ['FIPY_GMSH_CACHE'] = os.path.join(directory, 'gmsh')
+        >>> print _gmshCacheDirectory() == os.path.join(directory, 'gmsh')
+        True
+        >>> import shutil
+        >>> shutil.rmtree(directory)
+        >>> if saved is None:
+        ...     del os.environ['FIPY_GMSH_CACHE']
+        ... else:
+        ...     os.environ['FIPY_GMSH_CACHE'] = saved
+    """
+    directory = os.environ.get('FIPY_GMSH_CACHE', '')
+    if not directory:
+        return None
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            pass
+    if not os.access(directory, os.W_OK):
+        return None
+    return directory
+
+def _gmshCacheKey(geoFile, gmshFlags, version, order, backgroundFile=None):
+    r"""
+    Hash of everything that determines the mesh Gmsh generates.
+
+        >>> fd, geoFile = tempfile.mkstemp(suffix='.geo')
+        >>> os.write(fd, "Point(1) = {0, 0, 0};\n")
+        22
+        >>> os.close(fd)
+        >>> key = _gmshCacheKey(geoFile, ["-2", "-nopopup"], "2.8.4", 1)
+        >>> print key == _gmshCacheKey(geoFile, ["-2", "-nopopup"], "2.8.4", 1)
+        True
+        >>> print key == _gmshCacheKey(geoFile, ["-3", "-nopopup"], "2.8.4", 1)
+        False
+        >>> print key == _gmshCacheKey(geoFile, ["-2", "-nopopup"], "2.10.1", 1)
+        False
+        >>> os.remove(geoFile)
+    """
+    sha = hashlib.sha1()
+    f = open(geoFile, 'r')
+    sha.update(f.read())
+    f.close()
+    for part in [" ".join(gmshFlags), str(version), str(order)]:
+        sha.update("\0")
+        sha.update(part)
+    if backgroundFile is not None:
+        sha.update("\0")
+        f = open(backgroundFile, 'r')
+        sha.update(f.read())
+        f.close()
+    return sha.hexdigest()
+
+def _storeCachedMSHFile(directory, key, mshFile, gmshOutput):
+    """
+    Keep `mshFile` and the output of Gmsh under `key`, and return the
+    name of the kept file.
+
+    The output is published first, so that any process that finds the
+    `.msh` file also finds its output.
+    """
+    cached = os.path.join(directory, key + ".msh")
+    f = open(mshFile, 'rb')
+    mshContent = f.read()
+    f.close()
+    for content, suffix in ((gmshOutput, ".out"),
+                            (mshContent, ".msh")):
+        # write under a temporary name, so that parallel processes never
+        # read a partially written file
+        fd, temporary = tempfile.mkstemp(suffix=suffix, dir=directory)
+        os.write(fd, content)
+        os.close(fd)
+        os.rename(temporary, os.path.join(directory, key + suffix))
+    os.unlink(mshFile)
+    return cached
+
 def openMSHFile(name, dimensions=None, coordDimensions=None, communicator=parallelComm, order=1, mode='r', background=None):
     """Open a Gmsh MSH file
 
@@ -213,23 +310,50 @@ def openMSHFile(name, dimensions=None, coordDimensions=None, communicator=parall
                 gmshFlags += ["-bgm", bgmf]
 
             if communicator.procID == 0:
-                (f, mshFile) = tempfile.mkstemp('.msh')
-                os.close(f)
-                fileIsTemporary = True
-
-                while True:
-                    p = Popen(["gmsh", geoFile] + gmshFlags + ["-o", mshFile],
-                              stdout=PIPE)
-
+                cacheDirectory = _gmshCacheDirectory()
+                if cacheDirectory is not None:
+                    if background is not None:
+                        key = _gmshCacheKey(geoFile=geoFile, gmshFlags=gmshFlags[:-2],
+                                            version=version, order=order, backgroundFile=bgmf)
+                    else:
+                        key = _gmshCacheKey(geoFile=geoFile, gmshFlags=gmshFlags,
+                                            version=version, order=order)
+                    mshFile = os.path.join(cacheDirectory, key + ".msh")
+
+                gmshOutput = None
+                if cacheDirectory is not None and os.path.exists(mshFile):
+                    # this geometry has been meshed before
                     try:
-                        gmshOutput, gmshError = p.communicate()
-                        break
+                        f = open(os.path.join(cacheDirectory, key + ".out"), 'r')
+                        gmshOutput = f.read()
+                        f.close()
                     except IOError:
-                        # some weird conflict with things like PyQT can cause
-                        # this to fail sometimes.
-                        # See http://thread.gmane.org/gmane.comp.python.enthought.devel/29362
+                        # the output has gone missing, so mesh it again
                         pass
 
+                if gmshOutput is None:
+                    (f, mshFile) = tempfile.mkstemp('.msh')
+                    os.close(f)
+                    fileIsTemporary = True
+
+                    while True:
+                        p = Popen(["gmsh", geoFile] + gmshFlags + ["-o", mshFile],
+                                  stdout=PIPE)
+
+                        try:
+                            gmshOutput, gmshError = p.communicate()
+                            break
+                        except IOError:
+                            # some weird conflict with things like PyQT can cause
+                            # this to fail sometimes.
+                            # See http://thread.gmane.org/gmane.comp.python.enthought.devel/29362
+                            pass
+
+                    if cacheDirectory is not None and p.returncode == 0:
+                        mshFile = _storeCachedMSHFile(directory=cacheDirectory, key=key,
+                                                      mshFile=mshFile, gmshOutput=gmshOutput)
+                        fileIsTemporary = False
+
                 if background is not None:
                     os.unlink(bgmf)
 
@@ -710,6 +834,17 @@ class MSHFile(GmshFile):
                 cellGlobalIDMap, ghostCellGlobalIDMap.
         """
         self.version, self.fileType, self.dataSize = self._getMetaData()
+        if self.fileType == 1:
+            # binary; the integer 1 follows the format, in the byte
+            # order of the file
+            self._seekForHeader("MeshFormat")
+            self.fileobj.readline()
+            one = nx.fromstring(self.fileobj.read(4), dtype='<i4')[0]
+            self.fileobj.seek(0)
+            if one == 1:
+                self._byteOrder = '<'
+            else:
+                self._byteOrder = '>'
         self.nodesPath = self._isolateData("Nodes")
         self.elemsPath = self._isolateData("Elements")
         try:
@@ -719,23 +854,14 @@ class MSHFile(GmshFile):
 
         try:
             if self.dimensions is None:
-                nodesFile = open(self.nodesPath, 'r')
-                nodesFile.readline() # skip number of nodes
-
                 # We assume we have a 2D file unless we find a node
                 # with a non-zero Z coordinate
                 self.dimensions = 2
-                for node in nodesFile:
-                    line   = node.split()
-
-                    newVert = [float(x) for x in line]
-
-                    if newVert[2] != 0.0:
+                for IDs, coords in self._readNodes():
+                    if (coords[..., 2] != 0.).any():
                         self.dimensions = 3
                         break
 
-                nodesFile.close()
-
             self.coordDimensions = self.coordDimensions or self.dimensions
 
             # we need a conditional here so we don't pick up 2D shapes in 3D
@@ -804,7 +930,8 @@ class MSHFile(GmshFile):
 
             parprint("Recovering coords.")
             parprint("numcells %d" % numCellsTotal)
-            vertexCoords, vertIDtoIdx = self._vertexCoordsAndMap(cellsToGmshVerts)
+            vertexCoords, vertIDtoIdx = self._vertexCoordsAndMap(nx.concatenate((cellsData.allNodes,
+                                                                                 ghostsData.allNodes)))
 
             # translate Gmsh IDs to `vertexCoord` indices
             cellsToVertIDs = self._translateNodesToVertices(cellsToGmshVerts,
@@ -986,7 +1113,7 @@ class MSHFile(GmshFile):
 
         self.fileobj.write("$EndElementData\n")
 
-    def _vertexCoordsAndMap(self, cellsToGmshVerts):
+    def _vertexCoordsAndMap(self, gmshVerts):
         """
         Returns `vertexCoords` and mapping from Gmsh ID to `vertexCoords`
         indices (same as in MSHFile).
@@ -994,9 +1121,7 @@ class MSHFile(GmshFile):
         Unlike parent, doesn't use genfromtxt
         because we want to avoid loading the entire msh file into memory.
         """
-        allVerts     = [v for c in cellsToGmshVerts for v in c] # flatten
-        allVerts     = nx.unique(nx.array(allVerts, dtype=nx.INT_DTYPE)) # remove dups
-        allVerts     = nx.sort(allVerts)
+        allVerts     = nx.unique(gmshVerts) # remove dups and sort
         maxVertIdx   = allVerts[-1] + 1 # add one to offset zero
         vertGIDtoIdx = nx.ones(maxVertIdx, 'l') * -1 # gmsh ID -> vertexCoords idx
         vertexCoords = nx.empty((len(allVerts), self.coordDimensions))
@@ -1005,30 +1130,174 @@ class MSHFile(GmshFile):
         # establish map. This works because allVerts is a sorted set.
         vertGIDtoIdx[allVerts] = nx.arange(len(allVerts))
 
-        nodesFile = open(self.nodesPath, 'r')
-        nodesFile.readline() # skip number of nodes
-
-        # now we walk through node file with a sorted unique list of vertices
-        # in hand. When we encounter 0th element in `allVerts`, save it
-        # to `vertexCoords` then pop its ID off `allVerts`.
-        for node in nodesFile:
-            line   = node.split()
-            nodeID = int(line[0])
-
-            if nodeID == allVerts[nodeCount]:
-                newVert = [float(x) for x in line[1:self.coordDimensions+1]]
-                vertexCoords[nodeCount,:] = nx.array(newVert)
-                nodeCount += 1
+        # keep the nodes we need from each chunk of the node file
+        for IDs, coords in self._readNodes():
+            inRange = IDs < maxVertIdx
+            indices = vertGIDtoIdx[IDs[inRange]]
+            needed = indices >= 0
+            vertexCoords[indices[needed]] = coords[inRange][needed, :self.coordDimensions]
+            nodeCount += needed.sum()
 
             if len(allVerts) == nodeCount:
                 break
 
-        nodesFile.close()
-
         # transpose for FiPy
         transCoords = vertexCoords.swapaxes(0,1)
         return transCoords, vertGIDtoIdx
 
+    def _readNodes(self):
+        """
+        Iterate over the $Nodes section in chunks, yielding the Gmsh IDs
+        of the nodes and their coordinates.
+        """
+        if self.fileType == 1:
+            nodesFile = open(self.nodesPath, 'rb')
+        else:
+            nodesFile = open(self.nodesPath, 'r')
+
+        try:
+            for IDs, coords in self._readNodeChunks(nodesFile):
+                yield IDs, coords
+        finally:
+            nodesFile.close()
+
+    def _readNodeChunks(self, nodesFile):
+        if self.fileType == 1:
+            numNodes = int(nodesFile.readline())
+            record = nx.dtype([('ID', self._byteOrder + 'i4'),
+                               ('coords', self._byteOrder + 'f%d' % self.dataSize, (3,))])
+            while numNodes > 0:
+                nodes = nx.fromfile(nodesFile, dtype=record, count=min(numNodes, _chunkSize))
+                numNodes -= len(nodes)
+                yield nodes['ID'].astype('l'), nodes['coords'].astype(float)
+        else:
+            nodesFile.readline() # skip number of nodes
+            while True:
+                lines = nodesFile.readlines(_chunkSize)
+                if len(lines) == 0:
+                    break
+                nodes = nx.fromstring("".join(lines), dtype=float, sep=" ").reshape((-1, 4))
+                yield nodes[..., 0].astype('l'), nodes[..., 1:]
+
+    def _readElements(self):
+        r"""
+        Iterate over the $Elements section, yielding blocks of elements
+        of the same type with the same number of tags as 2-D arrays. Each
+        row holds the Gmsh ID, the type and the number of tags of an
+        element, followed by its tags and its nodes.
+
+        ASCII and binary files give the same mesh
+
+            >>> import struct
+            >>> nodes = ((0., 0.), (1., 0.), (1., 1.), (0., 1.))
+            >>> fd, asciiName = tempfile.mkstemp(suffix='.msh')
+            >>> f = os.fdopen(fd, 'w')
+            >>> f.write(dedent('''\
+            ...     $MeshFormat
+            ...     2.2 0 8
+            ...     $EndMeshFormat
+            ...     $Nodes
+            ...     4
+            ...     '''))
+            >>> f.write("".join(["%d %g %g 0\n" % (i + 1, x, y)
+            ...                  for i, (x, y) in enumerate(nodes)]))
+            >>> f.write(dedent('''\
+            ...     $EndNodes
+            ...     $Elements
+            ...     3
+            ...     1 1 2 1 1 1 2
+            ...     2 2 2 1 1 1 2 3
+            ...     3 2 2 1 1 1 3 4
+            ...     $EndElements
+            ...     '''))
+            >>> f.close()
+            >>> fd, binaryName = tempfile.mkstemp(suffix='.msh')
+            >>> f = os.fdopen(fd, 'wb')
+            >>> f.write("$MeshFormat\n2.2 1 8\n" + struct.pack('<i', 1) + "\n$EndMeshFormat\n")
+            >>> f.write("$Nodes\n4\n")
+            >>> f.write("".join([struct.pack('<iddd', i + 1, x, y, 0.)
+            ...                  for i, (x, y) in enumerate(nodes)]))
+            >>> f.write("\n$EndNodes\n$Elements\n3\n")
+            >>> f.write(struct.pack('<3i', 1, 1, 2) + struct.pack('<5i', 1, 1, 1, 1, 2))
+            >>> f.write(struct.pack('<3i', 2, 2, 2) + struct.pack('<12i', 2, 1, 1, 1, 2, 3,
+            ...                                                      3, 1, 1, 1, 3, 4))
+            >>> f.write("\n$EndElements\n")
+            >>> f.close()
+
+            >>> asciiFile = MSHFile(filename=asciiName, dimensions=2, communicator=serialComm)
+            >>> binaryFile = MSHFile(filename=binaryName, dimensions=2, communicator=serialComm)
+            >>> asciiMesh = asciiFile.read()
+            >>> binaryMesh = binaryFile.read()
+            >>> print asciiMesh[2]
+            [[0 2]
+             [1 3]
+             [2 4]]
+            >>> print asciiMesh[3], binaryMesh[3]
+            [0, 1] [0, 1]
+            >>> print [nx.allclose(a, b) for a, b in zip(asciiMesh[:3], binaryMesh[:3])]
+            [True, True, True]
+
+            >>> asciiFile.close()
+            >>> binaryFile.close()
+            >>> os.remove(asciiName)
+            >>> os.remove(binaryName)
+        """
+        if self.fileType == 1:
+            elemsFile = open(self.elemsPath, 'rb')
+        else:
+            elemsFile = open(self.elemsPath, 'r')
+
+        try:
+            for block in self._readElementBlocks(elemsFile):
+                yield block
+        finally:
+            elemsFile.close()
+
+    def _readElementBlocks(self, elemsFile):
+        if self.fileType == 1:
+            numElements = int(elemsFile.readline())
+            intType = self._byteOrder + 'i4'
+            while numElements > 0:
+                elemType, numFollow, numTags = nx.fromfile(elemsFile, dtype=intType, count=3)
+                width = 1 + numTags + _nodesPerElement[elemType]
+                numElements -= numFollow
+                while numFollow > 0:
+                    count = min(numFollow, _chunkSize)
+                    block = nx.fromfile(elemsFile, dtype=intType, count=count * width)
+                    block = block.reshape((count, width)).astype('l')
+                    numFollow -= count
+                    # insert type and number of tags, as in the ASCII format
+                    yield nx.concatenate((block[..., :1],
+                                          nx.resize(nx.array((elemType, numTags), 'l'), (count, 2)),
+                                          block[..., 1:]), axis=1)
+        else:
+            elemsFile.readline() # skip number of elements
+            while True:
+                lines = elemsFile.readlines(_chunkSize)
+                if len(lines) == 0:
+                    break
+                tokens = nx.fromstring("".join(lines), dtype='l', sep=" ")
+                start = 0
+                while start < len(tokens):
+                    # rows are aligned up to the first that differs in
+                    # type or in number of tags
+                    elemType, numTags = tokens[start + 1], tokens[start + 2]
+                    width = 3 + numTags + _nodesPerElement[elemType]
+                    available = (len(tokens) - start) // width
+                    window = min(available, 4096)
+                    while True:
+                        block = tokens[start:start + window * width].reshape((window, width))
+                        same = (block[..., 1] == elemType) & (block[..., 2] == numTags)
+                        if not same.all():
+                            count = same.argmin()
+                            break
+                        elif window == available:
+                            count = window
+                            break
+                        window = min(available, 2 * window)
+                    yield block[:count]
+                    start += count * width
+
     def _parseElementFile(self):
         """
         Return three objects, the first for non-ghost cells, the second for
@@ -1037,27 +1306,11 @@ class MSHFile(GmshFile):
         All nastiness concerning ghost cell
         calculation is consolidated here: if we were ever to need to CALCULATE
         GHOST CELLS OURSELVES, the only code we'd have to change is in here.
-        """
-
-        def _parseTags(offset, currLineInts):
-            if offset == -1:
-                # if first valid shape
-                offset = currLineInts[0]
-
-            numTags = currLineInts[2]
-            tags    = currLineInts[3:(3+numTags)]
-
-            # the partition tags for don't seem to always be present
-            # and don't always make much sense when they are
-
-            if len(tags) >= 2:
-                physicalEntity = tags.pop(0)
-                geometricalEntity = tags.pop(0)
-            else:
-                physicalEntity = geometricalEntity = -1
-
-            return offset, tags, physicalEntity, geometricalEntity
 
+        The elements are read in blocks of the same type, and only the
+        cells of this processor's partition, and its ghost cells, are
+        kept.
+        """
 
         cellsData = _ElementData()
         ghostsData = _ElementData()
@@ -1067,62 +1320,66 @@ class MSHFile(GmshFile):
         faceOffset = -1 # this will be subtracted from gmsh ID to obtain global ID
         pid = self.communicator.procID + 1
 
-        elemsFile = open(self.elemsPath, 'r')
-
-        elemsFile.readline() # skip number of elements
-        for el in elemsFile:
-            currLineInts = [int(x) for x in el.split()]
-            elemType     = currLineInts[1]
+        for block in self._readElements():
+            elemType = block[0, 1]
+            numTags = block[0, 2]
+            nodes = block[..., 3 + numTags:]
 
-            if elemType in self.numFacesPerCell.keys():
-                # element is a cell
-
-                (cellOffset,
-                 tags,
-                 physicalEntity,
-                 geometricalEntity) = _parseTags(offset=cellOffset,
-                                                 currLineInts=currLineInts)
-                currLineInts[0] -= cellOffset
+            # the partition tags for don't seem to always be present
+            # and don't always make much sense when they are
 
-                if len(tags) > 0:
-                    # next item is a count
-                    if tags[0] != len(tags) - 1:
-                        warnings.warn("Partition count %d does not agree with number of remaining tags %d." % (tags[0], len(tags) - 1),
+            if numTags >= 2:
+                physicalEntities = block[..., 3]
+                geometricalEntities = block[..., 4]
+            else:
+                physicalEntities = geometricalEntities = -nx.ones(len(block), 'l')
+
+            if elemType in self.numFacesPerCell:
+                # elements are cells
+
+                if cellOffset == -1:
+                    # if first valid shape
+                    cellOffset = block[0, 0]
+                IDs = block[..., 0] - cellOffset
+
+                # next item is a count
+                partitions = block[..., 5:3 + numTags]
+                if numTags > 2:
+                    counts = block[..., 5]
+                    wrong = counts != numTags - 3
+                    if wrong.any():
+                        warnings.warn("Partition count %d does not agree with number of remaining tags %d." % (counts[wrong][0], numTags - 3),
                                       SyntaxWarning, stacklevel=2)
-                    tags = tags[1:]
+                    partitions = block[..., 6:3 + numTags]
 
                 if self.communicator.Nproc > 1:
-                    for tag in tags:
-                        if -tag == pid:
-                            # if we're collecting ghost cells and this is our ghost cell
-                            ghostsData.add(currLine=currLineInts, elType=elemType,
-                                           physicalEntity=physicalEntity,
-                                           geometricalEntity=geometricalEntity)
-                        elif tag == pid:
-                            # el is in this processor's partition or we collect all cells
-                            cellsData.add(currLine=currLineInts, elType=elemType,
-                                          physicalEntity=physicalEntity,
-                                          geometricalEntity=geometricalEntity)
+                    # ghost cells of this processor
+                    ghosts = (partitions == -pid).any(axis=1)
+                    ghostsData.add(IDs=IDs[ghosts], elType=elemType,
+                                   nodes=nodes[ghosts],
+                                   physicalEntities=physicalEntities[ghosts],
+                                   geometricalEntities=geometricalEntities[ghosts])
+                    # cells in this processor's partition
+                    cells = (partitions == pid).any(axis=1)
                 else:
                     # we collect all cells
-                    cellsData.add(currLine=currLineInts, elType=elemType,
-                                  physicalEntity=physicalEntity,
-                                  geometricalEntity=geometricalEntity)
-            elif elemType in self.numVertsPerFace.keys():
-                # element is a face
+                    cells = nx.ones(len(block), dtype=bool)
 
-                (faceOffset,
-                 tags,
-                 physicalEntity,
-                 geometricalEntity) = _parseTags(offset=faceOffset,
-                                                 currLineInts=currLineInts)
-                currLineInts[0] -= faceOffset
+                cellsData.add(IDs=IDs[cells], elType=elemType,
+                              nodes=nodes[cells],
+                              physicalEntities=physicalEntities[cells],
+                              geometricalEntities=geometricalEntities[cells])
 
-                facesData.add(currLine=currLineInts, elType=elemType,
-                              physicalEntity=physicalEntity,
-                              geometricalEntity=geometricalEntity)
+            elif elemType in self.numVertsPerFace:
+                # elements are faces
 
-        elemsFile.close()
+                if faceOffset == -1:
+                    faceOffset = block[0, 0]
+
+                facesData.add(IDs=block[..., 0] - faceOffset, elType=elemType,
+                              nodes=nodes.copy(),
+                              physicalEntities=physicalEntities,
+                              geometricalEntities=geometricalEntities)
 
         return cellsData, ghostsData, facesData
 
@@ -1274,14 +1531,26 @@ class _ElementData(object):
         self.idmap = [] # vertexCoords idx -> gmsh ID (global ID)
         self.physicalEntities = []
         self.geometricalEntities = []
+        self._nodeBlocks = []
 
-    def add(self, currLine, elType, physicalEntity, geometricalEntity):
-        numTags = currLine[2]
-        self.nodes.append(currLine[(numTags+3):])
-        self.shapes.append(elType)
-        self.idmap.append(currLine[0])
-        self.physicalEntities.append(physicalEntity)
-        self.geometricalEntities.append(geometricalEntity)
+    def add(self, IDs, elType, nodes, physicalEntities, geometricalEntities):
+        """
+        Add a block of elements of type `elType`, with a row of `nodes`
+        for each.
+        """
+        if len(IDs) > 0:
+            self._nodeBlocks.append(nodes)
+            self.nodes.extend(nodes)
+            self.shapes.extend([elType] * len(IDs))
+            self.idmap.extend(IDs.tolist())
+            self.physicalEntities.extend(physicalEntities.tolist())
+            self.geometricalEntities.extend(geometricalEntities.tolist())
+
+    @property
+    def allNodes(self):
+        """The nodes of all the elements, end to end."""
+        return nx.concatenate([nodes.ravel() for nodes in self._nodeBlocks]
+                              + [nx.zeros((0,), 'l')])
 
 class _GmshTopology(_MeshTopology):
 
@@ -42,6 +42,7 @@ __docformat__ = 'restructuredtext'
 from fipy.meshes.abstractMesh import AbstractMesh
 from fipy.meshes.representations.meshRepresentation import _MeshRepresentation
 from fipy.meshes.topologies.meshTopology import _MeshTopology
+from fipy.meshes.raggedIDs import _RaggedIDs
 
 from fipy.tools import numerix
 from fipy.tools.numerix import MA
@@ -53,6 +54,38 @@ __all__ = ["MeshAdditionError", "Mesh"]
 class MeshAdditionError(Exception):
     pass
 
+class _LazyGeometry(object):
+    """
+    A geometric array of a `Mesh`, calculated by `calc(mesh)` when first
+    read and kept in the `Mesh` until it is released. When `calc`
+    returns a tuple, its members are kept as the arrays named in
+    `group`. An assigned array is pinned: it is kept until the geometry
+    of the `Mesh` is set again.
+    """
+    def __init__(self, name, calc, group=None):
+        self.name = name
+        self.calc = calc
+        self.group = group
+
+    def __get__(self, mesh, cls):
+        if mesh is None:
+            return self
+        try:
+            return mesh.__dict__[self.name]
+        except KeyError:
+            value = self.calc(mesh)
+            if self.group is None:
+                mesh.__dict__[self.name] = value
+            else:
+                for name, member in zip(self.group, value):
+                    mesh.__dict__.setdefault(name, member)
+                value = mesh.__dict__[self.name]
+            return value
+
+    def __set__(self, mesh, value):
+        mesh.__dict__[self.name] = value
+        mesh.__dict__.setdefault("_pinnedGeometry", set()).add(self.name)
+
 class Mesh(AbstractMesh):
     """Generic mesh class using numerix to do the calculations
 
@@ -66,18 +99,19 @@ class Mesh(AbstractMesh):
                                    _RepresentationClass=_RepresentationClass,
                                    _TopologyClass=_TopologyClass)
 
-        """faceVertexIds and cellFacesIds must be padded with minus ones."""
+        """faceVertexIds and cellFacesIds must be padded with minus ones,
+        or be given as `_RaggedIDs`."""
 
         self.vertexCoords = vertexCoords
-        self.faceVertexIDs = MA.masked_values(faceVertexIDs, -1)
-        self.cellFaceIDs = MA.masked_values(cellFaceIDs, -1)
+        self.faceVertexIDs = faceVertexIDs
+        self.cellFaceIDs = cellFaceIDs
 
         self.dim = self.vertexCoords.shape[0]
 
         if not hasattr(self, "numberOfFaces"):
-            self.numberOfFaces = self.faceVertexIDs.shape[-1]
+            self.numberOfFaces = len(self._faceVertices)
         if not hasattr(self, "numberOfCells"):
-            self.numberOfCells = self.cellFaceIDs.shape[-1]
+            self.numberOfCells = len(self._cellFaces)
         if not hasattr(self, "globalNumberOfCells"):
             self.globalNumberOfCells = self.numberOfCells
         if not hasattr(self, "globalNumberOfFaces"):
@@ -88,6 +122,39 @@ class Mesh(AbstractMesh):
         self._setTopology()
         self._setGeometry(scaleLength = 1.)
 
+    """
+    Connectivity
+
+    The vertices of each face and the faces of each cell are kept as
+    `_RaggedIDs`. The padded, masked arrays `faceVertexIDs` and
+    `cellFaceIDs` are built from them each time they are read, and are
+    not kept, so that the `Mesh` holds its connectivity only once.
+    Routines that need a padded array more than once should read it
+    once.
+    """
+
+    def _getFaceVertexIDs(self):
+        if self._faceVertexIDs is not None:
+            return self._faceVertexIDs
+        return self._faceVertices.padded()
+
+    def _setFaceVertexIDs(self, faceVertexIDs):
+        self._faceVertices = _RaggedIDs.fromPadded(faceVertexIDs)
+        self._faceVertexIDs = None
+
+    faceVertexIDs = property(_getFaceVertexIDs, _setFaceVertexIDs)
+
+    def _getCellFaceIDs(self):
+        if self._cellFaceIDs is not None:
+            return self._cellFaceIDs
+        return self._cellFaces.padded()
+
+    def _setCellFaceIDs(self, cellFaceIDs):
+        self._cellFaces = _RaggedIDs.fromPadded(cellFaceIDs)
+        self._cellFaceIDs = None
+
+    cellFaceIDs = property(_getCellFaceIDs, _setCellFaceIDs)
+
     """
     Topology set and calc
     """
@@ -155,31 +222,107 @@ class Mesh(AbstractMesh):
     """
 
     def _setGeometry(self, scaleLength = 1.):
-        self._faceCenters = self._calcFaceCenters()
-        self._faceAreas = self._calcFaceAreas()
-        self._cellCenters = self._calcCellCenters()
-        (self._internalFaceToCellDistances,
-         self._cellToFaceDistanceVectors) = self._calcFaceToCellDistAndVec()
-        (self._internalCellDistances,
-         self._cellDistanceVectors) = self._calcCellDistAndVec()
-        self.faceNormals = self._calcFaceNormals()
-        self._orientedFaceNormals = self._calcOrientedFaceNormals()
-        self._cellVolumes = self._calcCellVolumes()
-        self._faceCellToCellNormals = self._calcFaceCellToCellNormals()
-        (self._faceTangents1,
-         self._faceTangents2) = self._calcFaceTangents()
-        self._cellToCellDistances = self._calcCellToCellDist()
-
+        """
+        Forget any geometry of a previous set of vertices and faces.
+        Each geometric array is calculated when it is first read.
+        """
+        self._releaseGeometry(self._geometryNames, pinned=True)
         self._setScaledGeometry(self.scale['length'])
 
-        self._cellAreas = self._calcCellAreas()
-        self._cellNormals = self._calcCellNormals()
+    _faceCenters = _LazyGeometry("_faceCenters", lambda s: s._calcFaceCenters())
+    _faceAreas = _LazyGeometry("_faceAreas", lambda s: s._calcFaceAreas())
+    _cellCenters = _LazyGeometry("_cellCenters", lambda s: s._calcCellCenters())
+    _internalFaceToCellDistances = _LazyGeometry("_internalFaceToCellDistances",
+                                                 lambda s: s._calcFaceToCellDistAndVec(),
+                                                 group=("_internalFaceToCellDistances",
+                                                        "_cellToFaceDistanceVectors"))
+    _cellToFaceDistanceVectors = _LazyGeometry("_cellToFaceDistanceVectors",
+                                               lambda s: s._calcFaceToCellDistAndVec(),
+                                               group=("_internalFaceToCellDistances",
+                                                      "_cellToFaceDistanceVectors"))
+    _internalCellDistances = _LazyGeometry("_internalCellDistances",
+                                           lambda s: s._calcCellDistAndVec(),
+                                           group=("_internalCellDistances",
+                                                  "_cellDistanceVectors"))
+    _cellDistanceVectors = _LazyGeometry("_cellDistanceVectors",
+                                         lambda s: s._calcCellDistAndVec(),
+                                         group=("_internalCellDistances",
+                                                "_cellDistanceVectors"))
+    faceNormals = _LazyGeometry("faceNormals", lambda s: s._calcFaceNormals())
+    _orientedFaceNormals = _LazyGeometry("_orientedFaceNormals", lambda s: s._calcOrientedFaceNormals())
+    _cellVolumes = _LazyGeometry("_cellVolumes", lambda s: s._calcCellVolumes())
+    _faceCellToCellNormals = _LazyGeometry("_faceCellToCellNormals", lambda s: s._calcFaceCellToCellNormals())
+    _faceTangents1 = _LazyGeometry("_faceTangents1", lambda s: s._calcFaceTangents(),
+                                   group=("_faceTangents1", "_faceTangents2"))
+    _faceTangents2 = _LazyGeometry("_faceTangents2", lambda s: s._calcFaceTangents(),
+                                   group=("_faceTangents1", "_faceTangents2"))
+    _cellToCellDistances = _LazyGeometry("_cellToCellDistances", lambda s: s._calcCellToCellDist())
+    _cellAreas = _LazyGeometry("_cellAreas", lambda s: s._calcCellAreas())
+    _cellNormals = _LazyGeometry("_cellNormals", lambda s: s._calcCellNormals())
+
+    @property
+    def _geometryNames(self):
+        cls = self.__class__
+        return [name for name in dir(cls)
+                if isinstance(getattr(cls, name, None), _LazyGeometry)]
+
+    def releaseGeometry(self, *names):
+        """
+        Drop geometric arrays that are rarely needed, such as
+        `_faceTangents1`, `_faceTangents2` or `_cellNormals`, to be
+        calculated again if they are read. Without `names`, every array
+        that the `Mesh` can calculate again is dropped. Arrays that
+        have been changed after they were calculated, as for periodic
+        meshes, are kept.
+
+        Returns the number of bytes no longer held by the `Mesh`.
+
+            >>> from fipy.meshes.tri2D import Tri2D
+            >>> mesh = Tri2D(nx=2, ny=2)
+            >>> print "_faceTangents1" in mesh.__dict__
+            False
+            >>> tangents1 = mesh._faceTangents1
+            >>> print "_faceTangents1" in mesh.__dict__, "_faceTangents2" in mesh.__dict__
+            True True
+            >>> print mesh.releaseGeometry("_faceTangents1", "_faceTangents2") == 2 * tangents1.nbytes
+            True
+            >>> print "_faceTangents2" in mesh.__dict__
+            False
+            >>> print numerix.allclose(mesh._faceTangents1, tangents1)
+            True
+
+        """
+        if len(names) == 0:
+            names = self._geometryNames
+        return self._releaseGeometry(names)
+
+    def _releaseGeometry(self, names, pinned=False):
+        pins = self.__dict__.setdefault("_pinnedGeometry", set())
+        nbytes = 0
+        for name in names:
+            if name in pins:
+                if not pinned:
+                    continue
+                pins.discard(name)
+            value = self.__dict__.pop(name, None)
+            if value is not None:
+                nbytes += getattr(value, "nbytes", 0)
+        return nbytes
+
+    def _pinGeometry(self):
+        """
+        Calculate every geometric array and keep it, so that it can be
+        changed in place.
+        """
+        for name in self._geometryNames:
+            setattr(self, name, getattr(self, name))
 
     def _calcFaceAreas(self):
-        faceVertexIDs = MA.filled(self.faceVertexIDs, -1)
+        paddedFaceVertexIDs = self.faceVertexIDs
+        faceVertexIDs = MA.filled(paddedFaceVertexIDs, -1)
         substitute = numerix.repeat(faceVertexIDs[numerix.newaxis, 0],
                                     faceVertexIDs.shape[0], axis=0)
-        faceVertexIDs = numerix.where(MA.getmaskarray(self.faceVertexIDs),
+        faceVertexIDs = numerix.where(MA.getmaskarray(paddedFaceVertexIDs),
                                       substitute, faceVertexIDs)
         faceVertexCoords = numerix.take(self.vertexCoords, faceVertexIDs, axis=1)
         faceOrigins = numerix.repeat(faceVertexCoords[:,0], faceVertexIDs.shape[0], axis=0)
@@ -194,15 +337,16 @@ class Mesh(AbstractMesh):
         return numerix.sqrtDot(cross, cross) / 2.
 
     def _calcFaceCenters(self):
-        maskedFaceVertexIDs = MA.filled(self.faceVertexIDs, 0)
+        faceVertexIDs = self.faceVertexIDs
+        maskedFaceVertexIDs = MA.filled(faceVertexIDs, 0)
 
         faceVertexCoords = numerix.take(self.vertexCoords, maskedFaceVertexIDs, axis=1)
 
-        if MA.getmask(self.faceVertexIDs) is False:
+        if MA.getmask(faceVertexIDs) is False:
             faceVertexCoordsMask = numerix.zeros(numerix.shape(faceVertexCoords), 'l')
         else:
             faceVertexCoordsMask = \
-              numerix.repeat(MA.getmaskarray(self.faceVertexIDs)[numerix.newaxis,...],
+              numerix.repeat(MA.getmaskarray(faceVertexIDs)[numerix.newaxis,...],
                              self.dim, axis=0)
 
         faceVertexCoords = MA.array(data=faceVertexCoords, mask=faceVertexCoordsMask)
@@ -300,8 +444,9 @@ class Mesh(AbstractMesh):
         return take(self._faceAreas, self.cellFaceIDs)
 
     def _calcCellNormals(self):
-        cellNormals = numerix.take(self.faceNormals, self.cellFaceIDs, axis=1)
-        cellFaceCellIDs = numerix.take(self.faceCellIDs[0], self.cellFaceIDs)
+        cellFaceIDs = self.cellFaceIDs
+        cellNormals = numerix.take(self.faceNormals, cellFaceIDs, axis=1)
+        cellFaceCellIDs = numerix.take(self.faceCellIDs[0], cellFaceIDs)
         cellIDs = numerix.repeat(numerix.arange(self.numberOfCells)[numerix.newaxis,...],
                                  self._maxFacesPerCell,
                                  axis=0)
@@ -358,20 +503,40 @@ class Mesh(AbstractMesh):
         self._scale['volume'] = self._calcVolumeScale()
         self._setScaledValues()
 
+    _scaledFaceAreas = _LazyGeometry("_scaledFaceAreas",
+                                     lambda s: s._scale['area'] * s._faceAreas)
+    _scaledCellVolumes = _LazyGeometry("_scaledCellVolumes",
+                                       lambda s: s._scale['volume'] * s._cellVolumes)
+    _scaledCellCenters = _LazyGeometry("_scaledCellCenters",
+                                       lambda s: s._scale['length'] * s._cellCenters)
+    _scaledFaceToCellDistances = _LazyGeometry("_scaledFaceToCellDistances",
+                                               lambda s: s._scale['length'] * s._faceToCellDistances)
+    _scaledCellDistances = _LazyGeometry("_scaledCellDistances",
+                                         lambda s: s._scale['length'] * s._cellDistances)
+    _scaledCellToCellDistances = _LazyGeometry("_scaledCellToCellDistances",
+                                               lambda s: s._scale['length'] * s._cellToCellDistances)
+    _areaProjections = _LazyGeometry("_areaProjections", lambda s: s._calcAreaProjections())
+    _orientedAreaProjections = _LazyGeometry("_orientedAreaProjections",
+                                             lambda s: s._calcOrientedAreaProjections())
+    _faceToCellDistanceRatio = _LazyGeometry("_faceToCellDistanceRatio",
+                                             lambda s: s._calcFaceToCellDistanceRatio())
+    _faceAspectRatios = _LazyGeometry("_faceAspectRatios", lambda s: s._calcFaceAspectRatios())
+
     def _setScaledValues(self):
-        self._scaledFaceAreas = self._scale['area'] * self._faceAreas
-        self._scaledCellVolumes = self._scale['volume'] * self._cellVolumes
-        self._scaledCellCenters = self._scale['length'] * self._cellCenters
-        self._scaledFaceToCellDistances = self._scale['length'] * self._faceToCellDistances
-        self._scaledCellDistances = self._scale['length'] * self._cellDistances
+        self._cellCenterIndex = None
+        self._releaseGeometry(["_scaledFaceAreas",
+                               "_scaledCellVolumes",
+                               "_scaledCellCenters",
+                               "_scaledFaceToCellDistances",
+                               "_scaledCellDistances"], pinned=True)
         self._setFaceDependentScaledValues()
 
     def _setFaceDependentScaledValues(self):
-        self._scaledCellToCellDistances = self._scale['length'] * self._cellToCellDistances
-        self._areaProjections = self._calcAreaProjections()
-        self._orientedAreaProjections = self._calcOrientedAreaProjections()
-        self._faceToCellDistanceRatio = self._calcFaceToCellDistanceRatio()
-        self._faceAspectRatios = self._calcFaceAspectRatios()
+        self._releaseGeometry(["_scaledCellToCellDistances",
+                               "_areaProjections",
+                               "_orientedAreaProjections",
+                               "_faceToCellDistanceRatio",
+                               "_faceAspectRatios"], pinned=True)
 
     def _calcAreaScale(self):
         return self.scale['length']**2
@@ -443,6 +608,19 @@ class Mesh(AbstractMesh):
         newmesh = Mesh(newCoords, numerix.array(self.faceVertexIDs), numerix.array(self.cellFaceIDs))
         return newmesh
 
+    def _connectFaces(self, faces0, faces1):
+        # the connection changes, in place, geometry that cannot be
+        # calculated again from the connected faces
+        self._pinGeometry()
+        # ... and the padded `cellFaceIDs`, so one of them is held while
+        # it is changed and the topology is recalculated
+        self._cellFaceIDs = self._cellFaces.padded()
+        try:
+            super(Mesh, self)._connectFaces(faces0, faces1)
+        finally:
+            self._cellFaces = _RaggedIDs.fromPadded(self._cellFaceIDs)
+            self._cellFaceIDs = None
+
     def _handleFaceConnection(self):
         """
         The _faceCellToCellNormals were added to ensure faceNormals == _faceCellToCellNormals for periodic grids.
@@ -460,57 +638,63 @@ class Mesh(AbstractMesh):
     """calc Topology methods"""
 
     def _calcFaceCellIDs(self):
-        array = MA.array(MA.indices(self.cellFaceIDs.shape, 'l')[1],
-                         mask=MA.getmask(self.cellFaceIDs))
-        faceCellIDs = MA.zeros((2, self.numberOfFaces), 'l')
-
-        ## Nasty bug: MA.put(arr, ids, values) fills its ids and
-        ## values arguments when masked!  This was not the behavior
-        ## that was assumed when used below.  It was only working
-        ## because the old fill value was 0 and the first element of
-        ## the array needed to be 0 since the cell's face was
-        ## 0. numerix.put() has been changed to deal with this
-        ## properly.
-
-##         MA.put(firstRow, cellFaceIDsFlat[::-1], array[::-1])
-##         MA.put(secondRow, cellFaceIDsFlat, array)
-        firstRow = faceCellIDs[0]
-        secondRow = faceCellIDs[1]
-
-        numerix.put(firstRow, self.cellFaceIDs[::-1,::-1], array[::-1,::-1])
-        numerix.put(secondRow, self.cellFaceIDs, array)
-
-        mask = ((False,) * self.numberOfFaces, (firstRow == secondRow))
-        return MA.sort(MA.array(faceCellIDs, mask = mask),
-                                   axis=0)
+        """
+        The cells on either side of each face, lowest first, with the
+        second masked for faces on the boundary.
+
+            >>> from fipy.meshes.nonUniformGrid2D import NonUniformGrid2D
+            >>> mesh = NonUniformGrid2D(nx=2, ny=1)
+            >>> print MA.filled(mesh._calcFaceCellIDs(), -1)
+            [[ 0  1  0  1  0  0  1]
+             [-1 -1 -1 -1 -1  1 -1]]
+
+        """
+        faces = self._cellFaces.indices
+        cells = self._cellFaces.elementIDs
+        order = numerix.lexsort((cells, faces))
+        faces = faces[order]
+        cells = cells[order]
+
+        faceCellIDs = numerix.zeros((2, self.numberOfFaces), 'l')
+        if len(faces) > 0:
+            changes = faces[1:] != faces[:-1]
+            first = numerix.concatenate(([True], changes))
+            last = numerix.concatenate((changes, [True]))
+            faceCellIDs[0, faces[first]] = cells[first]
+            faceCellIDs[1, faces[last]] = cells[last]
+
+        mask = numerix.zeros((2, self.numberOfFaces), dtype=bool)
+        mask[1] = faceCellIDs[0] == faceCellIDs[1]
+        return MA.array(faceCellIDs, mask=mask)
 
     """get Topology methods"""
 
     @property
     def _maxFacesPerCell(self):
-        return self.cellFaceIDs.shape[0]
+        return self._cellFaces.maxLength
+
+    @property
+    def _facesPerCell(self):
+        return self._cellFaces.counts
 
     @property
     def _cellVertexIDs(self):
         ## Get all the vertices from all the faces for each cell
-        cellFaceVertices = numerix.take(self.faceVertexIDs, self.cellFaceIDs, axis=1)
-
-        ## get a sorted list of vertices for each cell
-        cellVertexIDs = numerix.reshape(cellFaceVertices, (-1, self.numberOfCells))
-        cellVertexIDs = MA.sort(cellVertexIDs, axis=0, fill_value=-1)
-
-        cellVertexIDs = MA.sort(MA.concatenate((cellVertexIDs[-1, numerix.newaxis],
-                                                MA.masked_where(cellVertexIDs[:-1]
-                                                                == cellVertexIDs[1:],
-                                                                cellVertexIDs[:-1]))),
-                                axis=0, fill_value=-1)
-
-        ## resize the array to remove extra masked values
-        if cellVertexIDs.shape[-1] == 0:
-            length = 0
-        else:
-            length = min(numerix.sum(MA.getmaskarray(cellVertexIDs), axis=0))
-        return cellVertexIDs[length:][::-1]
+        faces = self._cellFaces.indices
+        vertices = self._faceVertices.take(faces)
+        cells = numerix.repeat(self._cellFaces.elementIDs,
+                               self._faceVertices.counts[faces])
+
+        ## get the distinct vertices of each cell, in descending order
+        order = numerix.lexsort((-vertices, cells))
+        cells = cells[order]
+        vertices = vertices[order]
+        distinct = numerix.ones(vertices.shape, dtype=bool)
+        distinct[1:] = (cells[1:] != cells[:-1]) | (vertices[1:] != vertices[:-1])
+
+        return _RaggedIDs.fromElementIDs(elementIDs=cells[distinct],
+                                         indices=vertices[distinct],
+                                         numberOfElements=self.numberOfCells).padded()
 
     """
     Below is an ordered version of _getCellVertexIDs()
@@ -568,6 +752,38 @@ class Mesh(AbstractMesh):
 
     """scaling"""
 
+    _cellCenterIndex = None
+
+    def _getCellCenterIndex(self):
+        """
+        Spatial index of the cell centers, built on first use and discarded
+        whenever the geometry is rescaled or recalculated.
+
+        Returns `None` if :mod:`scipy.spatial` is unavailable or if the
+        cell centers have units, in which case `_getNearestCellID()`
+        falls back to a brute force search.
+
+           >>> from fipy import *
+           >>> m = Grid2D(dx=(.1, 1., 10.), dy=(.1, 1., 10.))
+           >>> index = m._getCellCenterIndex()
+           >>> index is m._getCellCenterIndex() # doctest: +SCIPY
+           True
+           >>> m._setScaledGeometry(2.)
+           >>> index is m._getCellCenterIndex() # doctest: +SCIPY
+           False
+        """
+        if self._cellCenterIndex is None:
+            centers = self.cellCenters.globalValue
+            if not numerix._isPhysical(centers):
+                try:
+                    from scipy.spatial import cKDTree
+                except ImportError:
+                    return None
+
+                self._cellCenterIndex = cKDTree(numerix.transpose(numerix.asarray(centers)))
+
+        return self._cellCenterIndex
+
     def _getNearestCellID(self, points):
         """
         Test cases
@@ -577,9 +793,36 @@ class Mesh(AbstractMesh):
            >>> m1 = Grid2D(nx=2, ny=2, dx=5., dy=5.)
            >>> print m0._getNearestCellID(m1.cellCenters.globalValue)
            [4 5 7 8]
+           >>> print m0._getNearestCellID(((10., 0.),))
+           Traceback (most recent call last):
+               ...
+           ValueError: points must have the same dimension as the mesh
+
+        The brute force search agrees with the spatial index
+
+           >>> from fipy.tools.numerix import random
+           >>> m2 = Grid3D(dx=random.random(10), dy=random.random(10), dz=random.random(10))
+           >>> points = random.random((3, 1000)) * 4
+           >>> print numerix.allequal(m2._getNearestCellID(points),
+           ...                        numerix.nearest(m2.cellCenters.globalValue, points))
+           True
 
         """
-        return numerix.nearest(data=self.cellCenters.globalValue, points=points)
+        index = self._getCellCenterIndex()
+
+        if index is None or numerix._isPhysical(points):
+            return numerix.nearest(data=self.cellCenters.globalValue, points=points)
+
+        points = numerix.asarray(points)
+        if points.shape[0] != self.dim:
+            raise ValueError, "points must have the same dimension as the mesh"
+
+        if index.n == 0:
+            return numerix.arange(0)
+
+        distances, IDs = index.query(numerix.transpose(points))
+
+        return numerix.asarray(IDs, dtype=numerix.INT_DTYPE)
 
     def _test(self):
         """
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "raggedIDs.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+
+"""
+Compact storage for the ragged lists of IDs of a `Mesh`, such as the
+vertices of each face or the faces of each cell.
+
+The IDs of all the elements are stored end to end in `indices`, and the
+IDs of element `i` are ``indices[offsets[i]:offsets[i+1]]``. Unlike the
+masked 2-D arrays that `Mesh` has traditionally used, which are padded
+to the length of the longest element, no space is wasted when a few
+elements, such as polyhedral cells, are much longer than the rest.
+
+    >>> ids = _RaggedIDs.fromPadded(MA.masked_values(((0, 3, 5),
+    ...                                               (1, 4, 6),
+    ...                                               (2, -1, 7),
+    ...                                               (-1, -1, 8)), -1))
+    >>> print len(ids), ids.indices, ids.offsets
+    3 [0 1 2 3 4 5 6 7 8] [0 3 5 9]
+    >>> print ids.counts, ids.maxLength, ids.indices.dtype
+    [3 2 4] 4 int32
+    >>> print ids.elementIDs
+    [0 0 0 1 1 2 2 2 2]
+    >>> print ids.take((2, 0))
+    [5 6 7 8 0 1 2]
+    >>> print MA.filled(ids.padded(), -1)
+    [[ 0  3  5]
+     [ 1  4  6]
+     [ 2 -1  7]
+     [-1 -1  8]]
+
+IDs are stored as 32 bit integers unless they are too big.
+
+    >>> print _RaggedIDs(indices=(0, 2**31), offsets=(0, 1, 2)).indices.dtype
+    int64
+"""
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.tools import numerix
+from fipy.tools.numerix import MA
+
+def _indexDtype(maximum):
+    if maximum < 2**31:
+        return numerix.int32
+    else:
+        return numerix.int64
+
+class _RaggedIDs(object):
+    """
+    The lists of IDs of each of a set of elements.
+
+    :Parameters:
+      - `indices`: the IDs of all the elements, end to end.
+      - `offsets`: the start of each element in `indices`, followed by
+        the length of `indices`.
+    """
+    def __init__(self, indices, offsets):
+        indices = numerix.asarray(indices)
+        offsets = numerix.asarray(offsets)
+        if len(indices) > 0:
+            maximum = indices.max()
+        else:
+            maximum = 0
+        self.indices = indices.astype(_indexDtype(maximum))
+        self.offsets = offsets.astype(_indexDtype(len(indices)))
+
+    @classmethod
+    def fromPadded(cls, ids):
+        """
+        Create from a 2-D array with a column of IDs for each element,
+        masked or padded with -1 where an element is shorter than the
+        longest.
+        """
+        if isinstance(ids, cls):
+            return ids
+        ids = MA.masked_values(ids, -1)
+        if len(ids.shape) == 1:
+            ids = ids[numerix.newaxis]
+        valid = numerix.logical_not(MA.getmaskarray(ids)).transpose()
+        counts = valid.sum(axis=1)
+        offsets = numerix.zeros((len(counts) + 1,), dtype=numerix.int64)
+        numerix.cumsum(counts, out=offsets[1:])
+        indices = MA.filled(ids, -1).transpose()[valid]
+        return cls(indices=indices, offsets=offsets)
+
+    @classmethod
+    def fromElementIDs(cls, elementIDs, indices, numberOfElements):
+        """
+        Create from the `indices` of every element, in order of
+        `elementIDs`.
+        """
+        counts = numerix.bincount(numerix.asarray(elementIDs, dtype=numerix.int64),
+                                  minlength=numberOfElements)
+        offsets = numerix.zeros((numberOfElements + 1,), dtype=numerix.int64)
+        numerix.cumsum(counts, out=offsets[1:])
+        return cls(indices=indices, offsets=offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def counts(self):
+        """The number of IDs of each element."""
+        return self.offsets[1:] - self.offsets[:-1]
+
+    @property
+    def maxLength(self):
+        if len(self) == 0:
+            return 0
+        return int(self.counts.max())
+
+    @property
+    def elementIDs(self):
+        """The element that each of `indices` belongs to."""
+        return numerix.repeat(numerix.arange(len(self), dtype=self.indices.dtype), self.counts)
+
+    @property
+    def nbytes(self):
+        return self.indices.nbytes + self.offsets.nbytes
+
+    def take(self, elements):
+        """
+        Return the IDs of each of `elements`, end to end.
+        """
+        elements = numerix.asarray(elements, dtype=numerix.int64)
+        counts = self.counts[elements]
+        ends = numerix.cumsum(counts)
+        positions = (numerix.arange(ends[-1] if len(ends) else 0)
+                     + numerix.repeat(self.offsets[elements] - (ends - counts), counts))
+        return self.indices[positions]
+
+    def padded(self):
+        """
+        Return the masked 2-D array, with a column for each element and
+        a row for each position, that `Mesh` has traditionally used.
+        """
+        counts = self.counts
+        padded = numerix.empty((self.maxLength, len(self)), dtype=self.indices.dtype)
+        padded.fill(-1)
+        rows = (numerix.arange(len(self.indices))
+                - numerix.repeat(self.offsets[:-1], counts))
+        padded[rows, self.elementIDs] = self.indices
+        return MA.masked_values(padded, -1)
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -42,6 +42,7 @@ import fipy.tests.testProgram
 def _suite():
     return _LateImportDocTestSuite(docTestModuleNames = (
         'fipy.meshes.mesh',
+        'fipy.meshes.raggedIDs',
         'fipy.meshes.mesh2D',
         'fipy.meshes.nonUniformGrid1D',
         'fipy.meshes.nonUniformGrid2D',
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "fieldSplit.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+
+r"""
+Field-split preconditioning of coupled equations.
+
+The matrix of coupled equations is made of one block for each pair of
+an equation and a variable, or field. Rather than treating it as one
+matrix, a field-split preconditioner solves, approximately, for one
+field at a time, each with a solver suited to its own diagonal block:
+
+  - ``"jacobi"`` (block-Jacobi) solves every field with its diagonal
+    block only,
+
+    .. math::
+
+       \mathsf{z}_i = \mathsf{A}_{ii}^{-1} \mathsf{r}_i
+
+  - ``"gauss-seidel"`` (block Gauss-Seidel) solves the fields in turn,
+    each with the updates of the fields before it,
+
+    .. math::
+
+       \mathsf{z}_i = \mathsf{A}_{ii}^{-1}
+       \left(\mathsf{r}_i - \sum_{j < i} \mathsf{A}_{ij} \mathsf{z}_j\right)
+
+  - ``"schur"`` splits the first field from all the others and applies
+    the block LU factorization of the matrix, with the Schur complement
+
+    .. math::
+
+       \mathsf{S} = \mathsf{A}_{11}
+       - \mathsf{A}_{10} \operatorname{diag}(\mathsf{A}_{00})^{-1} \mathsf{A}_{01}
+
+    which suits saddle-point systems, such as the Cahn-Hilliard
+    equation split into the concentration and the chemical potential.
+
+The diagonal blocks (or, for ``"schur"``, the first block and the Schur
+complement) are solved by ``"lu"``, ``"ilu"``, ``"jacobi"`` or
+``"amg"`` (smoothed aggregation multigrid, which requires :term:`PyAMG`),
+given either once for all the blocks or as a sequence with one for
+each, or by a function that takes a block as a :mod:`scipy.sparse`
+matrix and returns a function applying its approximate inverse.
+
+    >>> import scipy.sparse as sp
+    >>> A = sp.csr_matrix(numerix.array([[4., 1., 1., 0.],
+    ...                                  [1., 4., 0., 1.],
+    ...                                  [2., 0., 5., 1.],
+    ...                                  [0., 2., 1., 5.]]))
+    >>> fields = numerix.array([0, 0, 1, 1])
+    >>> r = numerix.array([1., 2., 3., 4.])
+
+Block-Jacobi ignores the coupling between the fields,
+
+    >>> z = _FieldSplit(A, fields, split="jacobi").solve(r)
+    >>> print numerix.allclose(z, [2. / 15., 7. / 15., 11. / 24., 17. / 24.])
+    True
+
+block Gauss-Seidel only the coupling to the later fields,
+
+    >>> z = _FieldSplit(A, fields, split="gauss-seidel").solve(r)
+    >>> print numerix.allclose(A[:2, :2] * z[:2], r[:2])
+    True
+    >>> print numerix.allclose(A[2:, :] * z, r[2:])
+    True
+
+and the Schur complement split is exact when the first diagonal block
+is, as here, diagonal.
+
+    >>> D = sp.csr_matrix(numerix.array([[4., 0., 1., 0.],
+    ...                                  [0., 4., 0., 1.],
+    ...                                  [2., 0., 5., 1.],
+    ...                                  [0., 2., 1., 5.]]))
+    >>> z = _FieldSplit(D, fields, split="schur", blockSolvers=("jacobi", "lu")).solve(r)
+    >>> print numerix.allclose(D * z, r)
+    True
+
+    >>> _FieldSplit(A, fields, split="red-black") # doctest: +IGNORE_EXCEPTION_DETAIL
+    Traceback (most recent call last):
+        ...
+    ValueError: unknown split 'red-black'
+"""
+# `scipy` is `fipy.solvers.scipy` to an implicit relative import
+from __future__ import absolute_import
+
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.tools import numerix
+
+_splits = ("jacobi", "gauss-seidel", "schur")
+
+def _checkSplit(split):
+    if split not in _splits:
+        raise ValueError("unknown split '%s'" % split)
+
+def _blockSolver(A, kind):
+    """
+    Return a function applying an approximate inverse of the block `A`
+    by the method `kind`.
+    """
+    import scipy.sparse as sp
+
+    if callable(kind):
+        return kind(A)
+    elif kind == "lu":
+        from scipy.sparse.linalg import splu
+        return splu(sp.csc_matrix(A)).solve
+    elif kind == "ilu":
+        from scipy.sparse.linalg import spilu
+        return spilu(sp.csc_matrix(A)).solve
+    elif kind == "jacobi":
+        inverseDiagonal = 1. / _nonzeroDiagonal(A)
+        return lambda r: inverseDiagonal * r
+    elif kind == "amg":
+        from pyamg import smoothed_aggregation_solver
+        M = smoothed_aggregation_solver(sp.csr_matrix(A)).aspreconditioner()
+        return M.matvec
+    else:
+        raise ValueError("unknown block solver '%s'" % kind)
+
+def _nonzeroDiagonal(A):
+    diagonal = numerix.array(A.diagonal(), dtype=float)
+    diagonal[diagonal == 0] = 1.
+    return diagonal
+
+class _FieldSplit(object):
+    """
+    Apply a field-split preconditioner to a residual.
+    """
+    def __init__(self, A, fields, split="jacobi", blockSolvers="lu"):
+        """
+        :Parameters:
+          - `A`: The matrix, or the rows of it held by this processor, in
+            any :mod:`scipy.sparse` format.
+          - `fields`: The field of each row of `A`.
+          - `split`: ``"jacobi"``, ``"gauss-seidel"`` or ``"schur"``.
+          - `blockSolvers`: The solver of the diagonal blocks, or a
+            sequence of them, one for each block.
+        """
+        import scipy.sparse as sp
+
+        _checkSplit(split)
+        self.split = split
+
+        A = sp.csr_matrix(A)
+        self.shape = A.shape
+
+        fields = numerix.asarray(fields)
+        if split == "schur":
+            # the first field and all the others
+            fields = numerix.where(fields == 0, 0, 1)
+
+        numberOfFields = int(fields.max()) + 1 if len(fields) > 0 else 0
+        self.indices = [numerix.nonzero(fields == i)[0] for i in range(numberOfFields)]
+
+        if isinstance(blockSolvers, (list, tuple)):
+            if len(blockSolvers) != numberOfFields:
+                raise ValueError("%d block solvers are given for %d blocks" % (len(blockSolvers), numberOfFields))
+        else:
+            blockSolvers = [blockSolvers] * numberOfFields
+
+        # the rows of each field, against all the columns
+        self.rows = [A[ids] for ids in self.indices]
+
+        diagonalBlocks = [rows[:, ids] for rows, ids in zip(self.rows, self.indices)]
+
+        if split == "schur" and numberOfFields == 2:
+            (ids0, ids1), (rows0, rows1) = self.indices, self.rows
+            A00, A11 = diagonalBlocks
+            self.A01 = rows0[:, ids1]
+            self.A10 = rows1[:, ids0]
+            inverseDiagonal = sp.spdiags(1. / _nonzeroDiagonal(A00), 0, len(ids0), len(ids0))
+            S = sp.csr_matrix(A11 - self.A10 * inverseDiagonal * self.A01)
+            diagonalBlocks = [A00, S]
+
+        self.blockSolvers = [_blockSolver(block, kind) for block, kind in zip(diagonalBlocks, blockSolvers)]
+
+    def solve(self, r):
+        r = numerix.ravel(numerix.asarray(r, dtype=float))
+        z = numerix.zeros(r.shape, 'd')
+
+        if self.split == "schur" and len(self.indices) == 2:
+            (ids0, ids1), (solve0, solveS) = self.indices, self.blockSolvers
+            r0 = r[ids0]
+            z1 = solveS(r[ids1] - self.A10 * solve0(r0))
+            z[ids0] = solve0(r0 - self.A01 * z1)
+            z[ids1] = z1
+        else:
+            for ids, rows, solve in zip(self.indices, self.rows, self.blockSolvers):
+                if self.split == "gauss-seidel":
+                    # `z` is still zero for this field and the ones after it
+                    z[ids] = solve(r[ids] - rows * z)
+                else:
+                    z[ids] = solve(r[ids])
+
+        return z
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -50,6 +50,12 @@ class LinearCGSSolver(ScipyLinearCGSSolver):
           - `iterations`: The maximum number of iterative steps to perform.
           - `precon`: Preconditioner to use.
 
+        The AMG hierarchy is kept for later solves (see
+        `reusePreconditioner()`) until the sparsity pattern of the matrix
+        changes or a solve takes more than twice as many iterations as
+        the first one with that hierarchy.
+
         """
 
         super(LinearCGSSolver, self).__init__(tolerance=tolerance, iterations=iterations, precon=precon)
+        self.reusePreconditioner(slowdown=2.)
@@ -52,4 +52,4 @@ class LinearGeneralSolver(_ScipySolver):
         else:
             verbosity = False
 
-        return solve(L.matrix, b, verb=verbosity, tol=self.tolerance)
+        return solve(L.matrix.tocsr(), b, verb=verbosity, tol=self.tolerance)
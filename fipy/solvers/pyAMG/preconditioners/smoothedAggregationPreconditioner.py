@@ -38,8 +38,36 @@ from pyamg import smoothed_aggregation_solver
 __all__ = ["SmoothedAggregationPreconditioner"]
 
 class SmoothedAggregationPreconditioner():
-    def __init__(self):
-        pass
+    def __init__(self, keepAggregates=False):
+        """
+        :Parameters:
+          - `keepAggregates`: When a kept hierarchy is refreshed because
+            the matrix values changed (see `Solver.reusePreconditioner()`),
+            reuse its aggregates and only recompute the smoothed
+            prolongators and coarse-grid operators.
 
-    def _applyToMatrix(self, A):
-        return smoothed_aggregation_solver(A).aspreconditioner(cycle='V')
+        """
+        self.keepAggregates = keepAggregates
+
+    def _applyToMatrix(self, A, outdated=None):
+        # a `_ScipyDiaMeshMatrix` arrives in DIA format
+        A = A.tocsr()
+
+        hierarchy = getattr(outdated, 'hierarchy', None)
+
+        if (self.keepAggregates and hierarchy is not None
+            and hierarchy.levels[0].A.shape == A.shape):
+            levels = hierarchy.levels
+            # predefined aggregation does not need a strength of connection
+            ml = smoothed_aggregation_solver(A,
+                                             strength=None,
+                                             aggregate=[('predefined', {'AggOp': level.AggOp})
+                                                        for level in levels[:-1]],
+                                             max_levels=len(levels))
+        else:
+            ml = smoothed_aggregation_solver(A)
+
+        M = ml.aspreconditioner(cycle='V')
+        M.hierarchy = ml
+
+        return M
@@ -40,6 +40,7 @@ from pysparse import superlu
 
 from fipy.solvers.pysparse.pysparseSolver import PysparseSolver
 from fipy.tools import numerix
+from fipy.tools import telemetry
 
 DEBUG = False
 
@@ -78,13 +79,23 @@ class LinearLUSolver(PysparseSolver):
                                              iterations = iterations)
 
     def _solve_(self, L, x, b):
-        diag = L.takeDiagonal()
-        maxdiag = max(numerix.absolute(diag))
+        kept = self._reusedPreconditioner(L)
 
-        L = L * (1 / maxdiag)
-        b = b * (1 / maxdiag)
+        if kept is None:
+            diag = L.takeDiagonal()
+            maxdiag = max(numerix.absolute(diag))
+            scaledL = L * (1 / maxdiag)
+
+            LU = superlu.factorize(scaledL.matrix.to_csr())
 
-        LU = superlu.factorize(L.matrix.to_csr())
+            self._keepPreconditioner((LU, maxdiag), L)
+            L = scaledL
+        else:
+            # keep the scaling the factorization was computed with
+            LU, maxdiag = kept
+            L = L * (1 / maxdiag)
+
+        b = b * (1 / maxdiag)
 
         if DEBUG:
             import sys
@@ -92,10 +103,24 @@ class LinearLUSolver(PysparseSolver):
 
         error0 = numerix.sqrt(numerix.sum((L * x - b)**2))
 
+        if telemetry.enabled():
+            self._residualHistory = []
+        else:
+            self._residualHistory = None
+
+        self._iterationsUsed = 0
+        error = error0
+
         for iteration in range(self.iterations):
+            self._iterationsUsed = iteration + 1
+
             errorVector = L * x - b
+            error = numerix.sqrt(numerix.sum(errorVector**2))
+
+            if self._residualHistory is not None:
+                self._residualHistory.append(float(error))
 
-            if (numerix.sqrt(numerix.sum(errorVector**2)) / error0)  <= self.tolerance:
+            if (error / error0)  <= self.tolerance:
                 break
 
             xError = numerix.zeros(len(b),'d')
@@ -104,5 +129,5 @@ class LinearLUSolver(PysparseSolver):
 
         if 'FIPY_VERBOSE_SOLVER' in os.environ:
             from fipy.tools.debug import PRINT
-            PRINT('iterations: %d / %d' % (iteration+1, self.iterations))
-            PRINT('residual:', numerix.sqrt(numerix.sum(errorVector**2)))
+            PRINT('iterations: %d / %d' % (self._iterationsUsed, self.iterations))
+            PRINT('residual:', error)
@@ -1,6 +1,8 @@
 from fipy.solvers.pysparse.preconditioners.jacobiPreconditioner import *
 from fipy.solvers.pysparse.preconditioners.ssorPreconditioner import *
+from fipy.solvers.pysparse.preconditioners.fieldSplitPreconditioner import *
 
 __all__ = []
 __all__.extend(jacobiPreconditioner.__all__)
 __all__.extend(ssorPreconditioner.__all__)
+__all__.extend(fieldSplitPreconditioner.__all__)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "fieldSplitPreconditioner.py"
+ #
+ #  Author: James O'Beirne <james.obeirne@nist.gov>
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+from fipy.tools import numerix
+from fipy.solvers.fieldSplit import _checkSplit
+from fipy.solvers.pysparse.preconditioners.preconditioner import Preconditioner
+
+__all__ = ["FieldSplitPreconditioner"]
+
+class _FieldSplitPrecon(object):
+    """
+    The preconditioner object passed to the PySparse iterative solvers.
+    """
+    def __init__(self, split):
+        self.split = split
+        self.shape = split.shape
+
+    def precon(self, x, y):
+        y[:] = self.split.solve(x)
+
+class FieldSplitPreconditioner(Preconditioner):
+    """
+    Field-split preconditioner for PySparse, which solves the coupled
+    equations one field at a time (see `fipy.solvers.fieldSplit`). The
+    blocks are split and solved with :term:`SciPy`. The matrix of a
+    single equation is treated as one field.
+    A Cahn-Hilliard equation, split into the concentration and the
+    chemical potential,
+
+        >>> from fipy import *
+        >>> mesh = Grid1D(nx=10, dx=0.1)
+        >>> c = CellVariable(mesh=mesh)
+        >>> mu = CellVariable(mesh=mesh)
+        >>> eq = ((TransientTerm(var=c) == DiffusionTerm(coeff=1., var=mu))
+        ...       & (ImplicitSourceTerm(coeff=1., var=mu)
+        ...          == ImplicitSourceTerm(coeff=2., var=c) - DiffusionTerm(coeff=0.01, var=c)))
+        >>> def step(solver):
+        ...     c.value = 0.5 + 0.1 * numerix.sin(10 * mesh.x)
+        ...     mu.value = 0.
+        ...     eq.solve(dt=0.1, solver=solver)
+        ...     return numerix.concatenate((c.value, mu.value))
+        >>> from fipy.solvers.pysparse import LinearLUSolver, LinearGMRESSolver
+        >>> exact = step(LinearLUSolver())
+
+    is solved with each of the splits.
+
+        >>> for split in ("jacobi", "gauss-seidel", "schur"):
+        ...     precon = FieldSplitPreconditioner(split=split, blockSolvers=("lu", "ilu"))
+        ...     values = step(LinearGMRESSolver(tolerance=1e-12, iterations=100, precon=precon))
+        ...     print numerix.allclose(values, exact, atol=1e-8)
+        True
+        True
+        True
+    """
+    def __init__(self, split="jacobi", blockSolvers="lu"):
+        """
+        :Parameters:
+          - `split`: ``"jacobi"``, ``"gauss-seidel"`` or ``"schur"``.
+          - `blockSolvers`: ``"lu"``, ``"ilu"``, ``"jacobi"`` or
+            ``"amg"``, for all the diagonal blocks, or a sequence of
+            them, one for each block.
+        """
+        _checkSplit(split)
+        self.split = split
+        self.blockSolvers = blockSolvers
+
+    def _applyToMatrix(self, A):
+        """
+        Returns (preconditioning matrix, resulting matrix)
+        """
+        return self._applyToBlocks(A, fields=numerix.zeros((A.shape[0],), numerix.INT_DTYPE))
+
+    def _applyToBlocks(self, A, fields):
+        """
+        Returns (preconditioning matrix, resulting matrix)
+        """
+        import scipy.sparse as sp
+        from fipy.solvers.fieldSplit import _FieldSplit
+
+        values, rows, cols = A.find()
+        split = _FieldSplit(sp.coo_matrix((values, (rows, cols)), shape=A.shape),
+                            fields,
+                            split=self.split,
+                            blockSolvers=self.blockSolvers)
+
+        return _FieldSplitPrecon(split), A.to_csr()
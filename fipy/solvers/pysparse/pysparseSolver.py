@@ -69,12 +69,15 @@ class PysparseSolver(_PysparseMatrixSolver):
 
         if self.preconditioner is None:
             P = None
+        elif L._blockLayout is not None and hasattr(self.preconditioner, '_applyToBlocks'):
+            P, A = self.preconditioner._applyToBlocks(A, fields=L._blockLayout.fields)
         else:
             P, A = self.preconditioner._applyToMatrix(A)
 
         info, iter, relres = self.solveFnc(A, b, x, self.tolerance,
                                            self.iterations, P)
 
+        self._iterationsUsed = iter
         self._raiseWarning(info, iter, relres)
 
         if 'FIPY_VERBOSE_SOLVER' in os.environ:
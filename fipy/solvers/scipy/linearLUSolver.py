@@ -40,6 +40,7 @@ from scipy.sparse.linalg import splu
 
 from fipy.solvers.scipy.scipySolver import _ScipySolver
 from fipy.tools import numerix
+from fipy.tools import telemetry
 
 __all__ = ["LinearLUSolver"]
 
@@ -51,24 +52,48 @@ class LinearLUSolver(_ScipySolver):
     """
 
     def _solve_(self, L, x, b):
-        diag = L.takeDiagonal()
-        maxdiag = max(numerix.absolute(diag))
+        kept = self._reusedPreconditioner(L)
+
+        if kept is None:
+            diag = L.takeDiagonal()
+            maxdiag = max(numerix.absolute(diag))
+            scaledL = L * (1 / maxdiag)
+
+            LU = splu(scaledL.matrix.asformat("csc"), diag_pivot_thresh=1.,
+                                                      drop_tol=0.,
+                                                      relax=1,
+                                                      panel_size=10,
+                                                      permc_spec=3)
+
+            self._keepPreconditioner((LU, maxdiag), L)
+            L = scaledL
+        else:
+            # keep the scaling the factorization was computed with
+            LU, maxdiag = kept
+            L = L * (1 / maxdiag)
 
-        L = L * (1 / maxdiag)
         b = b * (1 / maxdiag)
 
-        LU = splu(L.matrix.asformat("csc"), diag_pivot_thresh=1.,
-                                            drop_tol=0.,
-                                            relax=1,
-                                            panel_size=10,
-                                            permc_spec=3)
-
         error0 = numerix.sqrt(numerix.sum((L * x - b)**2))
 
+        if telemetry.enabled():
+            self._residualHistory = []
+        else:
+            self._residualHistory = None
+
+        self._iterationsUsed = 0
+        error = error0
+
         for iteration in range(min(self.iterations, 10)):
+            self._iterationsUsed = iteration + 1
+
             errorVector = L * x - b
+            error = numerix.sqrt(numerix.sum(errorVector**2))
+
+            if self._residualHistory is not None:
+                self._residualHistory.append(float(error))
 
-            if (numerix.sqrt(numerix.sum(errorVector**2)) / error0)  <= self.tolerance:
+            if (error / error0)  <= self.tolerance:
                 break
 
             xError = LU.solve(errorVector)
@@ -76,7 +101,7 @@ class LinearLUSolver(_ScipySolver):
 
         if 'FIPY_VERBOSE_SOLVER' in os.environ:
             from fipy.tools.debug import PRINT
-            PRINT('iterations: %d / %d' % (iteration+1, self.iterations))
-            PRINT('residual:', numerix.sqrt(numerix.sum(errorVector**2)))
+            PRINT('iterations: %d / %d' % (self._iterationsUsed, self.iterations))
+            PRINT('residual:', error)
 
         return x
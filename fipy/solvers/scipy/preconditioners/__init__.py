@@ -0,0 +1,8 @@
+from fipy.solvers.scipy.preconditioners.jacobiPreconditioner import *
+from fipy.solvers.scipy.preconditioners.ssorPreconditioner import *
+from fipy.solvers.scipy.preconditioners.fieldSplitPreconditioner import *
+
+__all__ = []
+__all__.extend(jacobiPreconditioner.__all__)
+__all__.extend(ssorPreconditioner.__all__)
+__all__.extend(fieldSplitPreconditioner.__all__)
@@ -1,9 +1,11 @@
 #!/usr/bin/env python
 
-##
+## -*-Pyth-*-
  # ###################################################################
  #  FiPy - Python-based finite volume PDE solver
  #
+ #  FILE: "jacobiPreconditioner.py"
+ #
  #  Author: Jonathan Guyer <guyer@nist.gov>
  #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
  #  Author: James Warren   <jwarren@nist.gov>
@@ -30,42 +32,24 @@
  # ###################################################################
  ##
 
-import os
-import sys
-import re
-from subprocess import Popen, PIPE
-
-from fipy.tools.parser import parse
-
-from examples.benchmarking.utils import monitor
-
-steps = parse('--numberOfSteps', action='store',
-              type='int', default=20)
-
-blocks = parse('--numberOfBlocks', action='store',
-               type='int', default=20)
-
-benchmarker = os.path.join(os.path.dirname(__file__),
-                           "benchmarker.py")
 
-args = sys.argv[1:]
+__docformat__ = 'restructuredtext'
 
-p = Popen(["python", benchmarker] + args
-          + ["--numberOfSteps=0"],
-          stdout=PIPE,
-          stderr=PIPE)
+from scipy.sparse.linalg import LinearOperator
 
-cpu0, rsz0, vsz0 = monitor(p)
+from fipy.tools import numerix
 
-print "step\tcpu / (s / step / cell)\trsz / (B / cell)\tvsz / (B / cell)"
+__all__ = ["JacobiPreconditioner"]
 
-for block in range(blocks):
-    p = Popen(["python", benchmarker,
-               "--startingStep=%d" % (block * steps),
-               "--cpuBaseLine=%f" % cpu0] + args,
-              stdout=PIPE,
-              stderr=PIPE)
+class JacobiPreconditioner(object):
+    """
+    Jacobi preconditioner for the SciPy Krylov solvers, which divides by
+    the diagonal of the matrix.
+    """
 
-    cpu, rsz, vsz = monitor(p)
+    def _applyToMatrix(self, A, outdated=None):
+        inverseDiagonal = 1. / numerix.asarray(A.diagonal())
 
-    print "%d\t%g\t%g\t%g" % (block * steps, cpu, rsz, vsz)
+        return LinearOperator(A.shape,
+                              matvec=lambda x: inverseDiagonal * numerix.ravel(x),
+                              dtype=float)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "ssorPreconditioner.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+import scipy.sparse as sp
+from scipy.sparse.linalg import LinearOperator, splu
+
+from fipy.tools import numerix
+
+__all__ = ["SSORPreconditioner"]
+
+class SSORPreconditioner(object):
+    r"""
+    Symmetric successive over-relaxation preconditioner for the SciPy
+    Krylov solvers,
+
+    .. math::
+
+       \mathsf{M} = \frac{\omega}{2 - \omega}
+                    \left(\frac{\mathsf{D}}{\omega} + \mathsf{L}\right)
+                    \mathsf{D}^{-1}
+                    \left(\frac{\mathsf{D}}{\omega} + \mathsf{U}\right)
+
+    where :math:`\mathsf{D}`, :math:`\mathsf{L}` and :math:`\mathsf{U}` are
+    the diagonal, strictly lower and strictly upper parts of the matrix.
+    """
+
+    def __init__(self, omega=1.):
+        """
+        :Parameters:
+          - `omega`: The relaxation factor, between 0 and 2.
+        """
+        self.omega = omega
+
+    def _applyToMatrix(self, A, outdated=None):
+        A = sp.csc_matrix(A)
+        diagonal = numerix.asarray(A.diagonal())
+        D = sp.spdiags(diagonal / self.omega, 0, A.shape[0], A.shape[1])
+
+        # factored in their natural order without pivoting, the
+        # triangles have no fill, and their solves run in compiled code
+        lower = splu(sp.csc_matrix(sp.tril(A, k=-1) + D),
+                     permc_spec="NATURAL", diag_pivot_thresh=0.)
+        upper = splu(sp.csc_matrix(sp.triu(A, k=1) + D),
+                     permc_spec="NATURAL", diag_pivot_thresh=0.)
+        scale = (2. - self.omega) / self.omega * diagonal
+
+        return LinearOperator(A.shape,
+                              matvec=lambda x: upper.solve(scale * lower.solve(numerix.ravel(x))),
+                              dtype=float)
@@ -41,6 +41,8 @@ __all__ = []
 import os
 
 from fipy.solvers.scipy.scipySolver import _ScipySolver
+from fipy.tools import numerix
+from fipy.tools import telemetry
 
 class _ScipyKrylovSolver(_ScipySolver):
     """
@@ -49,17 +51,66 @@ class _ScipyKrylovSolver(_ScipySolver):
     .. attention:: This class is abstract. Always create one of its subclasses.
     """
 
+    _matrixFree = False
+
+    def useMatrixFree(self, matrixFree=True):
+        """
+        Solve without assembling a matrix. The terms instead build a
+        `_MatrixFreeMeshMatrix`, which keeps only the diagonal and the
+        coupling across each interior face of the mesh and is applied to
+        the solution vector directly at every iteration.
+
+        This is limited to second order equations for a scalar variable.
+        A preconditioner, if any, is handed a
+        `scipy.sparse.linalg.LinearOperator` rather than a matrix.
+
+        :Parameters:
+          - `matrixFree`: Whether to solve without a matrix.
+        """
+        self._matrixFree = matrixFree
+
+    @property
+    def _matrixClass(self):
+        if self._matrixFree:
+            from fipy.matrices.matrixFreeMatrix import _MatrixFreeMeshMatrix
+            return _MatrixFreeMeshMatrix
+        else:
+            return super(_ScipyKrylovSolver, self)._matrixClass
+
     def _solve_(self, L, x, b):
         A = L.matrix
         if self.preconditioner is None:
             M = None
         else:
-            M = self.preconditioner._applyToMatrix(A)
+            M = self._reusedPreconditioner(L)
+            if M is None:
+                if L._blockLayout is not None and hasattr(self.preconditioner, '_applyToBlocks'):
+                    M = self.preconditioner._applyToBlocks(A, fields=L._blockLayout.fields)
+                else:
+                    M = self.preconditioner._applyToMatrix(A, outdated=self._outdated)
+                self._keepPreconditioner(M, L)
+
+        iterations = [0]
+        if telemetry.enabled():
+            self._residualHistory = []
+        else:
+            self._residualHistory = None
+        def countIterations(xk):
+            iterations[0] += 1
+            if self._residualHistory is not None:
+                if numerix.shape(xk) == ():
+                    # `gmres` passes its (preconditioned) residual norm
+                    self._residualHistory.append(float(xk))
+                else:
+                    self._residualHistory.append(float(numerix.L2norm(b - A * xk)))
 
         x, info = self.solveFnc(A, b, x,
                                 tol=self.tolerance,
                                 maxiter=self.iterations,
-                                M=M)
+                                M=M,
+                                callback=countIterations)
+
+        self._iterationsUsed = iterations[0]
 
         if 'FIPY_VERBOSE_SOLVER' in os.environ:
             if info < 0:
@@ -116,6 +116,162 @@ class Solver(object):
 
         self.preconditioner = precon
 
+    _reusePolicy = None
+    _kept = None
+    _outdated = None
+    _iterationsUsed = 0
+    _residualHistory = None
+
+    def reusePreconditioner(self, every=None, iterations=None, drift=None, slowdown=None):
+        """
+        Keep the preconditioner (or, for a `LinearLUSolver`, the LU
+        factorization) built for one solve and apply it to the following
+        solves, rather than rebuilding it from every new matrix. This pays
+        off when the matrix changes little between sweeps or time steps.
+
+        The kept preconditioner is rebuilt as soon as any one of the
+        given limits is reached, and whenever the sparsity pattern of the
+        matrix changes. With no limits, it is otherwise kept for the
+        lifetime of the solver.
+
+        >>> from fipy import *
+        >>> mesh = Grid1D(nx=10)
+        >>> var = CellVariable(mesh=mesh, value=0.)
+        >>> var.constrain(1., mesh.facesLeft)
+        >>> D = Variable(1.)
+        >>> eq = TransientTerm() == DiffusionTerm(coeff=D)
+        >>> solver = LinearLUSolver(tolerance=1e-10)
+        >>> solver.reusePreconditioner(drift=0.1)
+        >>> for step in range(5):
+        ...     eq.solve(var=var, dt=1., solver=solver)
+        >>> print solver._kept[2]
+        5
+
+        A small change to the matrix keeps the factorization,
+
+        >>> D.value = 1.01
+        >>> eq.solve(var=var, dt=1., solver=solver)
+        >>> print solver._kept[2]
+        6
+
+        but a large one replaces it.
+
+        >>> D.value = 10.
+        >>> eq.solve(var=var, dt=1., solver=solver)
+        >>> print solver._kept[2]
+        1
+
+        The solution does not depend on the reuse.
+
+        >>> var2 = CellVariable(mesh=mesh, value=0.)
+        >>> var2.constrain(1., mesh.facesLeft)
+        >>> D.value = 1.
+        >>> for step in range(5):
+        ...     (TransientTerm() == DiffusionTerm(coeff=D)).solve(var=var2, dt=1.,
+        ...                                                       solver=LinearLUSolver(tolerance=1e-10))
+        >>> D.value = 1.01
+        >>> (TransientTerm() == DiffusionTerm(coeff=D)).solve(var=var2, dt=1.,
+        ...                                                   solver=LinearLUSolver(tolerance=1e-10))
+        >>> D.value = 10.
+        >>> (TransientTerm() == DiffusionTerm(coeff=D)).solve(var=var2, dt=1.,
+        ...                                                   solver=LinearLUSolver(tolerance=1e-10))
+        >>> print numerix.allclose(var, var2, atol=1e-8)
+        True
+
+        A matrix with another sparsity pattern, here for another mesh,
+        always gets a preconditioner of its own.
+
+        >>> var3 = CellVariable(mesh=Grid1D(nx=5), value=0.)
+        >>> var3.constrain(1., var3.mesh.facesLeft)
+        >>> (TransientTerm() == DiffusionTerm(coeff=D)).solve(var=var3, dt=1.,
+        ...                                                   solver=solver)
+        >>> print solver._kept[2]
+        1
+
+        A limit on the number of solves rebuilds it regularly.
+
+        >>> solver.reusePreconditioner(every=2)
+        >>> for step in range(3):
+        ...     eq.solve(var=var, dt=1., solver=solver)
+        >>> print solver._kept[2]
+        1
+
+        :Parameters:
+          - `every`: Rebuild after this many solves.
+          - `iterations`: Rebuild when the previous solve took more than
+            this many iterations.
+          - `drift`: Rebuild when the relative L2 change of the matrix
+            diagonal since the last rebuild exceeds this value.
+          - `slowdown`: Rebuild when a solve takes more than this many
+            times as many iterations as the first solve after the last
+            rebuild, i.e., when the convergence rate degrades.
+
+        """
+        self._reusePolicy = (every, iterations, drift, slowdown)
+        self._kept = None
+        self._outdated = None
+
+    def _matrixDiagonal(self, L):
+        return numerix.array(L.takeDiagonal())
+
+    def _diagonalDrift(self, diagonal, diagonal0):
+        return numerix.L2norm(diagonal - diagonal0) / numerix.L2norm(diagonal0)
+
+    def _reusedPreconditioner(self, L):
+        """
+        Return the preconditioner kept from an earlier solve if the reuse
+        policy allows it to be applied to `L`, or `None` if a new one must
+        be built and passed to `_keepPreconditioner()`.
+        """
+        if self._reusePolicy is None or self._kept is None:
+            return None
+
+        every, iterations, drift, slowdown = self._reusePolicy
+        preconditioner, diagonal0, solves, pattern, iterations0 = self._kept
+
+        newPattern = getattr(L, '_sparsityPattern', None)
+        if (newPattern is not pattern
+            and (newPattern is None or pattern is None
+                 or not newPattern._sameStructure(pattern))):
+            self._kept = None
+            self._outdated = None
+            return None
+
+        if solves == 1:
+            # the solve that built the preconditioner sets the pace
+            iterations0 = self._iterationsUsed
+
+        if ((every is not None and solves >= every)
+            or (iterations is not None and self._iterationsUsed > iterations)
+            or (slowdown is not None and self._iterationsUsed > slowdown * max(iterations0, 1))
+            or (drift is not None
+                and self._diagonalDrift(self._matrixDiagonal(L), diagonal0) > drift)):
+            # the structure of an outdated preconditioner may still be
+            # good for rebuilding its values
+            self._kept = None
+            self._outdated = preconditioner
+            return None
+
+        self._kept = (preconditioner, diagonal0, solves + 1, pattern, iterations0)
+
+        return preconditioner
+
+    def _keepPreconditioner(self, preconditioner, L):
+        if self._reusePolicy is not None:
+            every, iterations, drift, slowdown = self._reusePolicy
+            if drift is None:
+                diagonal = None
+            else:
+                diagonal = self._matrixDiagonal(L)
+            self._kept = (preconditioner, diagonal, 1, getattr(L, '_sparsityPattern', None), None)
+            self._outdated = None
+
+    def _meshMatrixClass(self, mesh):
+        """
+        Return the matrix class to assemble the equations on `mesh` with.
+        """
+        return self._matrixClass
+
     def _storeMatrix(self, var, matrix, RHSvector):
         self.var = var
         self.matrix = matrix
@@ -124,6 +280,16 @@ class Solver(object):
     def _solve(self):
         raise NotImplementedError
 
+    def _statistics(self):
+        """
+        The number of iterations, the number of nonzeros of the matrix
+        and, if the solver keeps it, the history of the residual norm of
+        the last solve, as reported by `fipy.tools.telemetry`.
+        """
+        return dict(iterations=int(self._iterationsUsed),
+                    nnz=getattr(self.matrix, '_nnz', None),
+                    residualHistory=self._residualHistory)
+
     def _solve_(self, L, x, b):
         raise NotImplementedError
 
@@ -171,3 +337,10 @@ class Solver(object):
 
     def _canSolveAsymmetric(self):
         return True
+
+def _test():
+    import doctest
+    return doctest.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -34,12 +34,25 @@
 
 __all__ = []
 
-from fipy.tests.lateImportTest import _LateImportTestSuite
+from fipy.tests.doctestPlus import _LateImportDocTestSuite
 import fipy.tests.testProgram
 
+from fipy.solvers import solver
+
+docTestModuleNames = ('solver',)
+if solver in ('scipy', 'pyamg'):
+    docTestModuleNames += ('fieldSplit',
+                           'scipy.preconditioners.fieldSplitPreconditioner')
+elif solver == 'pysparse':
+    docTestModuleNames += ('fieldSplit',
+                           'pysparse.preconditioners.fieldSplitPreconditioner')
+elif solver in ('trilinos', 'no-pysparse'):
+    docTestModuleNames += ('fieldSplit',
+                           'trilinos.preconditioners.fieldSplitPreconditioner')
+
 def _suite():
-    return _LateImportTestSuite(testModuleNames = (),
-                                base = __name__)
+    return _LateImportDocTestSuite(docTestModuleNames = docTestModuleNames,
+                                   base = __name__)
 
 if __name__ == '__main__':
     fipy.tests.testProgram.main(defaultTest='_suite')
@@ -73,7 +73,14 @@ class LinearLUSolver(TrilinosSolver):
 
     def _solve_(self, L, x, b):
 
+        kept = self._reusedPreconditioner(L)
+
+        self._iterationsUsed = 0
+        errorVector = None
+
         for iteration in range(self.iterations):
+             self._iterationsUsed = iteration + 1
+
              # errorVector = L*x - b
              errorVector = Epetra.Vector(L.RangeMap())
              L.Multiply(False, x, errorVector)
@@ -91,15 +98,28 @@ class LinearLUSolver(TrilinosSolver):
              if (tol / tol0) <= self.tolerance:
                  break
 
-             xError = Epetra.Vector(L.RowMap())
+             if kept is None:
+                 # factor once and reuse the factors for every refinement
+                 xError = Epetra.Vector(L.RowMap())
+                 rhs = Epetra.Vector(L.RangeMap())
+
+                 Problem = Epetra.LinearProblem(L, xError, rhs)
+                 Solver = self.Factory.Create("Klu", Problem)
+                 Solver.SymbolicFactorization()
+                 Solver.NumericFactorization()
+
+                 kept = (Solver, Problem, xError, rhs, L)
+                 self._keepPreconditioner(kept, L)
+
+             Solver, Problem, xError, rhs, L0 = kept
 
-             Problem = Epetra.LinearProblem(L, xError, errorVector)
-             Solver = self.Factory.Create("Klu", Problem)
+             rhs[:] = errorVector
              Solver.Solve()
 
              x[:] = x - xError
 
         if 'FIPY_VERBOSE_SOLVER' in os.environ:
             from fipy.tools.debug import PRINT
-            PRINT('iterations: %d / %d' % (iteration + 1, self.iterations))
-            PRINT('residual:', errorVector.Norm2())
+            PRINT('iterations: %d / %d' % (self._iterationsUsed, self.iterations))
+            if errorVector is not None:
+                PRINT('residual:', errorVector.Norm2())
@@ -7,6 +7,7 @@ from fipy.solvers.trilinos.preconditioners.icPreconditioner import *
 from fipy.solvers.trilinos.preconditioners.domDecompPreconditioner import *
 from fipy.solvers.trilinos.preconditioners.multilevelSGSPreconditioner import *
 from fipy.solvers.trilinos.preconditioners.multilevelSolverSmootherPreconditioner import *
+from fipy.solvers.trilinos.preconditioners.fieldSplitPreconditioner import *
 
 __all__ = []
 __all__.extend(multilevelDDPreconditioner.__all__)
@@ -18,3 +19,4 @@ __all__.extend(icPreconditioner.__all__)
 __all__.extend(domDecompPreconditioner.__all__)
 __all__.extend(multilevelSGSPreconditioner.__all__)
 __all__.extend(multilevelSolverSmootherPreconditioner.__all__)
+__all__.extend(fieldSplitPreconditioner.__all__)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+
+##
+ # -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "fieldSplitPreconditioner.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+
+__docformat__ = 'restructuredtext'
+
+from PyTrilinos import Epetra
+
+from fipy.tools import numerix
+from fipy.solvers.fieldSplit import _checkSplit
+from fipy.solvers.trilinos.preconditioners.preconditioner import Preconditioner
+
+__all__ = ["FieldSplitPreconditioner"]
+
+class _FieldSplitOperator(Epetra.Operator):
+    """
+    Applies a `_FieldSplit` of the rows held by this processor as the
+    inverse of an `Epetra.Operator`.
+    """
+    def __init__(self, matrix, split):
+        Epetra.Operator.__init__(self)
+        self.__matrix = matrix
+        self.__split = split
+
+    def Label(self):
+        return "FieldSplit"
+
+    def OperatorDomainMap(self):
+        return self.__matrix.OperatorDomainMap()
+
+    def OperatorRangeMap(self):
+        return self.__matrix.OperatorRangeMap()
+
+    def Comm(self):
+        return self.__matrix.Comm()
+
+    def ApplyInverse(self, x, y):
+        for vector in range(x.NumVectors()):
+            y[vector, :] = self.__split.solve(x[vector, :])
+        return 0
+
+    def Apply(self, x, y):
+        return -1
+
+    def HasNormInf(self):
+        return False
+
+    def NormInf(self):
+        return -1
+
+    def SetUseTranspose(self, useTranspose):
+        return -1
+
+    def UseTranspose(self):
+        return False
+
+class FieldSplitPreconditioner(Preconditioner):
+    """
+    Field-split preconditioner for Trilinos solvers, which solves the
+    coupled equations one field at a time (see
+    `fipy.solvers.fieldSplit`). The blocks are split and solved with
+    :term:`SciPy`. On several processors, each one applies the split to
+    the rows it holds, ignoring their coupling to the rows of the other
+    processors. The matrix of a single equation is treated as one field.
+    A Cahn-Hilliard equation, split into the concentration and the
+    chemical potential,
+
+        >>> from fipy import *
+        >>> mesh = Grid1D(nx=10, dx=0.1)
+        >>> c = CellVariable(mesh=mesh)
+        >>> mu = CellVariable(mesh=mesh)
+        >>> eq = ((TransientTerm(var=c) == DiffusionTerm(coeff=1., var=mu))
+        ...       & (ImplicitSourceTerm(coeff=1., var=mu)
+        ...          == ImplicitSourceTerm(coeff=2., var=c) - DiffusionTerm(coeff=0.01, var=c)))
+        >>> def step(solver):
+        ...     c.value = 0.5 + 0.1 * numerix.sin(10 * mesh.x)
+        ...     mu.value = 0.
+        ...     eq.solve(dt=0.1, solver=solver)
+        ...     return numerix.concatenate((c.globalValue, mu.globalValue))
+        >>> from fipy.solvers.trilinos import LinearLUSolver, LinearGMRESSolver
+        >>> exact = step(LinearLUSolver())
+
+    is solved with each of the splits.
+
+        >>> for split in ("jacobi", "gauss-seidel", "schur"):
+        ...     precon = FieldSplitPreconditioner(split=split, blockSolvers=("lu", "ilu"))
+        ...     values = step(LinearGMRESSolver(tolerance=1e-12, iterations=100, precon=precon))
+        ...     print numerix.allclose(values, exact, atol=1e-8)
+        True
+        True
+        True
+    """
+    def __init__(self, split="jacobi", blockSolvers="lu"):
+        """
+        :Parameters:
+          - `split`: ``"jacobi"``, ``"gauss-seidel"`` or ``"schur"``.
+          - `blockSolvers`: ``"lu"``, ``"ilu"``, ``"jacobi"`` or
+            ``"amg"``, for all the diagonal blocks, or a sequence of
+            them, one for each block.
+        """
+        _checkSplit(split)
+        self.split = split
+        self.blockSolvers = blockSolvers
+
+    def _localMatrix(self, matrix):
+        """
+        Return the entries of `matrix` between the rows held by this
+        processor as a `scipy.sparse` matrix.
+        """
+        import scipy.sparse as sp
+
+        rowGIDs = numerix.array(matrix.RowMap().MyGlobalElements())
+        colGIDs = numerix.array(matrix.ColMap().MyGlobalElements())
+
+        # the row held by this processor for each column, or -1
+        order = numerix.argsort(rowGIDs)
+        position = numerix.clip(numerix.searchsorted(rowGIDs[order], colGIDs), 0, max(len(rowGIDs) - 1, 0))
+        colToRow = numerix.where(rowGIDs[order][position] == colGIDs, order[position], -1)
+
+        values, rows, cols = [], [], []
+        for row in range(matrix.NumMyRows()):
+            rowValues, rowCols = matrix.ExtractMyRowCopy(row)
+            values.append(rowValues)
+            rows.append(numerix.repeat(row, len(rowCols)))
+            cols.append(numerix.take(colToRow, rowCols))
+
+        values = numerix.concatenate(values)
+        rows = numerix.concatenate(rows)
+        cols = numerix.concatenate(cols)
+        local = cols >= 0
+
+        return sp.coo_matrix((values[local], (rows[local], cols[local])),
+                             shape=(len(rowGIDs), len(rowGIDs)))
+
+    def _applyToSolver(self, solver, matrix):
+        self._applyToBlocks(solver=solver, matrix=matrix,
+                            fields=numerix.zeros((matrix.NumMyRows(),), numerix.INT_DTYPE))
+
+    def _applyToBlocks(self, solver, matrix, fields):
+        from fipy.solvers.fieldSplit import _FieldSplit
+
+        split = _FieldSplit(self._localMatrix(matrix),
+                            fields,
+                            split=self.split,
+                            blockSolvers=self.blockSolvers)
+
+        self.Prec = _FieldSplitOperator(matrix, split)
+
+        solver.SetPrecOperator(self.Prec)
@@ -39,6 +39,7 @@ import os
 
 from PyTrilinos import AztecOO
 
+from fipy.tools import numerix
 from fipy.solvers.trilinos.trilinosSolver import TrilinosSolver
 from fipy.solvers.trilinos.preconditioners.jacobiPreconditioner import JacobiPreconditioner
 
@@ -76,12 +77,27 @@ class TrilinosAztecOOSolver(TrilinosSolver):
         Solver.SetAztecOption(AztecOO.AZ_output, AztecOO.AZ_none)
 
         if self.preconditioner is not None:
-            self.preconditioner._applyToSolver(solver=Solver, matrix=L)
+            kept = self._reusedPreconditioner(L)
+            if kept is None:
+                layout = self.matrix._blockLayout
+                if layout is not None and hasattr(self.preconditioner, '_applyToBlocks'):
+                    fields = layout._fieldsOfGlobalRows(numerix.array(L.RowMap().MyGlobalElements()),
+                                                        globalNumberOfCells=self.matrix.mesh.globalNumberOfCells)
+                    self.preconditioner._applyToBlocks(solver=Solver, matrix=L, fields=fields)
+                else:
+                    self.preconditioner._applyToSolver(solver=Solver, matrix=L)
+                if hasattr(self.preconditioner, 'Prec'):
+                    # the matrix must outlive the preconditioner built from it
+                    self._keepPreconditioner((self.preconditioner.Prec, L), L)
+            else:
+                Solver.SetPrecOperator(kept[0])
         else:
             Solver.SetAztecOption(AztecOO.AZ_precond, AztecOO.AZ_none)
 
         output = Solver.Iterate(self.iterations, self.tolerance)
 
+        self._iterationsUsed = Solver.NumIters()
+
         if self.preconditioner is not None:
             if hasattr(self.preconditioner, 'Prec'):
                 del self.preconditioner.Prec
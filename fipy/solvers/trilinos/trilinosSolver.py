@@ -57,6 +57,7 @@ class TrilinosSolver(Solver):
         self.var = var
         if hasattr(self, 'matrix'):
             self.matrix.matrix = matrix.matrix
+            self.matrix._blockLayout = matrix._blockLayout
         else:
             self.matrix = matrix
         self.RHSvector = RHSvector
@@ -77,8 +78,12 @@ class TrilinosSolver(Solver):
             else:
                 s = (localNonOverlappingCellIDs,)
 
-            nonOverlappingVector = Epetra.Vector(globalMatrix.domainMap,
-                                                 self.var[s].ravel())
+            (nonOverlappingVector,
+             nonOverlappingRHSvector,
+             overlappingVector) = self._getVectors(globalMatrix)
+
+            nonOverlappingVector[:] = numerix.array(self.var[s]).ravel()
+
             from fipy.variables.coupledCellVariable import _CoupledCellVariable
 
             if isinstance(self.RHSvector, _CoupledCellVariable):
@@ -86,18 +91,38 @@ class TrilinosSolver(Solver):
             else:
                 RHSvector = numerix.reshape(numerix.array(self.RHSvector), self.var.shape)[s].ravel()
 
-
-            nonOverlappingRHSvector = Epetra.Vector(globalMatrix.rangeMap,
-                                                    RHSvector)
+            nonOverlappingRHSvector[:] = RHSvector
 
             del RHSvector
 
-            overlappingVector = Epetra.Vector(globalMatrix.colMap, self.var)
+            overlappingVector[:] = numerix.array(self.var).ravel()
 
             self.globalVectors = (globalMatrix, nonOverlappingVector, nonOverlappingRHSvector, overlappingVector)
 
         return self.globalVectors
 
+    def _getVectors(self, globalMatrix):
+        """
+        Return the solution, right-hand-side and overlapping solution
+        `Epetra.Vector` objects for `globalMatrix`. They are allocated once
+        for each set of (shared) maps and only refilled by later solves.
+        """
+        if not hasattr(self, '_epetraVectors'):
+            self._epetraVectors = {}
+
+        # the maps are kept alive by the cache, so their ids are not reused
+        key = id(globalMatrix.colMap)
+        maps, vectors = self._epetraVectors.get(key, (None, None))
+
+        if vectors is None:
+            vectors = (Epetra.Vector(globalMatrix.domainMap),
+                       Epetra.Vector(globalMatrix.rangeMap),
+                       Epetra.Vector(globalMatrix.colMap))
+            self._epetraVectors[key] = ((globalMatrix.colMap, globalMatrix.domainMap,
+                                         globalMatrix.rangeMap), vectors)
+
+        return vectors
+
     def _deleteGlobalMatrixAndVectors(self):
         self.matrix.flush()
         del self.globalVectors
@@ -116,9 +141,11 @@ class TrilinosSolver(Solver):
                      nonOverlappingVector,
                      nonOverlappingRHSvector)
 
+        # the matrix is flushed below
+        self._nnz = globalMatrix.matrix.NumGlobalNonzeros()
+
         overlappingVector.Import(nonOverlappingVector,
-                                 Epetra.Import(globalMatrix.colMap,
-                                               globalMatrix.domainMap),
+                                 globalMatrix._importer,
                                  Epetra.Insert)
 
         self.var.value = numerix.reshape(numerix.array(overlappingVector), self.var.shape)
@@ -127,6 +154,25 @@ class TrilinosSolver(Solver):
         del self.var
         del self.RHSvector
 
+    _nnz = None
+
+    def _statistics(self):
+        statistics = super(TrilinosSolver, self)._statistics()
+        statistics['nnz'] = self._nnz
+        return statistics
+
+    def _matrixDiagonal(self, L):
+        diagonal = Epetra.Vector(L.RowMap())
+        L.ExtractDiagonalCopy(diagonal)
+        return diagonal
+
+    def _diagonalDrift(self, diagonal, diagonal0):
+        # `Norm2()` reduces over all processors, so that every processor
+        # makes the same decision about rebuilding
+        difference = Epetra.Vector(diagonal)
+        difference.Update(-1., diagonal0, 1.)
+        return difference.Norm2() / diagonal0.Norm2()
+
     @property
     def _matrixClass(self):
         from fipy.solvers import _MeshMatrix
@@ -140,8 +186,7 @@ class TrilinosSolver(Solver):
 
             overlappingResidual = Epetra.Vector(globalMatrix.colMap)
             overlappingResidual.Import(residual,
-				       Epetra.Import(globalMatrix.colMap,
-						     globalMatrix.domainMap),
+				       globalMatrix._importer,
 				       Epetra.Insert)
 
             return overlappingResidual
@@ -40,6 +40,7 @@ import os
 
 from fipy.terms.unaryTerm import _UnaryTerm
 from fipy.tools import numerix
+from fipy.tools import telemetry
 from fipy.terms import TermMultiplyError
 from fipy.terms import AbstractBaseClassError
 from fipy.variables.faceVariable import FaceVariable
@@ -221,11 +222,16 @@ class _AbstractDiffusionTerm(_UnaryTerm):
 ##         print 'id2',id2
 
         coefficientMatrix = SparseMatrix(mesh=mesh, bandwidth = mesh._maxFacesPerCell + 1)
-        interiorCoeff = numerix.take(coeff, interiorFaces, axis=-1).ravel()
-        coefficientMatrix.addAt(interiorCoeff, id1.ravel(), id1.swapaxes(0,1).ravel())
-        coefficientMatrix.addAt(-interiorCoeff, id1.ravel(), id2.swapaxes(0,1).ravel())
-        coefficientMatrix.addAt(-interiorCoeff, id2.ravel(), id1.swapaxes(0,1).ravel())
-        coefficientMatrix.addAt(interiorCoeff, id2.ravel(), id2.swapaxes(0,1).ravel())
+        # the coefficients are not cached, so they are evaluated here
+        with telemetry._phase("coefficients", term=self.__class__.__name__):
+            interiorCoeff = numerix.take(coeff, interiorFaces, axis=-1).ravel()
+        # the same array for both off-diagonals marks the coupling as symmetric
+        minusInteriorCoeff = -interiorCoeff
+        coefficientMatrix.addAtInteriorFaces(cell1diag=interiorCoeff,
+                                             cell1offdiag=minusInteriorCoeff,
+                                             cell2offdiag=minusInteriorCoeff,
+                                             cell2diag=interiorCoeff,
+                                             id1=id1, id2=id2)
 
 ##         print 'coefficientMatrix',coefficientMatrix
 ##         raw_input('stopped')
@@ -268,7 +274,8 @@ class _AbstractDiffusionTerm(_UnaryTerm):
 
     def __doBCs(self, SparseMatrix, higherOrderBCs, N, M, coeffs, coefficientMatrix, boundaryB):
         for boundaryCondition in higherOrderBCs:
-            LL, bb = boundaryCondition._buildMatrix(SparseMatrix, N, M, coeffs)
+            with telemetry._phase("boundaryCondition", boundaryCondition=boundaryCondition.__class__.__name__):
+                LL, bb = boundaryCondition._buildMatrix(SparseMatrix, N, M, coeffs)
             if 'FIPY_DISPLAY_MATRIX' in os.environ:
                 self._viewer.title = r"%s %s" % (boundaryCondition.__class__.__name__, self.__class__.__name__)
                 self._viewer.plot(matrix=LL, RHSvector=bb)
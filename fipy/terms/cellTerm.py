@@ -153,7 +153,7 @@ class CellTerm(_NonDiffusionTerm):
         b = numerix.zeros(var.shape,'d').ravel()
         L = SparseMatrix(mesh=var.mesh)
 
-        coeffVectors = self._getCoeffVectors_(var=var, transientGeomCoeff=transientGeomCoeff, diffusionGeomCoeff=diffusionGeomCoeff)
+        coeffVectors = self._evaluateCoefficients(self._getCoeffVectors_(var=var, transientGeomCoeff=transientGeomCoeff, diffusionGeomCoeff=diffusionGeomCoeff))
 
         dt = self._checkDt(dt)
 
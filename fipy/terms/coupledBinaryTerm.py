@@ -37,12 +37,15 @@ __docformat__ = 'restructuredtext'
 
 __all__ = []
 
+import os
+
 from fipy.terms.abstractBinaryTerm import _AbstractBinaryTerm
 from fipy.variables.coupledCellVariable import _CoupledCellVariable
 from fipy.variables.cellVariable import CellVariable
 from fipy.tools import numerix
 from fipy.terms import SolutionVariableNumberError
 from fipy.matrices.offsetSparseMatrix import OffsetSparseMatrix
+from fipy.matrices.blockLayout import _BlockLayout
 
 class _CoupledBinaryTerm(_AbstractBinaryTerm):
     """
@@ -71,6 +74,8 @@ class _CoupledBinaryTerm(_AbstractBinaryTerm):
         _AbstractBinaryTerm.__init__(self, term, other)
         if len(self._vars) < len(self._uncoupledTerms):
             raise SolutionVariableNumberError
+        self.ordering = os.environ.get('FIPY_COUPLED_ORDERING', 'blocked')
+        self._blockLayout = None
 
     @property
     def _uncoupledTerms(self):
@@ -83,7 +88,7 @@ class _CoupledBinaryTerm(_AbstractBinaryTerm):
         if len(self._vars) != len(self._uncoupledTerms):
             raise SolutionVariableNumberError
 
-        return _AbstractBinaryTerm._verifyVar(self, _CoupledCellVariable(self._vars))
+        return _AbstractBinaryTerm._verifyVar(self, _CoupledCellVariable(self._vars, ordering=self.ordering))
 
     @property
     def _buildExplcitIfOther(self):
@@ -94,13 +99,28 @@ class _CoupledBinaryTerm(_AbstractBinaryTerm):
 
         Only called at top-level by `_prepareLinearSystem()`
 
+        Where the matrix class can add one matrix into another by blocks,
+        each (equation, variable) block is built on its own, the size of
+        the mesh, and its entries are added once, straight into their
+        place in the global matrix. Otherwise, each block is built the
+        size of the global matrix, offset to its place, and summed.
+
         """
 
-        from fipy.matrices.offsetSparseMatrix import OffsetSparseMatrix
+        numberOfEquations = len(self._uncoupledTerms)
+        numberOfVariables = len(self._vars)
+
+        if SparseMatrix._assemblesBlocks:
+            return self._assembleBlocks(var, SparseMatrix, dt=dt, buildExplicitIfOther=buildExplicitIfOther)
+
+        if self.ordering != "blocked":
+            raise ValueError("%s can only assemble coupled equations with the 'blocked' ordering" % SparseMatrix.__name__)
+
         SparseMatrix =  OffsetSparseMatrix(SparseMatrix=SparseMatrix,
-                                           numberOfVariables=len(self._vars),
-                                           numberOfEquations=len(self._uncoupledTerms))
+                                           numberOfVariables=numberOfVariables,
+                                           numberOfEquations=numberOfEquations)
         matrix = SparseMatrix(mesh=var.mesh)
+        matrix._blockLayout = self._getBlockLayout(var.mesh)
         RHSvectors = []
 
         for equationIndex, uncoupledTerm in enumerate(self._uncoupledTerms):
@@ -130,6 +150,115 @@ class _CoupledBinaryTerm(_AbstractBinaryTerm):
 
         return (var, matrix, _CoupledCellVariable(RHSvectors))
 
+    def _getBlockLayout(self, mesh):
+        numberOfCells = mesh.numberOfCells
+        numberOfEquations = len(self._uncoupledTerms)
+        numberOfVariables = len(self._vars)
+
+        if self.ordering == "interleaved" and mesh.communicator.Nproc > 1:
+            raise ValueError("coupled equations can only be solved with the 'interleaved' ordering on one processor")
+
+        layout = self._blockLayout
+        if layout is None or not layout._matches(numberOfCells, numberOfEquations, numberOfVariables, self.ordering):
+            layout = _BlockLayout(numberOfCells=numberOfCells,
+                                  numberOfEquations=numberOfEquations,
+                                  numberOfVariables=numberOfVariables,
+                                  ordering=self.ordering)
+            self._blockLayout = layout
+
+        return layout
+
+    def _assembleBlocks(self, var, SparseMatrix, dt=None, buildExplicitIfOther=False):
+        r"""Build each (equation, variable) block the size of the mesh and
+        add it into the global matrix
+
+        The same system in either ordering
+
+        >>> from fipy import *
+        >>> m = Grid1D(nx=3)
+        >>> v0 = CellVariable(mesh=m, value=0.)
+        >>> v1 = CellVariable(mesh=m, value=1.)
+        >>> eq0 = TransientTerm(var=v0) - DiffusionTerm(coeff=1., var=v0) - DiffusionTerm(coeff=2., var=v1)
+        >>> eq1 = TransientTerm(var=v1) - DiffusionTerm(coeff=3., var=v0) - DiffusionTerm(coeff=4., var=v1)
+        >>> eq = eq0 & eq1
+        >>> SparseMatrix = DefaultSolver()._matrixClass
+        >>> var, blocked, RHSvector = eq._buildAndAddMatrices(var=eq._verifyVar(None), SparseMatrix=SparseMatrix, dt=1.)
+        >>> eq.ordering = "interleaved"
+        >>> var, interleaved, RHSvector = eq._buildAndAddMatrices(var=eq._verifyVar(None), SparseMatrix=SparseMatrix, dt=1.)
+        >>> print var.globalValue
+        [ 0.  1.  0.  1.  0.  1.]
+        >>> print RHSvector.globalValue
+        [ 0.  1.  0.  1.  0.  1.]
+
+        differs only by a permutation of the rows and columns
+
+        >>> order = [0, 3, 1, 4, 2, 5]
+        >>> print numerix.allequal(interleaved.numpyArray,
+        ...                        numerix.take(numerix.take(blocked.numpyArray, order, axis=0), order, axis=1))
+        True
+
+        and gives the same solution.
+
+        >>> v0.value = 0.
+        >>> v1.value = 1.
+        >>> v0.constrain(1., m.facesLeft)
+        >>> v1.constrain(0., m.facesRight)
+        >>> eq0 = TransientTerm(var=v0) == DiffusionTerm(coeff=1., var=v0) + DiffusionTerm(coeff=0.5, var=v1)
+        >>> eq1 = TransientTerm(var=v1) == DiffusionTerm(coeff=1., var=v1) + ImplicitSourceTerm(coeff=-1., var=v0)
+        >>> values = []
+        >>> for ordering in ("blocked", "interleaved"):
+        ...     v0.value = 0.
+        ...     v1.value = 1.
+        ...     eq = eq0 & eq1
+        ...     eq.ordering = ordering
+        ...     eq.solve(dt=1.)
+        ...     values.append(numerix.concatenate((v0.value, v1.value)))
+        >>> print numerix.allclose(values[0], values[1])
+        True
+        """
+        layout = self._getBlockLayout(var.mesh)
+
+        # the blocks are the size of the mesh, so they must not be sized
+        # by the sparsity pattern of the global matrix
+        class BlockMatrix(SparseMatrix):
+            _sparsityPattern = None
+
+        matrix = SparseMatrix(mesh=var.mesh,
+                              numberOfVariables=layout.numberOfVariables,
+                              numberOfEquations=layout.numberOfEquations)
+        matrix._blockLayout = layout
+        RHSvectors = []
+
+        for equationIndex, uncoupledTerm in enumerate(self._uncoupledTerms):
+
+            termRHSvector = 0
+            if uncoupledTerm._cacheMatrix:
+                termMatrix = SparseMatrix(mesh=var.mesh,
+                                          numberOfVariables=layout.numberOfVariables,
+                                          numberOfEquations=layout.numberOfEquations)
+            else:
+                termMatrix = None
+
+            for varIndex, tmpVar in enumerate(var.vars):
+
+                tmpVar, tmpMatrix, tmpRHSvector = uncoupledTerm._buildAndAddMatrices(tmpVar,
+                                                                                     BlockMatrix,
+                                                                                     boundaryConditions=(),
+                                                                                     dt=dt,
+                                                                                     transientGeomCoeff=uncoupledTerm._getTransientGeomCoeff(tmpVar),
+                                                                                     diffusionGeomCoeff=uncoupledTerm._getDiffusionGeomCoeff(tmpVar),
+                                                                                     buildExplicitIfOther=buildExplicitIfOther)
+
+                matrix._addBlock(tmpMatrix, layout.rows[equationIndex], layout.cols[varIndex])
+                if termMatrix is not None:
+                    termMatrix._addBlock(tmpMatrix, layout.rows[equationIndex], layout.cols[varIndex])
+                termRHSvector += tmpRHSvector
+
+            uncoupledTerm._buildCache(termMatrix, termRHSvector)
+            RHSvectors += [CellVariable(value=termRHSvector, mesh=var.mesh)]
+
+        return (var, matrix, _CoupledCellVariable(RHSvectors, ordering=layout.ordering))
+
     def __repr__(self):
         return '(' + repr(self.term) + ' & ' + repr(self.other) + ')'
 
@@ -40,6 +40,7 @@ from fipy.terms.nonDiffusionTerm import _NonDiffusionTerm
 from fipy.tools import vector
 from fipy.tools import numerix
 from fipy.tools import inline
+from fipy.tools import telemetry
 
 __all__ = ["FaceTerm"]
 
@@ -66,21 +67,23 @@ class FaceTerm(_NonDiffusionTerm):
 
     def _implicitBuildMatrix_(self, SparseMatrix, L, id1, id2, b, weight, var, boundaryConditions, interiorFaces, dt):
         mesh = var.mesh
-        coeffMatrix = self._getCoeffMatrix_(var, weight)
+        coeffMatrix = self._evaluateCoefficients(self._getCoeffMatrix_(var, weight))
 
         id1 = self._reshapeIDs(var, id1)
         id2 = self._reshapeIDs(var, id2)
 
-        L.addAt(numerix.take(coeffMatrix['cell 1 diag'], interiorFaces, axis=-1).ravel(), id1.ravel(), id1.swapaxes(0,1).ravel())
-        L.addAt(numerix.take(coeffMatrix['cell 1 offdiag'], interiorFaces, axis=-1).ravel(), id1.ravel(), id2.swapaxes(0,1).ravel())
-        L.addAt(numerix.take(coeffMatrix['cell 2 offdiag'], interiorFaces, axis=-1).ravel(), id2.ravel(), id1.swapaxes(0,1).ravel())
-        L.addAt(numerix.take(coeffMatrix['cell 2 diag'], interiorFaces, axis=-1).ravel(), id2.ravel(), id2.swapaxes(0,1).ravel())
+        L.addAtInteriorFaces(cell1diag=numerix.take(coeffMatrix['cell 1 diag'], interiorFaces, axis=-1).ravel(),
+                             cell1offdiag=numerix.take(coeffMatrix['cell 1 offdiag'], interiorFaces, axis=-1).ravel(),
+                             cell2offdiag=numerix.take(coeffMatrix['cell 2 offdiag'], interiorFaces, axis=-1).ravel(),
+                             cell2diag=numerix.take(coeffMatrix['cell 2 diag'], interiorFaces, axis=-1).ravel(),
+                             id1=id1, id2=id2)
 
         N = mesh.numberOfCells
         M = mesh._maxFacesPerCell
 
         for boundaryCondition in boundaryConditions:
-            LL, bb = boundaryCondition._buildMatrix(SparseMatrix, N, M, coeffMatrix)
+            with telemetry._phase("boundaryCondition", boundaryCondition=boundaryCondition.__class__.__name__):
+                LL, bb = boundaryCondition._buildMatrix(SparseMatrix, N, M, coeffMatrix)
 
             if 'FIPY_DISPLAY_MATRIX' in os.environ:
                 self._viewer.title = r"%s %s" % (boundaryCondition.__class__.__name__, self.__class__.__name__)
@@ -94,7 +97,7 @@ class FaceTerm(_NonDiffusionTerm):
     def _explicitBuildMatrix_(self, SparseMatrix, oldArray, id1, id2, b, weight, var, boundaryConditions, interiorFaces, dt):
 
         mesh = var.mesh
-        coeffMatrix = self._getCoeffMatrix_(var, weight)
+        coeffMatrix = self._evaluateCoefficients(self._getCoeffMatrix_(var, weight))
 
         self._explicitBuildMatrixInline_(oldArray=oldArray, id1=id1, id2=id2, b=b, coeffMatrix=coeffMatrix,
                                          mesh=var.mesh, interiorFaces=interiorFaces, dt=dt, weight=weight)
@@ -104,7 +107,8 @@ class FaceTerm(_NonDiffusionTerm):
 
         for boundaryCondition in boundaryConditions:
 
-            LL,bb = boundaryCondition._buildMatrix(SparseMatrix, N, M, coeffMatrix)
+            with telemetry._phase("boundaryCondition", boundaryCondition=boundaryCondition.__class__.__name__):
+                LL,bb = boundaryCondition._buildMatrix(SparseMatrix, N, M, coeffMatrix)
             if LL != 0:
 ##              b -= LL.takeDiagonal() * numerix.array(oldArray)
                 b -= LL * numerix.array(oldArray)
@@ -37,6 +37,7 @@ __docformat__ = 'restructuredtext'
 import os
 
 from fipy.tools import numerix
+from fipy.tools import telemetry
 from fipy.terms import AbstractBaseClassError
 from fipy.terms import SolutionVariableRequiredError
 
@@ -66,6 +67,7 @@ class Term(object):
         self._matrix = None
         self._cacheRHSvector = False
         self._RHSvector = None
+        self._sparsityPatterns = {}
         self.var = var
 
     def _calcVars(self):
@@ -123,14 +125,47 @@ class Term(object):
     def _getMatrixClass(self, solver, var):
         if self._vectorSize(var) > 1:
             from fipy.matrices.offsetSparseMatrix import OffsetSparseMatrix
-            SparseMatrix =  OffsetSparseMatrix(SparseMatrix=solver._matrixClass,
+            SparseMatrix =  OffsetSparseMatrix(SparseMatrix=solver._meshMatrixClass(var.mesh),
                                                numberOfVariables=self._vectorSize(var),
                                                numberOfEquations=self._vectorSize(var))
         else:
-            SparseMatrix = solver._matrixClass
+            SparseMatrix = solver._meshMatrixClass(var.mesh)
 
         return SparseMatrix
 
+    def _getSparsityPattern(self, var, SparseMatrix, boundaryConditions):
+        """Return the `_SparsityPattern` of this `Term` tree for `var`
+
+        The pattern is kept as long as the same solution variables,
+        matrix class and boundary conditions are used.
+
+            >>> from fipy import *
+            >>> m = Grid1D(nx=3)
+            >>> v = CellVariable(mesh=m)
+            >>> eq = TransientTerm() == DiffusionTerm()
+            >>> SparseMatrix = DefaultSolver()._matrixClass
+            >>> pattern = eq._getSparsityPattern(v, SparseMatrix, ())
+            >>> eq._getSparsityPattern(v, SparseMatrix, ()) is pattern
+            True
+            >>> eq._getSparsityPattern(CellVariable(mesh=m), SparseMatrix, ()) is pattern
+            False
+        """
+        from fipy.variables.coupledCellVariable import _CoupledCellVariable
+        from fipy.matrices.sparsityPattern import _SparsityPattern
+
+        if isinstance(var, _CoupledCellVariable):
+            vars = tuple(var.vars)
+        else:
+            vars = (var,)
+
+        key = (tuple([id(v) for v in vars]), SparseMatrix)
+        pattern = self._sparsityPatterns.get(key)
+        if pattern is None or not pattern._matches(vars, boundaryConditions):
+            pattern = _SparsityPattern(vars=vars, boundaryConditions=boundaryConditions)
+            self._sparsityPatterns[key] = pattern
+
+        return pattern
+
     def _prepareLinearSystem(self, var, solver, boundaryConditions, dt):
         solver = self.getDefaultSolver(var, solver)
 
@@ -148,13 +183,20 @@ class Term(object):
                 from fipy.viewers.matplotlibViewer.matplotlibSparseMatrixViewer import MatplotlibSparseMatrixViewer
                 Term._viewer = MatplotlibSparseMatrixViewer()
 
-        var, matrix, RHSvector = self._buildAndAddMatrices(var,
-                                                           self._getMatrixClass(solver, var),
-                                                           boundaryConditions=boundaryConditions,
-                                                           dt=dt,
-                                                           transientGeomCoeff=self._getTransientGeomCoeff(var),
-                                                           diffusionGeomCoeff=self._getDiffusionGeomCoeff(var),
-                                                           buildExplicitIfOther=self._buildExplcitIfOther)
+        with telemetry._phase("assemble"):
+            from fipy.matrices.sparsityPattern import SparsityPatternMatrix
+            SparseMatrix = SparsityPatternMatrix(self._getMatrixClass(solver, var),
+                                                 self._getSparsityPattern(var, solver._meshMatrixClass(var.mesh), boundaryConditions))
+
+            var, matrix, RHSvector = self._buildAndAddMatrices(var,
+                                                               SparseMatrix,
+                                                               boundaryConditions=boundaryConditions,
+                                                               dt=dt,
+                                                               transientGeomCoeff=self._getTransientGeomCoeff(var),
+                                                               diffusionGeomCoeff=self._getDiffusionGeomCoeff(var),
+                                                               buildExplicitIfOther=self._buildExplcitIfOther)
+
+            matrix._storeSparsityPattern()
 
         self._buildCache(matrix, RHSvector)
 
@@ -195,9 +237,100 @@ class Term(object):
 
         """
 
-        solver = self._prepareLinearSystem(var, solver, boundaryConditions, dt)
+        with telemetry._phase("sweep", term=self.__class__.__name__):
+            solver = self._prepareLinearSystem(var, solver, boundaryConditions, dt)
 
-        solver._solve()
+            self._solveLinearSystem(solver)
+
+    def _solveLinearSystem(self, solver):
+        """Solve the linear system stored in `solver`, reporting the
+        solver statistics to `fipy.tools.telemetry`.
+        """
+        with telemetry._phase("solve", category="solver", solver=solver.__class__.__name__) as phase:
+            solver._residualHistory = None
+            solver._solve()
+            if telemetry.enabled():
+                phase.args.update(solver._statistics())
+
+    def solveMany(self, vars, solver=None, boundaryConditions=(), dt=None):
+        r"""
+        Solves the `Term`'s linear system once for each of `vars`, e.g.,
+        for a parameter sweep over initial conditions or sources. The LU
+        factorization or preconditioner built for the first variable is
+        used to solve for each of the others that leads to a matrix with
+        the same values; only their right-hand sides differ.
+
+            >>> from fipy import *
+            >>> mesh = Grid1D(nx=20)
+            >>> vars = [CellVariable(mesh=mesh, value=mesh.x * (i + 1), hasOld=True)
+            ...         for i in range(3)]
+            >>> for var in vars:
+            ...     var.constrain(0., mesh.facesLeft)
+            >>> eq = TransientTerm() == DiffusionTerm(coeff=2.)
+            >>> solver = LinearLUSolver()
+            >>> eq.solveMany(vars, solver=solver, dt=0.1)
+
+            >>> def check(var, i, where):
+            ...     checkVar = CellVariable(mesh=mesh, value=mesh.x * (i + 1))
+            ...     checkVar.constrain(0., where)
+            ...     eq.solve(var=checkVar, dt=0.1, solver=LinearLUSolver())
+            ...     return numerix.allclose(var, checkVar)
+            >>> for i, var in enumerate(vars):
+            ...     print check(var, i, mesh.facesLeft)
+            True
+            True
+            True
+
+        A variable constrained elsewhere leads to another matrix, which
+        gets a factorization of its own.
+
+            >>> vars = [CellVariable(mesh=mesh, value=mesh.x * (i + 1), hasOld=True)
+            ...         for i in range(3)]
+            >>> wheres = [mesh.facesLeft, mesh.facesRight, mesh.facesLeft]
+            >>> for var, where in zip(vars, wheres):
+            ...     var.constrain(0., where)
+            >>> eq.solveMany(vars, solver=solver, dt=0.1)
+            >>> for i, (var, where) in enumerate(zip(vars, wheres)):
+            ...     print check(var, i, where)
+            True
+            True
+            True
+
+        The solver's own reuse policy is not affected
+
+            >>> print solver._reusePolicy, solver._kept
+            None None
+
+        :Parameters:
+
+           - `vars`: The variables to be solved for. Each provides its
+             initial condition and old value, and holds its solution on
+             completion.
+           - `solver`: The solver to be used to solve the linear systems.
+           - `boundaryConditions`: A tuple of boundaryConditions.
+           - `dt`: The time step size.
+
+        """
+        solver = self.getDefaultSolver(vars[0], solver)
+
+        reusePolicy, kept = solver._reusePolicy, solver._kept
+        solver._reusePolicy, solver._kept = (None, None, None, None), None
+        try:
+            factored = None
+            for var in vars:
+                with telemetry._phase("sweep", term=self.__class__.__name__):
+                    solver = self._prepareLinearSystem(var, solver, boundaryConditions, dt)
+                    matrix = solver.matrix
+                    if (factored is None
+                        # a solver that refills one matrix leaves nothing to compare
+                        or matrix is factored
+                        or not matrix._sameValues(factored)):
+                        # the kept factorization belongs to another matrix
+                        solver._kept = None
+                        factored = matrix
+                    self._solveLinearSystem(solver)
+        finally:
+            solver._reusePolicy, solver._kept = reusePolicy, kept
 
     def sweep(self, var=None, solver=None, boundaryConditions=(), dt=None, underRelaxation=None, residualFn=None, cacheResidual=False, cacheError=False):
         r"""
@@ -220,25 +353,28 @@ class Term(object):
               and store it in the `errorVector` member of `Term`
 
         """
-        solver = self._prepareLinearSystem(var=var, solver=solver, boundaryConditions=boundaryConditions, dt=dt)
-        solver._applyUnderRelaxation(underRelaxation=underRelaxation)
-        residual = solver._calcResidual(residualFn=residualFn)
-
-        if cacheResidual or cacheError:
-            self.residualVector = solver._calcResidualVector(residualFn=residualFn)
-
-        if cacheError:
-            self.errorVector = solver.var.copy()
-            var_tmp = solver.var
-            RHS_tmp = solver.RHSvector
-            solver._storeMatrix(var=self.errorVector, matrix=solver.matrix, RHSvector=self.residualVector)
-            solver._solve()
-            solver._storeMatrix(var=var_tmp, matrix=solver.matrix, RHSvector=RHS_tmp)
+        with telemetry._phase("sweep", term=self.__class__.__name__):
+            solver = self._prepareLinearSystem(var=var, solver=solver, boundaryConditions=boundaryConditions, dt=dt)
+            solver._applyUnderRelaxation(underRelaxation=underRelaxation)
 
-        if not cacheResidual:
-            self.residualVector = None
+            with telemetry._phase("residual"):
+                residual = solver._calcResidual(residualFn=residualFn)
 
-        solver._solve()
+                if cacheResidual or cacheError:
+                    self.residualVector = solver._calcResidualVector(residualFn=residualFn)
+
+            if cacheError:
+                self.errorVector = solver.var.copy()
+                var_tmp = solver.var
+                RHS_tmp = solver.RHSvector
+                solver._storeMatrix(var=self.errorVector, matrix=solver.matrix, RHSvector=self.residualVector)
+                self._solveLinearSystem(solver)
+                solver._storeMatrix(var=var_tmp, matrix=solver.matrix, RHSvector=RHS_tmp)
+
+            if not cacheResidual:
+                self.residualVector = None
+
+            self._solveLinearSystem(solver)
 
         return residual
 
@@ -435,6 +571,19 @@ class Term(object):
     def _calcGeomCoeff(self, var):
         raise NotImplementedError
 
+    def _evaluateCoefficients(self, coefficients):
+        """Evaluate the `Variable` objects in the `dict` `coefficients`
+        within the ``"coefficients"`` phase of `fipy.tools.telemetry`,
+        rather than wherever the assembly first needs them. They cache
+        their values, so no work is repeated.
+        """
+        if telemetry.enabled():
+            with telemetry._phase("coefficients", term=self.__class__.__name__):
+                for coeff in coefficients.values():
+                    getattr(coeff, 'value', None)
+
+        return coefficients
+
     def _getGeomCoeff(self, var):
         if self.geomCoeff is None:
             self.geomCoeff = self._calcGeomCoeff(var)
@@ -494,6 +643,15 @@ class Term(object):
         >>> print numerix.allclose(v, answer, rtol=2e-5)
         True
 
+        The sparsity pattern recorded by the first sweep is kept for the others.
+
+        >>> pattern, = eqn._sparsityPatterns.values()
+        >>> print (pattern.scatter is not None
+        ...        or pattern.offsets is not None
+        ...        or pattern.nnz is not None
+        ...        or pattern.bandwidth is not None)
+        True
+
         >>> v.setValue(0.)
         >>> eqn = DiffusionTerm(0.2) * 5. - 5. * ImplicitSourceTerm(0.2)
         >>> eqn.solve(v)
@@ -39,6 +39,7 @@ __all__ = []
 import os
 
 from fipy.tools import numerix
+from fipy.tools import telemetry
 from fipy.terms.term import Term
 
 class _UnaryTerm(Term):
@@ -90,25 +91,26 @@ class _UnaryTerm(Term):
 
         """
 
-        if var is self.var or self.var is None:
-            var, matrix, RHSvector = self._buildMatrix(var,
-                                                       SparseMatrix,
-                                                       boundaryConditions=boundaryConditions,
-                                                       dt=dt,
-                                                       transientGeomCoeff=transientGeomCoeff,
-                                                       diffusionGeomCoeff=diffusionGeomCoeff)
-        elif buildExplicitIfOther:
-            _, matrix, RHSvector = self._buildMatrix(self.var,
-                                                     SparseMatrix,
-                                                     boundaryConditions=boundaryConditions,
-                                                     dt=dt,
-                                                     transientGeomCoeff=transientGeomCoeff,
-                                                     diffusionGeomCoeff=diffusionGeomCoeff)
-            RHSvector = RHSvector - matrix * self.var.value
-            matrix = SparseMatrix(mesh=var.mesh)
-        else:
-            RHSvector = numerix.zeros(len(var.ravel()),'d')
-            matrix = SparseMatrix(mesh=var.mesh)
+        with telemetry._phase("buildMatrix", term=self.__class__.__name__):
+            if var is self.var or self.var is None:
+                var, matrix, RHSvector = self._buildMatrix(var,
+                                                           SparseMatrix,
+                                                           boundaryConditions=boundaryConditions,
+                                                           dt=dt,
+                                                           transientGeomCoeff=transientGeomCoeff,
+                                                           diffusionGeomCoeff=diffusionGeomCoeff)
+            elif buildExplicitIfOther:
+                _, matrix, RHSvector = self._buildMatrix(self.var,
+                                                         SparseMatrix,
+                                                         boundaryConditions=boundaryConditions,
+                                                         dt=dt,
+                                                         transientGeomCoeff=transientGeomCoeff,
+                                                         diffusionGeomCoeff=diffusionGeomCoeff)
+                RHSvector = RHSvector - matrix * self.var.value
+                matrix = SparseMatrix(mesh=var.mesh)
+            else:
+                RHSvector = numerix.zeros(len(var.ravel()),'d')
+                matrix = SparseMatrix(mesh=var.mesh)
 
         if ('FIPY_DISPLAY_MATRIX' in os.environ
              and "terms" in os.environ['FIPY_DISPLAY_MATRIX'].lower().split()):
@@ -35,6 +35,7 @@ __docformat__ = 'restructuredtext'
 
 __all__ = []
 
+import sys
 import unittest
 
 class _LateImportTestCase(unittest.TestCase):
@@ -48,12 +49,12 @@ class _LateImportTestCase(unittest.TestCase):
     def setUp(self):
         """
         See documentation of `__import__` for why
-        this ugly hack is necessary
+        this ugly hack is necessary. The module is taken from
+        `sys.modules`, because a package may bind a submodule's name to
+        something else (e.g., `fipy.solvers.solver`).
         """
-        module = __import__(self.moduleName)
-        components = self.moduleName.split('.')
-        for component in components[1:]:
-            module = getattr(module, component)
+        __import__(self.moduleName)
+        module = sys.modules[self.moduleName]
 
         self.suite.addTest(self._getTestSuite(module = module))
 
@@ -40,7 +40,7 @@ def _TestClass(base):
         # name), and help string.
         user_options = base.user_options + [
             ('inline', None, "run FiPy with inline compilation enabled"),
-            ('pythoncompiled=', None, "directory in which to put weave's work product"),
+            ('pythoncompiled=', None, "directory in which to put weave's or numba's work product"),
             ('Trilinos', None, "run FiPy using Trilinos solvers"),
             ('Pysparse', None, "run FiPy using Pysparse solvers (default)"),
             ('trilinos', None, "run FiPy using Trilinos solvers"),
@@ -209,15 +209,15 @@ def _TestClass(base):
                     return
 
             if self.inline:
-                try:
-                    from scipy import weave
-                except ImportError, a:
-                    print >>sys.stderr, "!!! weave library is not installed"
+                from fipy.tools import inline
+                if inline._chooseBackend() is None:
+                    print >>sys.stderr, "!!! neither the weave nor the numba library is installed"
                     return
 
             if self.pythoncompiled is not None:
                 import os
                 os.environ['PYTHONCOMPILED'] = self.pythoncompiled
+                os.environ['FIPY_INLINE_CACHE'] = self.pythoncompiled
 
             self.printPackageInfo()
 
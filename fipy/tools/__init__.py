@@ -115,6 +115,7 @@ import fipy.tools.vector
 from dimensions.physicalField import PhysicalField
 from fipy.tools.numerix import *
 from fipy.tools.vitals import Vitals
+from fipy.tools.telemetry import Telemetry
 
 __all__ = ["serialComm",
            "parallelComm",
@@ -123,6 +124,7 @@ __all__ = ["serialComm",
            "vector",
            "PhysicalField",
            "Vitals",
+           "Telemetry",
            "serial",
            "parallel"]
 
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "counterRandom.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+"""
+Counter-based random numbers.
+
+Each random number is a function of a key, the global ID of the element
+it belongs to, a step counter and a stream number, computed with the
+Philox-4x32-10 bijection of Salmon *et al.*, "Parallel random numbers: As
+easy as 1, 2, 3", SC '11. Because nothing depends on a generator state
+carried from one number to the next, every processor can generate the
+numbers for its own elements, and the result does not depend on the
+number of processors.
+"""
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+from fipy.tools import numerix
+
+_mask32 = numerix.uint64(0xFFFFFFFF)
+_M0 = numerix.uint64(0xD2511F53)
+_M1 = numerix.uint64(0xCD9E8D57)
+_W0 = numerix.uint64(0x9E3779B9)
+_W1 = numerix.uint64(0xBB67AE85)
+_shift32 = numerix.uint64(32)
+
+def _philox(counter, key, rounds=10):
+    """
+    Apply the Philox-4x32 bijection to `counter`, a sequence of four
+    arrays of 32 bit integers, with `key`, a pair of 32 bit integers.
+
+    The known-answer tests of the Random123 reference implementation
+    are reproduced
+
+        >>> def kat(counter, key):
+        ...     counter = [numerix.array([c], dtype='uint64') for c in counter]
+        ...     print ["%08x" % c[0] for c in _philox(counter, key)]
+        >>> kat((0, 0, 0, 0), (0, 0))
+        ['6627e8d5', 'e169c58d', 'bc57ac4c', '9b00dbd8']
+        >>> kat((0xffffffff,) * 4, (0xffffffff, 0xffffffff))
+        ['408f276d', '41c83b0e', 'a20bc7c6', '6d5451fd']
+        >>> kat((0x243f6a88, 0x85a308d3, 0x13198a2e, 0x03707344), (0xa4093822, 0x299f31d0))
+        ['d16cfe09', '94fdcceb', '5001e420', '24126ea1']
+    """
+    c0, c1, c2, c3 = [numerix.asarray(c, dtype='uint64') for c in counter]
+    k0 = numerix.uint64(key[0]) & _mask32
+    k1 = numerix.uint64(key[1]) & _mask32
+
+    for i in range(rounds):
+        p0 = _M0 * c0
+        p1 = _M1 * c2
+        c0, c1, c2, c3 = (((p1 >> _shift32) ^ c1 ^ k0) & _mask32,
+                          p1 & _mask32,
+                          ((p0 >> _shift32) ^ c3 ^ k1) & _mask32,
+                          p0 & _mask32)
+        k0 = (k0 + _W0) & _mask32
+        k1 = (k1 + _W1) & _mask32
+
+    return c0, c1, c2, c3
+
+class _CounterRandom(object):
+    """
+    Random numbers for the elements `IDs` at counter `step` of the
+    sequence identified by `key`.
+
+    Every call to one of the distribution methods draws from a new stream,
+    so the same sequence of calls with the same `key` and `step` gives the
+    same numbers for a given ID, whatever other IDs are present.
+
+        >>> ids = numerix.arange(10)
+        >>> a = _CounterRandom(key=(1, 2), IDs=ids, step=3).normal()
+        >>> b = _CounterRandom(key=(1, 2), IDs=ids[5:], step=3).normal()
+        >>> print numerix.allequal(a[5:], b)
+        True
+        >>> c = _CounterRandom(key=(1, 2), IDs=ids, step=4).normal()
+        >>> print numerix.any(a == c)
+        False
+    """
+    def __init__(self, key, IDs, step):
+        self.key = key
+        self.IDs = numerix.asarray(IDs, dtype='uint64')
+        self.step = numerix.uint64(step) & _mask32
+        self.stream = 0
+
+    def _nextStream(self):
+        self.stream += 1
+        return self.stream - 1
+
+    def _uniformPair(self, stream, draw, IDs=None):
+        """
+        Two independent arrays of uniform random numbers in the open
+        interval (0, 1), with 53 bits of resolution.
+        """
+        if IDs is None:
+            IDs = self.IDs
+        zero = numerix.zeros(IDs.shape, 'uint64')
+        a, b, c, d = _philox((IDs,
+                              zero + numerix.uint64(stream),
+                              zero + self.step,
+                              zero + numerix.uint64(draw)),
+                             self.key)
+        scale = 1. / 9007199254740992.
+        return (((a >> numerix.uint64(5)) * 67108864. + (b >> numerix.uint64(6)) + 0.5) * scale,
+                ((c >> numerix.uint64(5)) * 67108864. + (d >> numerix.uint64(6)) + 0.5) * scale)
+
+    def uniform(self, low=0., high=1.):
+        u, _ = self._uniformPair(self._nextStream(), 0)
+        return low + (high - low) * u
+
+    def normal(self, loc=0., scale=1.):
+        u1, u2 = self._uniformPair(self._nextStream(), 0)
+        return loc + scale * numerix.sqrt(-2. * numerix.log(u1)) * numerix.cos(2. * numerix.pi * u2)
+
+    def exponential(self, scale=1.):
+        u, _ = self._uniformPair(self._nextStream(), 0)
+        return -scale * numerix.log(u)
+
+    def gamma(self, shape, scale=1.):
+        """
+        Gamma distributed numbers, by the rejection method of Marsaglia
+        and Tsang, "A simple method for generating gamma variables", ACM
+        Trans. Math. Softw. 26 (2000) 363.
+
+            >>> x = _CounterRandom(key=(5, 6), IDs=numerix.arange(100000), step=0).gamma(shape=(0.5, 3.) * 50000)
+            >>> print abs(x[::2].mean() - 0.5) < 0.01, abs(x[1::2].mean() - 3.) < 0.03
+            True True
+        """
+        stream = self._nextStream()
+        boostStream = self._nextStream()
+
+        shape = numerix.resize(numerix.asarray(shape, dtype=float), self.IDs.shape)
+        small = shape < 1.
+        d = numerix.where(small, shape + 1., shape) - 1. / 3.
+        c = 1. / numerix.sqrt(9. * numerix.where(d > 0, d, 1.))
+
+        result = numerix.zeros(self.IDs.shape, 'd')
+        pending = numerix.nonzero(shape > 0)[0]
+        draw = 0
+        while len(pending) > 0:
+            IDs = self.IDs[pending]
+            u1, u2 = self._uniformPair(stream, 2 * draw, IDs=IDs)
+            u3, _ = self._uniformPair(stream, 2 * draw + 1, IDs=IDs)
+            x = numerix.sqrt(-2. * numerix.log(u1)) * numerix.cos(2. * numerix.pi * u2)
+            v = (1. + c[pending] * x)**3
+            vpos = numerix.where(v > 0, v, 1.)
+            accept = ((v > 0)
+                      & (numerix.log(u3) < 0.5 * x**2 + d[pending] * (1. - vpos + numerix.log(vpos))))
+            result[pending[accept]] = d[pending[accept]] * v[accept]
+            pending = pending[~accept]
+            draw += 1
+
+        if small.any():
+            u, _ = self._uniformPair(boostStream, 0)
+            result[small] *= u[small]**(1. / numerix.where(shape > 0, shape, 1.)[small])
+
+        return result * scale
+
+    def beta(self, a, b):
+        """
+        Beta distributed numbers, as X / (X + Y) with gamma distributed X
+        and Y.
+
+            >>> x = _CounterRandom(key=(7, 8), IDs=numerix.arange(100000), step=0).beta(a=2., b=6.)
+            >>> print abs(x.mean() - 0.25) < 0.005
+            True
+        """
+        x = self.gamma(shape=a)
+        y = self.gamma(shape=b)
+        return x / numerix.where(x + y > 0, x + y, 1.)
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
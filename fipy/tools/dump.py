@@ -38,8 +38,11 @@ __docformat__ = 'restructuredtext'
 
 import cPickle
 import os
+import struct
 import sys
 import gzip
+import zipfile
+import StringIO
 
 from fipy.tools import parallelComm
 
@@ -52,6 +55,15 @@ def write(data, filename = None, extension = '', communicator=parallelComm):
     Pickle an object and write it to a file. Wrapper for
     `cPickle.dump()`.
 
+    If `filename` (or `extension`, if `filename` is not given) ends in
+    ``.npz``, a binary checkpoint is written instead of a gzipped pickle.
+    Every array is stored uncompressed, in little-endian order, as a
+    separate ``.npy`` entry of a zip archive (see `numpy.savez()`), so that
+    it can be memory-mapped by `read()`. When running in parallel, each
+    process writes only its own (overlapping) part of every mesh and
+    `CellVariable` or `FaceVariable` to a file of its own, named by
+    `_procFilename()`.
+
     :Parameters:
       - `data`: The object to be pickled.
       - `filename`: The name of the file to place the pickled object. If `filename` is `None`
@@ -68,25 +80,65 @@ def write(data, filename = None, extension = '', communicator=parallelComm):
         >>> print old.numberOfCells == new.numberOfCells
         True
 
+    A binary checkpoint of a `CellVariable` keeps its mesh and its old value
+
+        >>> from fipy import CellVariable, Grid2D
+        >>> from fipy.tools import numerix
+        >>> mesh = Grid2D(dx=(1., 2., 3.), dy=(1., 2.))
+        >>> var = CellVariable(mesh=mesh, value=mesh.x * mesh.y, hasOld=True)
+        >>> var.updateOld()
+        >>> var.value = 0.
+        >>> f, tempfile = write(var, extension='.npz')
+        >>> import zipfile
+        >>> print zipfile.is_zipfile(tempfile)
+        True
+        >>> new = read(tempfile, f)
+        >>> print numerix.allclose(new.old, mesh.x * mesh.y)
+        True
+        >>> print numerix.allequal(new, 0.)
+        True
+        >>> print numerix.allclose(new.mesh.cellVolumes, mesh.cellVolumes)
+        True
+
+    and can be read back without copying its arrays into memory
+
+        >>> f, tempfile = write((numerix.arange(5.),
+        ...                      numerix.MA.masked_values((1, -1, 2), -1)),
+        ...                     extension='.npz')
+        >>> a, b = read(tempfile, f, mmap_mode='r')
+        >>> print type(a.base).__name__, a
+        memmap [ 0.  1.  2.  3.  4.]
+        >>> print b
+        [1 -- 2]
+
     """
-    if communicator.procID == 0:
+    binary = (filename or extension).endswith('.npz')
+
+    if communicator.procID == 0 or (binary and communicator.Nproc > 1):
         if filename is None:
             import tempfile
             (f, _filename) =  tempfile.mkstemp(extension)
         else:
             (f, _filename) = (None, filename)
-        fileStream = gzip.GzipFile(filename = _filename, mode = 'w', fileobj = None)
+            if binary:
+                _filename = _procFilename(filename, communicator)
     else:
-        fileStream = open(os.devnull, mode='w')
         (f, _filename) = (None, os.devnull)
 
-    cPickle.dump(data, fileStream, 0)
-    fileStream.close()
+    if binary:
+        _writeCheckpoint(data, _filename, communicator)
+    else:
+        if _filename == os.devnull:
+            fileStream = open(os.devnull, mode='w')
+        else:
+            fileStream = gzip.GzipFile(filename = _filename, mode = 'w', fileobj = None)
+        cPickle.dump(data, fileStream, 0)
+        fileStream.close()
 
     if filename is None:
         return (f, _filename)
 
-def read(filename, fileobject=None, communicator=parallelComm, mesh_unmangle=False):
+def read(filename, fileobject=None, communicator=parallelComm, mesh_unmangle=False, mmap_mode=None):
     """
     Read a pickled object from a file. Returns the unpickled object.
     Wrapper for `cPickle.load()`.
@@ -96,8 +148,22 @@ def read(filename, fileobject=None, communicator=parallelComm, mesh_unmangle=Fal
       - `fileobject`: Used to remove temporary files
       - `communicator`: Object with `procID` and `Nproc` attributes.
       - `mesh_unmangle`: Correct improper pickling of non-uniform meshes (ticket:243)
+      - `mmap_mode`: If not `None`, the arrays of a binary checkpoint are
+        memory-mapped with this mode (see `numpy.memmap`) rather than read.
 
     """
+    if fileobject is None and communicator.Nproc > 1:
+        procFilename = _procFilename(filename, communicator)
+        if os.path.exists(procFilename):
+            filename = procFilename
+
+    if zipfile.is_zipfile(filename):
+        data = _readCheckpoint(filename, mmap_mode)
+        if fileobject is not None:
+            os.close(fileobject)
+            os.remove(filename)
+        return data
+
     if communicator.procID == 0:
         fileStream = gzip.GzipFile(filename = filename, mode = 'r', fileobj = None)
         data = fileStream.read()
@@ -150,6 +216,150 @@ def read(filename, fileobject=None, communicator=parallelComm, mesh_unmangle=Fal
 
     return unpickler.load()
 
+def _procFilename(filename, communicator):
+    """
+    Name of the file that holds this process' part of a parallel binary
+    checkpoint.
+
+        >>> from fipy.tools.comms.dummyComm import DummyComm
+        >>> class Comm(DummyComm):
+        ...     procID = 1
+        ...     Nproc = 4
+        >>> print _procFilename("run/step10.npz", Comm())
+        run/step10.1of4.npz
+        >>> print _procFilename("run/step10.npz", DummyComm())
+        run/step10.npz
+    """
+    if communicator.Nproc > 1:
+        root, ext = os.path.splitext(filename)
+        return "%s.%dof%d%s" % (root, communicator.procID, communicator.Nproc, ext)
+    else:
+        return filename
+
+# `_MeshVariable.__getstate__()` pickles the local, rather than the global,
+# value while a parallel binary checkpoint is being written
+_pickleLocalValues = False
+
+# arrays smaller than this are written to the archive from memory,
+# larger ones are staged through a temporary file to avoid a second copy
+_stagingSize = 2**20
+
+def _writeCheckpoint(data, filename, communicator):
+    from fipy.tools import numerix
+    from numpy.lib import format
+
+    archive = zipfile.ZipFile(filename, mode='w',
+                              compression=zipfile.ZIP_STORED, allowZip64=True)
+
+    def writeArray(arr):
+        name = "arr_%d.npy" % len(archive.namelist())
+
+        dtype = arr.dtype.newbyteorder('<')
+        if dtype != arr.dtype:
+            arr = arr.astype(dtype)
+
+        if arr.nbytes < _stagingSize:
+            buffer = StringIO.StringIO()
+            format.write_array(buffer, arr)
+            archive.writestr(name, buffer.getvalue())
+        else:
+            import tempfile
+            (f, staging) = tempfile.mkstemp('.npy')
+            try:
+                fileStream = os.fdopen(f, 'wb')
+                format.write_array(fileStream, arr)
+                fileStream.close()
+                archive.write(staging, arcname=name)
+            finally:
+                os.remove(staging)
+
+        return name
+
+    def persistent_id(obj):
+        if type(obj) is numerix.ndarray and not obj.dtype.hasobject:
+            return ("array", writeArray(obj))
+        elif (type(obj) is numerix.MA.MaskedArray
+              and not obj.dtype.hasobject and not obj.dtype.names):
+            mask = obj._mask
+            if mask is not numerix.MA.nomask:
+                mask = writeArray(numerix.asarray(mask))
+            return ("masked",
+                    writeArray(numerix.asarray(obj._data)),
+                    mask,
+                    obj.fill_value)
+        else:
+            return None
+
+    global _pickleLocalValues
+    _pickleLocalValues = (communicator.Nproc > 1)
+
+    try:
+        skeleton = StringIO.StringIO()
+        pickler = cPickle.Pickler(skeleton, 2)
+        pickler.persistent_id = persistent_id
+        pickler.dump(data)
+        archive.writestr("data.pkl", skeleton.getvalue())
+    finally:
+        _pickleLocalValues = False
+        archive.close()
+
+def _readCheckpoint(filename, mmap_mode=None):
+    from fipy.tools import numerix
+    from numpy.lib import format
+
+    archive = zipfile.ZipFile(filename, mode='r')
+
+    def readArray(name):
+        if mmap_mode is None:
+            buffer = StringIO.StringIO(archive.read(name))
+            return format.read_array(buffer)
+        else:
+            info = archive.getinfo(name)
+            fileStream = open(filename, 'rb')
+            try:
+                # skip the local header of the zip entry to reach the .npy data
+                fileStream.seek(info.header_offset)
+                header = fileStream.read(30)
+                nameLength, extraLength = struct.unpack("<HH", header[26:30])
+                fileStream.seek(info.header_offset + 30 + nameLength + extraLength)
+
+                version = format.read_magic(fileStream)
+                if version == (1, 0):
+                    shape, fortran_order, dtype = format.read_array_header_1_0(fileStream)
+                else:
+                    shape, fortran_order, dtype = format.read_array_header_2_0(fileStream)
+                offset = fileStream.tell()
+            finally:
+                fileStream.close()
+
+            if numerix.multiply.reduce(shape) == 0:
+                return numerix.empty(shape, dtype=dtype)
+
+            mapped = numerix.memmap(filename, dtype=dtype, mode=mmap_mode, offset=offset,
+                                    shape=shape, order='F' if fortran_order else 'C')
+
+            # numerix checks for exact ndarray types, but a view still
+            # reads from the mapped file
+            return mapped.view(numerix.ndarray)
+
+    def persistent_load(pid):
+        if pid[0] == "array":
+            return readArray(pid[1])
+        elif pid[0] == "masked":
+            kind, data, mask, fill_value = pid
+            if mask is not numerix.MA.nomask:
+                mask = readArray(mask)
+            return numerix.MA.array(readArray(data), mask=mask, fill_value=fill_value)
+        else:
+            raise cPickle.UnpicklingError, "unknown checkpoint entry %s" % repr(pid)
+
+    try:
+        unpickler = cPickle.Unpickler(StringIO.StringIO(archive.read("data.pkl")))
+        unpickler.persistent_load = persistent_load
+        return unpickler.load()
+    finally:
+        archive.close()
+
 def _test():
     import fipy.tests.doctestPlus
     return fipy.tests.doctestPlus.testmod()
@@ -0,0 +1,80 @@
+__all__ = ["doFusion"]
+
+import os
+import sys
+
+from fipy.tools import numerix
+from fipy.tests.doctestPlus import register_skipper
+
+def _checkForNumexpr():
+    hasNumexpr = True
+    try:
+        import numexpr
+    except Exception:
+        hasNumexpr = False
+    return hasNumexpr
+
+register_skipper(flag="NUMEXPR",
+                 test=_checkForNumexpr,
+                 why="the `numexpr` package cannot be imported")
+
+if '--fuse' in [s.lower() for s in sys.argv[1:]]:
+    doFusion = True
+else:
+    doFusion = 'FIPY_FUSE' in os.environ
+
+if doFusion and not _checkForNumexpr():
+    import warnings
+    warnings.warn("--fuse requires numexpr; falling back to NumPy")
+    doFusion = False
+
+# numpy ufuncs that numexpr knows by another name
+_functionNames = {
+    'absolute': 'abs',
+    'fabs': 'abs',
+    'conjugate': 'conj'
+}
+
+class _FusionError(Exception):
+    pass
+
+def _evaluate(expression, argDict):
+    """
+    Evaluate `expression` (as generated by
+    `_OperatorVariable._getRepresentation(style="numexpr")`) in a single
+    pass over the arrays in `argDict`.
+
+        >>> from fipy.tools import numerix
+        >>> print _evaluate("(var0 * exp(var1))",
+        ...                 {'var0': 2., 'var1': numerix.array((0., 0.))}) # doctest: +NUMEXPR
+        [ 2.  2.]
+        >>> print repr(_evaluate("(var0 * var1)", {'var0': 3, 'var1': 4})) # doctest: +NUMEXPR
+        12
+        >>> _evaluate("(var0[var1])", {'var0': numerix.array((0., 0.)), 'var1': 1}) # doctest: +NUMEXPR
+        Traceback (most recent call last):
+            ...
+        _FusionError: (var0[var1])
+    """
+    import numexpr
+
+    for value in argDict.values():
+        if numerix.MA.isMaskedArray(value):
+            raise _FusionError, "numexpr does not preserve masks"
+
+    try:
+        result = numexpr.evaluate(expression, local_dict=argDict, global_dict={})
+    except (SyntaxError, KeyError, TypeError, ValueError, NotImplementedError, AttributeError):
+        raise _FusionError, expression
+
+    if result.shape == ():
+        # NumPy returns scalars, not 0-d arrays
+        result = result[()]
+
+    return result
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -9,6 +9,39 @@ if '--inline' in [s.lower() for s in sys.argv[1:]]:
 else:
     doInline = 'FIPY_INLINE' in os.environ
 
+def _chooseBackend():
+    """
+    Pick the package that compiles the inline kernels: :mod:`scipy.weave`
+    or, where it is missing (or the :envvar:`FIPY_INLINE_BACKEND`
+    environment variable asks for it), :term:`Numba`.
+    """
+    backends = ['weave', 'numba']
+    requested = os.environ.get('FIPY_INLINE_BACKEND', '').lower()
+    if requested in backends:
+        backends.remove(requested)
+        backends.insert(0, requested)
+
+    for backend in backends:
+        try:
+            if backend == 'weave':
+                from scipy import weave
+            else:
+                import numba
+            return backend
+        except ImportError:
+            pass
+
+    return None
+
+if doInline:
+    _backend = _chooseBackend()
+    if _backend is None:
+        import warnings
+        warnings.warn("--inline requires either scipy.weave or numba; falling back to NumPy")
+        doInline = False
+else:
+    _backend = None
+
 _inlineFrameComment = 'FIPY_INLINE_COMMENT' in os.environ
 
 def _getframeinfo(level, context=1):
@@ -181,3 +214,15 @@ static int arrayIndex(PyArrayObject* array, int i, int vec[])
     return index / array->descr->elsize;
 }
                  """)
+
+if _backend == 'numba':
+    # imported late, because `fipy.tools.numerix` imports this module
+    def _runInline(code_in, converters=None, verbose=0, comment=None, **args):
+        from fipy.tools import numbaInline
+        numbaInline._runInline(code_in, converters=converters, verbose=verbose,
+                               comment=comment, **args)
+
+    def _runIterateElementInline(code_in, converters=None, verbose=0, comment=None, **args):
+        from fipy.tools import numbaInline
+        numbaInline._runIterateElementInline(code_in, converters=converters, verbose=verbose,
+                                             comment=comment, **args)
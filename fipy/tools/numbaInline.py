@@ -0,0 +1,584 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "numbaInline.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #
+ # ###################################################################
+ ##
+
+"""
+:term:`Numba` backend for the `--inline` kernels.
+
+The C snippets that FiPy hands to `fipy.tools.inline._runInline()` and
+`fipy.tools.inline._runIterateElementInline()`, including the expressions
+generated by `Variable._getCstring()`, are translated into the equivalent
+Python loops, which are compiled by Numba into fused, single pass kernels.
+Only the small subset of C used by those snippets is understood:
+declarations, assignments, `for`, `while`, `if` and `else`, `#define`
+macros and the `ITEM()` macro of `_runIterateElementInline()`.
+
+The generated module for each kernel is written to the directory named by
+the :envvar:`FIPY_INLINE_CACHE` environment variable (by default
+`~/.fipy/inline`), under the hash of its source, and Numba caches the
+compiled machine code alongside it, so that later runs need not recompile.
+"""
+__docformat__ = 'restructuredtext'
+
+__all__ = []
+
+import hashlib
+import imp
+import os
+import re
+import tempfile
+
+from fipy.tools import numerix
+from fipy.tests.doctestPlus import register_skipper
+
+def _checkForNumba():
+    hasNumba = True
+    try:
+        import numba
+    except Exception:
+        hasNumba = False
+    return hasNumba
+
+register_skipper(flag="NUMBA",
+                 test=_checkForNumba,
+                 why="the `numba` package cannot be imported")
+
+_moduleTemplate = '''\
+# Generated by fipy.tools.numbaInline from
+#
+%(comment)s
+#
+import numba
+from math import *
+
+@numba.njit(cache=True)
+def fmod(x, y):
+    return x - y * trunc(x / y)
+
+@numba.njit(cache=True)
+def absolute(x):
+    return abs(x)
+
+power = pow
+
+@numba.njit(cache=True)
+%(kernel)s
+'''
+
+_declaration = re.compile(r"^(?:(?:const|static|register|unsigned|signed)\s+)*"
+                          r"(int|long\s+long|long\s+int|long|short|char|bool|double|float)\s+(.*)$",
+                          re.DOTALL)
+
+def _matchingParenthesis(code, start):
+    """
+    Return the index of the parenthesis that closes the one at `start`.
+
+        >>> _matchingParenthesis("f(a, (b + c)) + d", 1)
+        12
+    """
+    depth = 0
+    for index in range(start, len(code)):
+        if code[index] in "([":
+            depth += 1
+        elif code[index] in ")]":
+            depth -= 1
+            if depth == 0:
+                return index
+    raise SyntaxError, "unbalanced parentheses in: %s" % code
+
+def _split(code, separator):
+    """
+    Split `code` at each `separator` that is not inside parentheses.
+
+        >>> _split("ITEM(a, i, vec), b", ",")
+        ['ITEM(a, i, vec)', ' b']
+    """
+    pieces = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(code):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            pieces.append(code[start:index])
+            start = index + 1
+    pieces.append(code[start:])
+    return pieces
+
+def _replaceCalls(code, name, replacement):
+    """
+    Replace every call `name(arg, ...)` in `code` by
+    `replacement(args)`, innermost calls first.
+
+        >>> _replaceCalls("mod(mod(x) + y)", "mod", lambda args: "M<%s>" % args[0])
+        'M<M<x> + y>'
+    """
+    pattern = re.compile(r"\b%s\s*\(" % name)
+    match = pattern.search(code)
+    while match is not None:
+        start = match.end() - 1
+        end = _matchingParenthesis(code, start)
+        args = [_replaceCalls(arg, name, replacement).strip()
+                for arg in _split(code[start + 1:end], ",")]
+        substitute = replacement(args)
+        code = code[:match.start()] + substitute + code[end + 1:]
+        match = pattern.search(code, match.start() + len(substitute))
+    return code
+
+def _expandMacros(code):
+    """
+    Remove comments and expand `#define` macros.
+
+        >>> print _expandMacros('''
+        ...     # define pi 3.14
+        ...     # define mod(x) (fmod(x + pi, 2. * pi) - pi)
+        ...     val[i] = mod(var[i] * 2); // wrap
+        ... ''').strip()
+        val[i] = (fmod((var[i] * 2) + 3.14, 2. * 3.14) - 3.14);
+    """
+    code = re.sub(r"/\*.*?\*/", "", code, flags=re.DOTALL)
+    code = re.sub(r"//[^\n]*", "", code)
+
+    macros = []
+    lines = []
+    for line in code.splitlines():
+        match = re.match(r"\s*#\s*define\s+(\w+)(?:\(([^)]*)\))?\s*(.*)$", line)
+        if match is not None:
+            name, params, body = match.groups()
+            if params is not None:
+                params = [param.strip() for param in params.split(",")]
+            macros.append((name, params, body.strip()))
+        elif not re.match(r"\s*#", line):
+            lines.append(line)
+    code = "\n".join(lines)
+
+    def expand(code):
+        for name, params, body in macros:
+            if params is None:
+                code = re.sub(r"\b%s\b" % name, body, code)
+            else:
+                def substitute(args, params=params, body=body):
+                    for param, arg in zip(params, args):
+                        body = re.sub(r"\b%s\b" % param, "(%s)" % arg, body)
+                    return body
+                code = _replaceCalls(code, name, substitute)
+        return code
+
+    for level in range(10):
+        expanded = expand(code)
+        if expanded == code:
+            break
+        code = expanded
+
+    return code
+
+def _replaceItems(code, ndims):
+    """
+    Translate the `ITEM(arr, i, vec)` macro of
+    `_runIterateElementInline()` to explicit indexing of the
+    multidimensional array `arr`, whose last index is `i` and whose leading
+    indices are taken from `vec`.
+
+        >>> print _replaceItems("ITEM(val, i, vec) += ITEM(o, i, &k) * ITEM(v, ITEM(ids, i, NULL), vec)",
+        ...                     {'val': 3, 'o': 2, 'v': 2, 'ids': 1})
+        val[vec0, vec1, i] += o[k, i] * v[vec0, ids[i]]
+    """
+    def item(args):
+        array, index, vec = args
+        rank = ndims[array] - 1
+        if vec == "NULL":
+            leading = ["0"] * rank
+        elif vec.startswith("&"):
+            if rank != 1:
+                raise SyntaxError, "%s has rank %d, but only one index was given" % (array, rank)
+            leading = [vec[1:].strip()]
+        else:
+            leading = ["%s%d" % (vec, dim) for dim in range(rank)]
+        return "%s[%s]" % (array, ", ".join(leading + [index]))
+
+    code = _replaceCalls(code, "ITEM", item)
+
+    return re.sub(r"\bvec\s*\[\s*(\d+)\s*\]", r"vec\1", code)
+
+class _CParser(object):
+    """
+    Parse the statements of a C snippet into a tree of `('stmt', text)`,
+    `('block', body)`, `('for', header, body)`, `('while', condition, body)`
+    and `('if', condition, body, orelse)` nodes.
+
+        >>> _CParser("if (a[i] > 0) { b[i] = 1; } else b[i] = 0;").parse()
+        [('if', 'a[i] > 0', ('block', [('stmt', 'b[i] = 1')]), ('stmt', 'b[i] = 0'))]
+    """
+    def __init__(self, code):
+        self.code = code
+        self.pos = 0
+
+    def parse(self):
+        nodes = []
+        self._skip()
+        while self.pos < len(self.code):
+            nodes.append(self._statement())
+            self._skip()
+        return nodes
+
+    def _skip(self):
+        while self.pos < len(self.code) and self.code[self.pos].isspace():
+            self.pos += 1
+
+    def _keyword(self, word):
+        end = self.pos + len(word)
+        if (self.code.startswith(word, self.pos)
+            and (end == len(self.code) or not (self.code[end].isalnum() or self.code[end] == "_"))):
+            self.pos = end
+            self._skip()
+            return True
+        return False
+
+    def _parenthesized(self):
+        if self.code[self.pos] != "(":
+            raise SyntaxError, "expected '(' in: %s" % self.code[self.pos:]
+        end = _matchingParenthesis(self.code, self.pos)
+        text = self.code[self.pos + 1:end]
+        self.pos = end + 1
+        return text.strip()
+
+    def _condition(self):
+        if self.code[self.pos] == "(":
+            return self._parenthesized()
+        else:
+            # e.g., `if ITEM(a, i, NULL) {`
+            end = self.code.index("{", self.pos)
+            text = self.code[self.pos:end]
+            self.pos = end
+            return text.strip()
+
+    def _statement(self):
+        self._skip()
+        if self.code[self.pos] == "{":
+            self.pos += 1
+            body = []
+            self._skip()
+            while self.code[self.pos] != "}":
+                body.append(self._statement())
+                self._skip()
+            self.pos += 1
+            return ('block', body)
+        elif self._keyword("for"):
+            header = self._parenthesized()
+            return ('for', header, self._statement())
+        elif self._keyword("while"):
+            condition = self._parenthesized()
+            return ('while', condition, self._statement())
+        elif self._keyword("if"):
+            condition = self._condition()
+            body = self._statement()
+            self._skip()
+            if self._keyword("else"):
+                orelse = self._statement()
+            else:
+                orelse = None
+            return ('if', condition, body, orelse)
+        else:
+            end = self.pos + len(_split(self.code[self.pos:], ";")[0])
+            if end >= len(self.code):
+                raise SyntaxError, "missing ';' in: %s" % self.code[self.pos:]
+            text = self.code[self.pos:end]
+            self.pos = end + 1
+            return ('stmt', " ".join(text.split()))
+
+def _translateExpression(expression):
+    """
+        >>> print _translateExpression("!(a && b) || c != d")
+        not (a and b) or c != d
+    """
+    expression = " ".join(expression.split())
+    expression = expression.replace("&&", " and ").replace("||", " or ")
+    expression = re.sub(r"!(?!=)\s*", "not ", expression)
+    return " ".join(expression.split())
+
+def _translateStatement(statement):
+    """
+        >>> _translateStatement("double t1, t2 = x[i]")
+        ['t1 = 0.', 't2 = x[i]']
+        >>> _translateStatement("k++")
+        ['k += 1']
+    """
+    if len(statement) == 0:
+        return []
+
+    match = _declaration.match(statement)
+    if match is not None:
+        type, declarators = match.groups()
+        if type in ("double", "float"):
+            zero = "0."
+        else:
+            zero = "0"
+        lines = []
+        for declarator in _split(declarators, ","):
+            if "=" in declarator:
+                name, value = declarator.split("=", 1)
+                lines.append("%s = %s" % (name.strip(), _translateExpression(value)))
+            else:
+                lines.append("%s = %s" % (declarator.strip(), zero))
+        return lines
+
+    match = re.match(r"^(?:(\w+)\s*(\+\+|--)|(\+\+|--)\s*(\w+))$", statement)
+    if match is not None:
+        name = match.group(1) or match.group(4)
+        operator = (match.group(2) or match.group(3))[0]
+        return ["%s %s= 1" % (name, operator)]
+
+    return [_translateExpression(statement)]
+
+def _emit(nodes, indent, lines):
+    start = len(lines)
+    for node in nodes:
+        kind = node[0]
+        if kind == 'stmt':
+            lines.extend([indent + line for line in _translateStatement(node[1])])
+        elif kind == 'block':
+            _emit(node[1], indent, lines)
+        elif kind == 'for':
+            init, condition, increment = [part.strip() for part in _split(node[1], ";")]
+            init = _translateStatement(init)
+            match = None
+            if len(init) == 1:
+                name, first = [part.strip() for part in init[0].split("=", 1)]
+                match = re.match(r"^%s\s*(<=?)\s*(.*)$" % name, condition)
+                counts = _translateStatement(increment) == ["%s += 1" % name]
+            if match is not None and counts:
+                last = _translateExpression(match.group(2))
+                if match.group(1) == "<=":
+                    last = "(%s) + 1" % last
+                lines.append(indent + "for %s in range(%s, %s):" % (name, first, last))
+                _emit(_body(node[2]), indent + "    ", lines)
+            else:
+                lines.extend([indent + line for line in init])
+                lines.append(indent + "while %s:" % _translateExpression(condition))
+                _emit(_body(node[2]) + [('stmt', increment)], indent + "    ", lines)
+        elif kind == 'while':
+            lines.append(indent + "while %s:" % _translateExpression(node[1]))
+            _emit(_body(node[2]), indent + "    ", lines)
+        elif kind == 'if':
+            keyword = "if"
+            while node is not None and node[0] == 'if':
+                lines.append(indent + "%s %s:" % (keyword, _translateExpression(node[1])))
+                _emit(_body(node[2]), indent + "    ", lines)
+                keyword = "elif"
+                node = node[3]
+            if node is not None:
+                lines.append(indent + "else:")
+                _emit(_body(node), indent + "    ", lines)
+    if len(lines) == start:
+        lines.append(indent + "pass")
+
+def _body(node):
+    if node[0] == 'block':
+        return node[1]
+    else:
+        return [node]
+
+def _kernelSource(code, names, ndims, loops):
+    """
+    Translate the C snippet `code` into the source of a Python function
+    `kernel(*names)` that wraps the translation in `loops`, a list of
+    `(index, bound)` pairs. Plain subscripts of an array `a` are
+    redirected to the argument `_flat_a`, if there is one.
+
+        >>> print _kernelSource('''
+        ...     if (fabs(P[i]) < eps) {
+        ...         P[i] = eps;
+        ...     } else if (P[i] > 10. || !(P[i] < -10.))
+        ...         P[i] /= 2.;
+        ...     else {
+        ...     }
+        ... ''', names=['P', 'eps', 'ni'], ndims={'P': 1}, loops=[('i', 'ni')])
+        def kernel(P, eps, ni):
+            for i in range(ni):
+                if fabs(P[i]) < eps:
+                    P[i] = eps
+                elif P[i] > 10. or not (P[i] < -10.):
+                    P[i] /= 2.
+                else:
+                    pass
+
+        >>> print _kernelSource('''
+        ...     int k;
+        ...     for (k = 0; k < M; k++) {
+        ...         ITEM(val, i, vec) += ITEM(o, i, &k) * ITEM(f, ITEM(ids, i, &k), NULL);
+        ...     }
+        ... ''', names=['M', 'f', 'ids', 'ni', 'o', 'shape', 'val'],
+        ... ndims={'f': 1, 'ids': 2, 'o': 2, 'val': 2},
+        ... loops=[('i', 'ni'), ('vec0', 'shape[0]')])
+        def kernel(M, f, ids, ni, o, shape, val):
+            for i in range(ni):
+                for vec0 in range(shape[0]):
+                    k = 0
+                    for k in range(0, M):
+                        val[vec0, i] += o[k, i] * f[ids[k, i]]
+    """
+    code = _expandMacros(code)
+    for name in names:
+        if name.startswith("_flat_"):
+            # plain C subscripts index the raw data of the array
+            code = re.sub(r"\b%s(\s*\[)" % name[len("_flat_"):], name + r"\1", code)
+    code = _replaceItems(code, ndims)
+    if "?" in code:
+        raise SyntaxError, "conditional expressions are not supported"
+
+    lines = ["def kernel(%s):" % ", ".join(names)]
+    indent = "    "
+    for index, bound in loops:
+        lines.append(indent + "for %s in range(%s):" % (index, bound))
+        indent += "    "
+    _emit(_CParser(code).parse(), indent, lines)
+
+    return "\n".join(lines)
+
+def _cacheDirectory():
+    directory = os.environ.get('FIPY_INLINE_CACHE',
+                               os.path.join(os.path.expanduser('~'), '.fipy', 'inline'))
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            pass
+    if not os.access(directory, os.W_OK):
+        directory = tempfile.gettempdir()
+    return directory
+
+def _loadKernel(source):
+    name = "fipy_inline_" + hashlib.sha1(source).hexdigest()
+    directory = _cacheDirectory()
+    path = os.path.join(directory, name + ".py")
+    if not os.path.exists(path):
+        # write under a temporary name, so that parallel processes never
+        # import a partially written file
+        fd, temporary = tempfile.mkstemp(suffix=".py", dir=directory)
+        os.write(fd, source)
+        os.close(fd)
+        os.rename(temporary, path)
+    return imp.load_source(name, path).kernel
+
+_kernels = {}
+
+def _kernel(code, comment, args, loops):
+    names = sorted(args.keys())
+    ndims = dict([(name, numerix.ndim(args[name])) for name in names])
+    key = (code, comment, tuple(loops), tuple([(name, ndims[name]) for name in names]))
+
+    if key not in _kernels:
+        header = "\n".join(["# " + line for line in (comment + code).splitlines()])
+        source = _moduleTemplate % {'comment': header,
+                                    'kernel': _kernelSource(code, names, ndims, loops)}
+        _kernels[key] = _loadKernel(source)
+
+    return _kernels[key]
+
+def _kernelArgument(value, flatten):
+    value = numerix.asarray(value)
+    if value.shape == ():
+        return value[()]
+    if value.dtype.char == '?':
+        # view, rather than copy, so that the kernel can write to it
+        value = value.view('B')
+    if flatten:
+        # weave indexes the raw data of the array
+        value = numerix.ascontiguousarray(value).reshape(-1)
+    return value
+
+def _runInline(code_in, converters=None, verbose=0, comment=None, **args):
+    """
+        >>> from fipy.tools import numerix
+        >>> a = numerix.array(((1., 2.), (3., 4.)))
+        >>> b = numerix.zeros((2, 2))
+        >>> _runInline("b[i + j * ni] = sqrt(a[i + j * ni]) > 1.5 && j == 1;",
+        ...            a=a, b=b, ni=2, nj=2) # doctest: +NUMBA
+        >>> print b # doctest: +NUMBA
+        [[ 0.  0.]
+         [ 1.  1.]]
+    """
+    loops = []
+    for index in "ijk":
+        if ("n" + index) not in args:
+            break
+        loops.append((index, "n" + index))
+
+    for key in args.keys():
+        args[key] = _kernelArgument(args[key], flatten=True)
+
+    kernel = _kernel(code_in, comment or "", args, loops)
+    if verbose:
+        print kernel.__module__
+
+    kernel(*[args[name] for name in sorted(args.keys())])
+
+def _runIterateElementInline(code_in, converters=None, verbose=0, comment=None, **args):
+    """
+        >>> from fipy.tools import numerix
+        >>> val = numerix.zeros((2, 3))
+        >>> ids = numerix.array((2, 0, 1))
+        >>> faces = numerix.array(((1., 2., 3.), (4., 5., 6.)))
+        >>> scale = numerix.array(((1.,), (10.,)))
+        >>> _runIterateElementInline('''
+        ...     int id = ITEM(ids, i, NULL);
+        ...     ITEM(val, i, vec) = ITEM(faces, id, vec) * scale[vec[0]];
+        ... ''', val=val, ids=ids, faces=faces, scale=scale, ni=3,
+        ... shape=numerix.array(val.shape)) # doctest: +NUMBA
+        >>> print val # doctest: +NUMBA
+        [[  3.   1.   2.]
+         [ 60.  40.  50.]]
+    """
+    loops = [('i', 'ni')]
+    for dim in range(len(args['shape']) - 1):
+        loops.append(('vec%d' % dim, 'shape[%d]' % dim))
+
+    for key in args.keys():
+        args[key] = _kernelArgument(args[key], flatten=False)
+        if numerix.ndim(args[key]) > 1 and re.search(r"\b%s\s*\[" % key, code_in):
+            args["_flat_" + key] = _kernelArgument(args[key], flatten=True)
+
+    kernel = _kernel(code_in, comment or "", args, loops)
+    if verbose:
+        print kernel.__module__
+
+    kernel(*[args[name] for name in sorted(args.keys())])
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -429,13 +429,13 @@ if inline.doInline:
 
         Usually used with v1==v2 to return magnitude of v1.
         """
-        unit1 = unit2 = 1
+        from fipy.tools.dimensions.physicalField import _unity
 
         def dimensionlessUnmasked(a):
-            unit = 1
+            unit = _unity
             mask = False
             if _isPhysical(a):
-                unit = a.inBaseUnits().getUnit()
+                unit = a.inBaseUnits().unit
                 a = a.numericValue
             if MA.isMaskedArray(a):
                 mask = a.mask
@@ -460,12 +460,12 @@ if inline.doInline:
             result1[i] = sqrt(result1[i]);
         """,result1=result1, a1=a1, a2=a2, ni=ni, NJ=NJ)
 
-        if NUMERIX.any(mask1) or NUMERIX.any(mask2):
-            result1 = MA.array(result1, mask=NUMERIX.logical_or(mask1, mask2))
+        # masked, like `sqrt(dot(a1, a2))`
+        result1 = MA.array(result1, mask=NUMERIX.logical_or(mask1, mask2))
 
-        if unit1 != 1 or unit2 != 1:
+        if not (unit1.isDimensionless() and unit2.isDimensionless()):
             from fipy.tools.dimensions.physicalField import PhysicalField
-            result1 = PhysicalField(value=result, unit=(unit1 * unit2)**0.5)
+            result1 = PhysicalField(value=result1, unit=(unit1 * unit2)**0.5)
 
         return result1
 else:
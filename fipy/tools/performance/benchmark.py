@@ -0,0 +1,604 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "benchmark.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+"""
+Benchmarks of the building blocks of a FiPy simulation.
+
+The suite times mesh construction, the assembly of diffusion,
+convection, transient and coupled equations, the linear solvers of each
+installed suite, the evaluation of `Variable` expressions, interpolation
+and I/O, each for a range of problem sizes. Runs are kept as JSON files,
+and two runs are compared to find the benchmarks that became
+significantly slower::
+
+    $ python setup.py benchmark --output=before.json
+    ... change FiPy ...
+    $ python setup.py benchmark --output=after.json
+    $ python -m fipy.tools.performance.benchmark compare before.json after.json
+
+or, without `setup.py`::
+
+    $ python -m fipy.tools.performance.benchmark run --output=after.json --sizes=1000,10000
+
+Nothing is sent over the network.
+"""
+__docformat__ = 'restructuredtext'
+
+import math
+import os
+import sys
+import time
+import timeit
+from distutils.core import Command
+
+__all__ = ["run", "save", "load", "compare", "Benchmark"]
+
+_benchmarks = []
+
+def _register(name):
+    """
+    Add the decorated function to the suite as benchmark `name`.
+
+    The function takes the number of cells and prepares the problem. It
+    returns the function to time, which takes no arguments and returns
+    either `None` or the time in seconds that it measured itself, e.g.,
+    to leave out work that is not being benchmarked. A benchmark that
+    cannot run here, because a package is missing, raises `ImportError`
+    from either function.
+    """
+    def register(setup):
+        _benchmarks.append((name, setup))
+        return setup
+    return register
+
+def _grid2D(size):
+    from fipy import Grid2D
+    N = max(int(math.sqrt(size)), 2)
+    return Grid2D(nx=N, ny=N, dx=1. / N, dy=1. / N)
+
+@_register("mesh.Grid2D")
+def _meshGrid2D(size):
+    def bench():
+        mesh = _grid2D(size)
+        mesh.cellCenters, mesh._cellDistances, mesh.faceNormals
+    return bench
+
+@_register("mesh.Grid3D")
+def _meshGrid3D(size):
+    from fipy import Grid3D
+    N = max(int(round(size**(1. / 3))), 2)
+    def bench():
+        mesh = Grid3D(nx=N, ny=N, nz=N)
+        mesh.cellCenters, mesh._cellDistances, mesh.faceNormals
+    return bench
+
+@_register("mesh.Tri2D")
+def _meshTri2D(size):
+    from fipy import Tri2D
+    # four triangles per square
+    N = max(int(math.sqrt(size / 4.)), 2)
+    def bench():
+        mesh = Tri2D(nx=N, ny=N)
+        mesh.cellCenters, mesh._cellDistances, mesh.faceNormals
+    return bench
+
+def _assemble(eq, var, dt=1.):
+    from fipy import DummySolver
+    solver = DummySolver()
+    def bench():
+        eq._prepareLinearSystem(var=var, solver=solver, boundaryConditions=(), dt=dt)
+    return bench
+
+@_register("assemble.diffusion")
+def _assembleDiffusion(size):
+    from fipy import CellVariable, DiffusionTerm
+    mesh = _grid2D(size)
+    var = CellVariable(mesh=mesh)
+    var.constrain(1., mesh.facesLeft)
+    return _assemble(DiffusionTerm(coeff=1.), var)
+
+@_register("assemble.convection")
+def _assembleConvection(size):
+    from fipy import CellVariable, PowerLawConvectionTerm
+    mesh = _grid2D(size)
+    var = CellVariable(mesh=mesh)
+    var.constrain(1., mesh.facesLeft)
+    return _assemble(PowerLawConvectionTerm(coeff=(1., 0.5)), var)
+
+@_register("assemble.transient")
+def _assembleTransient(size):
+    from fipy import CellVariable, TransientTerm, DiffusionTerm, ImplicitSourceTerm
+    mesh = _grid2D(size)
+    var = CellVariable(mesh=mesh, hasOld=True)
+    var.constrain(1., mesh.facesLeft)
+    return _assemble(TransientTerm() == DiffusionTerm(coeff=1.) - ImplicitSourceTerm(coeff=var), var)
+
+@_register("assemble.coupled")
+def _assembleCoupled(size):
+    from fipy import CellVariable, TransientTerm, DiffusionTerm, ImplicitSourceTerm
+    mesh = _grid2D(size)
+    v0 = CellVariable(mesh=mesh, hasOld=True)
+    v1 = CellVariable(mesh=mesh, hasOld=True)
+    v0.constrain(1., mesh.facesLeft)
+    v1.constrain(0., mesh.facesRight)
+    eq0 = TransientTerm(var=v0) == DiffusionTerm(coeff=1., var=v0) + ImplicitSourceTerm(coeff=1., var=v1)
+    eq1 = TransientTerm(var=v1) == DiffusionTerm(coeff=2., var=v1) - ImplicitSourceTerm(coeff=1., var=v0)
+    return _assemble(eq0 & eq1, None)
+
+def _solve(suite, solverName, size):
+    from fipy import CellVariable, DiffusionTerm
+    from fipy.tools.telemetry import Telemetry
+    module = __import__("fipy.solvers.%s" % suite, fromlist=[solverName])
+    if not hasattr(module, solverName):
+        raise ImportError("fipy.solvers.%s has no %s" % (suite, solverName))
+    solver = getattr(module, solverName)(tolerance=1e-10, iterations=1000)
+
+    mesh = _grid2D(size)
+    var = CellVariable(mesh=mesh)
+    var.constrain(1., mesh.facesLeft)
+    var.constrain(0., mesh.facesRight)
+    eq = DiffusionTerm(coeff=1.)
+
+    def bench():
+        var.value = 0.
+        with Telemetry() as telemetry:
+            eq.solve(var=var, solver=solver)
+        # only the linear solve, not the assembly
+        return sum([event['wall'] for event in telemetry.events if event['name'] == 'solve'])
+    return bench
+
+for _suite in ("scipy", "pysparse", "trilinos", "pyAMG"):
+    for _solverName in ("LinearPCGSolver", "LinearGMRESSolver", "LinearLUSolver"):
+        def _solveSetup(size, suite=_suite, solverName=_solverName):
+            return _solve(suite, solverName, size)
+        _register("solve.%s.%s" % (_suite, _solverName))(_solveSetup)
+
+@_register("variable.expression")
+def _variableExpression(size):
+    from fipy import CellVariable, numerix
+    mesh = _grid2D(size)
+    var = CellVariable(mesh=mesh, value=mesh.x)
+    expr = var**2 + numerix.sin(var) * 3. - numerix.exp(-var) / (1. + var)
+    def bench():
+        # invalidate the expression
+        var.value = var.value
+        expr.value
+    return bench
+
+@_register("interpolation.faceValue")
+def _interpolationFaceValue(size):
+    from fipy import CellVariable
+    mesh = _grid2D(size)
+    var = CellVariable(mesh=mesh, value=mesh.x * mesh.y)
+    face = var.harmonicFaceValue
+    def bench():
+        var.value = var.value
+        face.value
+    return bench
+
+@_register("interpolation.gradient")
+def _interpolationGradient(size):
+    from fipy import CellVariable
+    mesh = _grid2D(size)
+    var = CellVariable(mesh=mesh, value=mesh.x * mesh.y)
+    grad, faceGrad = var.grad, var.faceGrad
+    def bench():
+        var.value = var.value
+        grad.value, faceGrad.value
+    return bench
+
+@_register("interpolation.points")
+def _interpolationPoints(size):
+    from fipy import CellVariable, numerix
+    mesh = _grid2D(size)
+    var = CellVariable(mesh=mesh, value=mesh.x * mesh.y)
+    points = numerix.random.random((2, 1000))
+    def bench():
+        var(points, order=1)
+    return bench
+
+def _dump(size, extension):
+    import tempfile
+    from fipy import CellVariable
+    from fipy.tools import dump
+    var = CellVariable(mesh=_grid2D(size), value=1.)
+    def bench():
+        fd, fname = tempfile.mkstemp(suffix=extension)
+        os.close(fd)
+        try:
+            dump.write(var, filename=fname)
+            dump.read(fname)
+        finally:
+            os.remove(fname)
+    return bench
+
+@_register("io.dump")
+def _ioDump(size):
+    return _dump(size, extension=".gz")
+
+@_register("io.npz")
+def _ioNpz(size):
+    return _dump(size, extension=".npz")
+
+@_register("example.anisotropy")
+def _exampleAnisotropy(size):
+    """
+    Time steps of the dendritic solidification of
+    `examples.phase.anisotropy`, after the first step.
+    """
+    from fipy import Variable, CellVariable, Grid2D, TransientTerm, DiffusionTerm, ImplicitSourceTerm
+    from fipy.tools import numerix
+
+    N = max(int(math.sqrt(size)), 2)
+    dx = dy = 0.025
+    mesh = Grid2D(dx=dx, dy=dy, nx=N, ny=N)
+    dt = 5e-4
+    phase = CellVariable(mesh=mesh, hasOld=True)
+    dT = CellVariable(mesh=mesh, hasOld=True)
+    heatEq = TransientTerm() == DiffusionTerm(2.25) + (phase - phase.old) / dt
+
+    alpha, c, symmetry, theta = 0.015, 0.02, 6., numerix.pi / 8.
+    psi = theta + numerix.arctan2(phase.faceGrad[1], phase.faceGrad[0])
+    Phi = numerix.tan(symmetry * psi / 2)
+    PhiSq = Phi**2
+    beta = (1. - PhiSq) / (1. + PhiSq)
+    DbetaDpsi = -symmetry * 2 * Phi / (1 + PhiSq)
+    Ddia = (1. + c * beta)
+    Doff = c * DbetaDpsi
+    I0 = Variable(value=((1, 0), (0, 1)))
+    I1 = Variable(value=((0, -1), (1, 0)))
+    D = alpha**2 * (1. + c * beta) * (Ddia * I0 + Doff * I1)
+    kappa1, kappa2 = 0.9, 20.
+    phaseEq = (TransientTerm(3e-4)
+               == DiffusionTerm(D)
+               + ImplicitSourceTerm((phase - 0.5 - kappa1 / numerix.pi * numerix.arctan(kappa2 * dT))
+                                    * (1 - phase)))
+
+    x, y = mesh.cellCenters
+    center = (N * dx / 2, N * dy / 2)
+    phase.setValue(1., where=((x - center[0])**2 + (y - center[1])**2) < (5 * dx)**2)
+    dT.setValue(-0.5)
+
+    def bench():
+        for step in range(5):
+            phase.updateOld()
+            dT.updateOld()
+            phaseEq.solve(phase, dt=dt)
+            heatEq.solve(dT, dt=dt)
+    return bench
+
+def _metadata():
+    import platform
+    import fipy
+    from fipy.tools.parser import _parseSolver
+
+    metadata = dict(date=time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    fipy=fipy.__version__,
+                    python=platform.python_version(),
+                    platform=platform.platform(),
+                    machine=platform.node(),
+                    solvers=_parseSolver())
+    try:
+        import numpy
+        metadata['numpy'] = numpy.__version__
+    except ImportError:
+        pass
+    return metadata
+
+def run(names=None, sizes=(1000, 10000, 100000), repeat=5, log=None):
+    """
+    Run the benchmarks whose names start with any of `names` (all by
+    default) for each of the numbers of cells `sizes`, `repeat` times
+    each after a first run that is not timed.
+
+    Return a `dict` with the `metadata` of the run and the `results`,
+    which map "name[size]" to the list of `times`, or to the `error`
+    that kept the benchmark from running. Benchmarks that cannot run
+    here, for want of a package, are also marked `skipped`; any other
+    error is a failure, which does not stop the other benchmarks.
+
+        >>> _benchmarks.append(("broken", lambda size: 1 / 0))
+        >>> try:
+        ...     results = run(names=["broken", "mesh.Grid2D"], sizes=(4,), repeat=1)['results']
+        ... finally:
+        ...     del _benchmarks[-1]
+        >>> print results["broken[4]"]['error']
+        ZeroDivisionError: integer division or modulo by zero
+        >>> print len(results["mesh.Grid2D[4]"]['times'])
+        1
+    """
+    results = {}
+    for name, setup in _benchmarks:
+        if names is not None and not [n for n in names if name.startswith(n)]:
+            continue
+        for size in sizes:
+            key = "%s[%d]" % (name, size)
+            try:
+                bench = setup(size)
+                bench()
+                times = []
+                for i in range(repeat):
+                    t0 = timeit.default_timer()
+                    measured = bench()
+                    elapsed = timeit.default_timer() - t0
+                    if measured is not None:
+                        elapsed = measured
+                    times.append(elapsed)
+                results[key] = dict(times=times)
+            except ImportError, e:
+                results[key] = dict(error="%s: %s" % (e.__class__.__name__, e), skipped=True)
+            except Exception, e:
+                # keep going, so that one broken benchmark does not
+                # lose the results of all the others
+                results[key] = dict(error="%s: %s" % (e.__class__.__name__, e))
+
+            if log is not None:
+                if 'times' in results[key]:
+                    log.write("%-45s %12.6f s\n" % (key, min(results[key]['times'])))
+                elif results[key].get('skipped'):
+                    log.write("%-45s skipped (%s)\n" % (key, results[key]['error']))
+                else:
+                    log.write("%-45s FAILED (%s)\n" % (key, results[key]['error']))
+                log.flush()
+
+    return dict(metadata=_metadata(), results=results)
+
+def save(run, filename):
+    import json
+    f = open(filename, 'w')
+    json.dump(run, f, indent=1, sort_keys=True)
+    f.close()
+
+def load(filename):
+    import json
+    f = open(filename, 'r')
+    run = json.load(f)
+    f.close()
+    return run
+
+def _betai(a, b, x):
+    """
+    The regularized incomplete beta function, by the continued fraction
+    of *Numerical Recipes*, sect. 6.4.
+
+        >>> print "%.6f" % _betai(2., 3., 0.4)
+        0.524800
+    """
+    if x <= 0.:
+        return 0.
+    elif x >= 1.:
+        return 1.
+
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log(1. - x))
+
+    if x > (a + 1.) / (a + b + 2.):
+        return 1. - _betai(b, a, 1. - x)
+
+    tiny = 1e-300
+    c = 1.
+    d = 1. - (a + b) * x / (a + 1.)
+    if abs(d) < tiny:
+        d = tiny
+    d = 1. / d
+    h = d
+    for m in range(1, 200):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1.) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1.))):
+            d = 1. + numerator * d
+            if abs(d) < tiny:
+                d = tiny
+            c = 1. + numerator / c
+            if abs(c) < tiny:
+                c = tiny
+            d = 1. / d
+            h *= d * c
+        if abs(d * c - 1.) < 1e-12:
+            break
+
+    return front * h / a
+
+def _meanAndVariance(x):
+    n = len(x)
+    mean = sum(x) / float(n)
+    if n > 1:
+        variance = sum([(xi - mean)**2 for xi in x]) / (n - 1.)
+    else:
+        variance = 0.
+    return mean, variance
+
+def _slowerProbability(old, new):
+    """
+    The p-value of Welch's t-test for the hypothesis that the `new`
+    times are, on average, no longer than the `old` ones.
+
+        >>> print "%.4f" % _slowerProbability([1., 1.1, 0.9, 1.05, 0.95],
+        ...                                   [1.3, 1.4, 1.2, 1.35, 1.25])
+        0.0002
+        >>> print _slowerProbability([1., 1.1, 0.9], [1.1, 0.9, 1.]) > 0.4
+        True
+    """
+    meanOld, varOld = _meanAndVariance(old)
+    meanNew, varNew = _meanAndVariance(new)
+    se2Old = varOld / len(old)
+    se2New = varNew / len(new)
+    se2 = se2Old + se2New
+
+    if se2 == 0.:
+        if meanNew > meanOld:
+            return 0.
+        else:
+            return 1.
+
+    t = (meanNew - meanOld) / math.sqrt(se2)
+    df = se2**2 / ((se2Old**2 / max(len(old) - 1, 1)) + (se2New**2 / max(len(new) - 1, 1)))
+    tail = 0.5 * _betai(df / 2., 0.5, df / (df + t**2))
+    if t > 0:
+        return tail
+    else:
+        return 1. - tail
+
+def compare(old, new, threshold=0.05, alpha=0.01):
+    """
+    Compare two runs. A benchmark regressed if its mean time grew by
+    more than the fraction `threshold` and the growth is significant at
+    the level `alpha`, and improved under the same conditions the other
+    way round.
+
+    Return a list of (name, old mean, new mean, ratio, p-value, status)
+    for the benchmarks in both runs, where status is ``"regressed"``,
+    ``"improved"`` or ``""``.
+
+        >>> old = dict(results={'a[10]': dict(times=[1., 1.1, 0.9, 1.05, 0.95]),
+        ...                     'b[10]': dict(times=[2., 2.1, 1.9, 2.05, 1.95]),
+        ...                     'c[10]': dict(times=[3., 3.1, 2.9, 3.05, 2.95])})
+        >>> new = dict(results={'a[10]': dict(times=[1.3, 1.4, 1.2, 1.35, 1.25]),
+        ...                     'b[10]': dict(times=[2., 2.1, 1.9, 2.05, 1.95]),
+        ...                     'c[10]': dict(times=[2., 2.1, 1.9, 2.05, 1.95])})
+        >>> for name, before, after, ratio, p, status in compare(old, new):
+        ...     print name, "%.2f" % ratio, status or "-"
+        a[10] 1.30 regressed
+        b[10] 1.00 -
+        c[10] 0.67 improved
+    """
+    comparison = []
+    oldResults, newResults = old['results'], new['results']
+    for name in sorted(set(oldResults.keys()) & set(newResults.keys())):
+        if 'times' not in oldResults[name] or 'times' not in newResults[name]:
+            continue
+        oldTimes, newTimes = oldResults[name]['times'], newResults[name]['times']
+        oldMean = _meanAndVariance(oldTimes)[0]
+        newMean = _meanAndVariance(newTimes)[0]
+        ratio = newMean / oldMean
+        slower = _slowerProbability(oldTimes, newTimes)
+        faster = _slowerProbability(newTimes, oldTimes)
+        if ratio > 1. + threshold and slower < alpha:
+            status, p = "regressed", slower
+        elif ratio < 1. / (1. + threshold) and faster < alpha:
+            status, p = "improved", faster
+        else:
+            status, p = "", min(slower, faster)
+        comparison.append((name, oldMean, newMean, ratio, p, status))
+
+    return comparison
+
+def _printComparison(comparison, out=sys.stdout):
+    out.write("%-45s %12s %12s %8s %8s\n" % ("benchmark", "old (s)", "new (s)", "ratio", "p"))
+    for name, oldMean, newMean, ratio, p, status in comparison:
+        out.write("%-45s %12.6f %12.6f %8.3f %8.4f %s\n" % (name, oldMean, newMean, ratio, p, status))
+
+class Benchmark(Command):
+    description = "run the FiPy benchmarks and store the timings as JSON"
+
+    user_options = [('output=', None, 'JSON file to store the results in'),
+                    ('sizes=', None, 'comma-separated numbers of cells (default 1000,10000,100000)'),
+                    ('repeat=', None, 'number of timed runs of each benchmark (default 5)'),
+                    ('benchmarks=', None, 'comma-separated prefixes of the benchmarks to run (default all)'),
+                    ('compare=', None, 'JSON file of an earlier run to compare against')]
+
+    def initialize_options(self):
+        self.output = None
+        self.sizes = "1000,10000,100000"
+        self.repeat = 5
+        self.benchmarks = None
+        self.compare = None
+
+    def finalize_options(self):
+        self.sizes = [int(size) for size in str(self.sizes).split(",")]
+        self.repeat = int(self.repeat)
+        if self.benchmarks is not None:
+            self.benchmarks = self.benchmarks.split(",")
+        if self.output is None:
+            self.output = "benchmark-%s.json" % time.strftime("%Y%m%d-%H%M%S")
+
+    def run(self):
+        results = run(names=self.benchmarks, sizes=self.sizes, repeat=self.repeat, log=sys.stdout)
+        save(results, self.output)
+        print "results written to", self.output
+
+        if self.compare is not None:
+            comparison = compare(load(self.compare), results)
+            _printComparison(comparison)
+            if [c for c in comparison if c[-1] == "regressed"]:
+                sys.exit(1)
+
+def _main(argv):
+    from optparse import OptionParser
+
+    parser = OptionParser(usage="""%prog run [options]
+       %prog compare OLD.json NEW.json [options]
+       %prog list""")
+    parser.add_option("--output", help="JSON file to store the results in")
+    parser.add_option("--sizes", default="1000,10000,100000",
+                      help="comma-separated numbers of cells")
+    parser.add_option("--repeat", type="int", default=5,
+                      help="number of timed runs of each benchmark")
+    parser.add_option("--benchmarks", help="comma-separated prefixes of the benchmarks to run")
+    parser.add_option("--threshold", type="float", default=0.05,
+                      help="relative slowdown below which no regression is reported")
+    parser.add_option("--alpha", type="float", default=0.01,
+                      help="significance level of a regression")
+    options, args = parser.parse_args(argv)
+
+    if args == ["list"]:
+        for name, setup in _benchmarks:
+            print name
+    elif args == ["run"]:
+        names = options.benchmarks and options.benchmarks.split(",")
+        results = run(names=names,
+                      sizes=[int(size) for size in options.sizes.split(",")],
+                      repeat=options.repeat,
+                      log=sys.stdout)
+        output = options.output or "benchmark-%s.json" % time.strftime("%Y%m%d-%H%M%S")
+        save(results, output)
+        print "results written to", output
+    elif len(args) == 3 and args[0] == "compare":
+        comparison = compare(load(args[1]), load(args[2]),
+                             threshold=options.threshold, alpha=options.alpha)
+        _printComparison(comparison)
+        if [c for c in comparison if c[-1] == "regressed"]:
+            return 1
+    else:
+        parser.error("unknown command")
+
+    return 0
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "telemetry.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+"""
+Timing of the phases of a solution and solver statistics.
+
+`Term.solve()` and `Term.sweep()` report each phase of their work as an
+event: the assembly of the linear system, the evaluation of the
+coefficients and the matrix of each `Term`, the application of each
+boundary condition, the linear solve and the calculation of the
+residual. Every event carries its wall and CPU time and the peak memory
+of the process when it ended. The linear solve also reports the number
+of iterations, the number of nonzeros of the matrix and, for the solvers
+that keep one, the history of the residual.
+
+Events are passed to the callbacks given to `register()`. A `Telemetry`
+collects them while it is active
+
+    >>> from fipy import *
+    >>> mesh = Grid1D(nx=10)
+    >>> var = CellVariable(mesh=mesh, hasOld=True)
+    >>> var.constrain(1., mesh.facesLeft)
+    >>> eq = TransientTerm() == DiffusionTerm()
+    >>> with Telemetry() as telemetry:
+    ...     for sweep in range(3):
+    ...         res = eq.sweep(var=var, dt=1.)
+    >>> summary = telemetry.summary()
+    >>> print summary['sweep']['count'], summary['solve']['count']
+    3 3
+    >>> print 'DiffusionTerm' in summary['buildMatrix']['terms']
+    True
+    >>> print [sorted(event['args'].keys())
+    ...        for event in telemetry.events if event['name'] == 'solve'][0]
+    ['iterations', 'nnz', 'residualHistory', 'solver']
+
+and nothing is reported when no callback is registered.
+
+    >>> count = len(telemetry.events)
+    >>> res = eq.sweep(var=var, dt=1.)
+    >>> print len(telemetry.events) == count, enabled()
+    True False
+
+The events can be written as JSON, or in the trace event format of the
+Chrome browser, to be viewed with ``chrome://tracing`` or Perfetto.
+
+    >>> import json, os, tempfile
+    >>> fd, fname = tempfile.mkstemp(suffix='.json')
+    >>> os.close(fd)
+    >>> telemetry.toChromeTrace(fname)
+    >>> trace = json.load(open(fname))
+    >>> print set([event['ph'] for event in trace['traceEvents']])
+    set([u'X'])
+    >>> telemetry.toJSON(fname)
+    >>> print len(json.load(open(fname))['events']) == len(telemetry.events)
+    True
+    >>> os.remove(fname)
+"""
+__docformat__ = 'restructuredtext'
+
+__all__ = ["Telemetry", "register", "unregister", "enabled"]
+
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_callbacks = []
+
+def register(callback):
+    """
+    Pass every event that follows to `callback`. An event is a `dict`
+    with the keys
+
+      - `name`: the phase, one of ``"sweep"``, ``"assemble"``,
+        ``"buildMatrix"``, ``"coefficients"``, ``"boundaryCondition"``,
+        ``"solve"`` and ``"residual"``.
+      - `category`: ``"term"`` or ``"solver"``.
+      - `start`: the wall clock time, in seconds, at the start of the
+        phase.
+      - `wall` and `cpu`: the wall clock and CPU times, in seconds,
+        spent in the phase.
+      - `maxrss`: the peak resident memory of the process, in the units
+        of `resource.getrusage()`, or `None` where this is not
+        available.
+      - `args`: a `dict` of further details, such as the `Term` or
+        boundary condition class, the solver iterations and residual
+        history, and the matrix nonzeros.
+
+    Phases are nested, so that, e.g., the time of a ``"buildMatrix"``
+    is included in the time of the ``"assemble"`` that contains it.
+    """
+    if callback not in _callbacks:
+        _callbacks.append(callback)
+
+def unregister(callback):
+    """
+    Stop passing events to `callback`.
+    """
+    if callback in _callbacks:
+        _callbacks.remove(callback)
+
+def enabled():
+    """
+    Whether any callback is registered.
+    """
+    return len(_callbacks) > 0
+
+class _Phase(object):
+    __slots__ = ('name', 'category', 'args', 'start', 'cpu')
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.time()
+        self.cpu = time.clock()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        cpu = time.clock() - self.cpu
+        wall = time.time() - self.start
+        if resource is None:
+            maxrss = None
+        else:
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        event = dict(name=self.name,
+                     category=self.category,
+                     start=self.start,
+                     wall=wall,
+                     cpu=cpu,
+                     maxrss=maxrss,
+                     args=self.args)
+        if type is not None:
+            event['args']['exception'] = type.__name__
+        for callback in list(_callbacks):
+            callback(event)
+        return False
+
+class _NullPhase(object):
+    args = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        return False
+
+_nullPhase = _NullPhase()
+
+def _phase(name, category="term", **args):
+    """
+    Time the enclosed block as phase `name`. Details known only at the
+    end of the block go in the `args` of the returned phase, which is
+    thrown away when no callback is registered.
+    """
+    if _callbacks:
+        return _Phase(name, category, args)
+    else:
+        return _nullPhase
+
+class Telemetry(object):
+    """
+    Collect the events reported while active.
+
+    Use it as a context manager, or call `start()` and `stop()`.
+    Several can be active at once, and each keeps its own events.
+    """
+    def __init__(self):
+        self.events = []
+
+    def _record(self, event):
+        self.events.append(event)
+
+    def start(self):
+        register(self._record)
+
+    def stop(self):
+        unregister(self._record)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.stop()
+        return False
+
+    def clear(self):
+        self.events = []
+
+    def summary(self):
+        """
+        Return the number of occurrences, the total wall and CPU times
+        and the peak memory of each phase, with the names of the `Term`
+        and boundary condition classes it was reported for, and, for the
+        ``"solve"`` phase, the total number of iterations.
+        """
+        summary = {}
+        for event in self.events:
+            entry = summary.setdefault(event['name'],
+                                       dict(count=0, wall=0., cpu=0., maxrss=None, terms=[]))
+            entry['count'] += 1
+            entry['wall'] += event['wall']
+            entry['cpu'] += event['cpu']
+            if event['maxrss'] is not None:
+                entry['maxrss'] = max(entry['maxrss'], event['maxrss'])
+            for key in ('term', 'boundaryCondition'):
+                name = event['args'].get(key)
+                if name is not None and name not in entry['terms']:
+                    entry['terms'].append(name)
+            if 'iterations' in event['args']:
+                entry['iterations'] = entry.get('iterations', 0) + event['args']['iterations']
+        return summary
+
+    def __str__(self):
+        lines = ["%-20s %8s %12s %12s" % ("phase", "count", "wall (s)", "cpu (s)")]
+        summary = self.summary()
+        for name in sorted(summary.keys(), key=lambda name: -summary[name]['wall']):
+            entry = summary[name]
+            lines.append("%-20s %8d %12.6f %12.6f" % (name, entry['count'], entry['wall'], entry['cpu']))
+        return "\n".join(lines)
+
+    def toJSON(self, filename):
+        """
+        Write the events and their summary to `filename` as JSON.
+        """
+        import json
+        f = open(filename, 'w')
+        json.dump(dict(events=self.events, summary=self.summary()), f, indent=1)
+        f.close()
+
+    def toChromeTrace(self, filename):
+        """
+        Write the events to `filename` in the trace event format read by
+        ``chrome://tracing``, with one process per processor.
+        """
+        import json
+        from fipy.tools import parallelComm
+
+        traceEvents = []
+        for event in self.events:
+            args = dict(event['args'])
+            args['cpu'] = event['cpu']
+            if event['maxrss'] is not None:
+                args['maxrss'] = event['maxrss']
+            traceEvents.append(dict(name=event['name'],
+                                    cat=event['category'],
+                                    ph='X',
+                                    ts=event['start'] * 1e6,
+                                    dur=event['wall'] * 1e6,
+                                    pid=parallelComm.procID,
+                                    tid=0,
+                                    args=args))
+        f = open(filename, 'w')
+        json.dump(dict(traceEvents=traceEvents, displayTimeUnit='ms'), f)
+        f.close()
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -43,6 +43,11 @@ def _suite():
             'numerix',
             'dump',
             'vector',
+            'numbaInline',
+            'fusion',
+            'counterRandom',
+            'telemetry',
+            'performance.benchmark',
         ), base = __name__)
 
     return theSuite
@@ -39,6 +39,8 @@ from fipy.tools import inline
 from fipy.variables.cellVariable import CellVariable
 
 class _AddOverFacesVariable(CellVariable):
+    _evictable = True
+
     def __init__(self, faceVariable, mesh = None):
         if not mesh:
             mesh = faceVariable.mesh
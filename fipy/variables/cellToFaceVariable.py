@@ -40,6 +40,8 @@ from fipy.variables.faceVariable import FaceVariable
 from fipy.tools import numerix
 
 class _CellToFaceVariable(FaceVariable):
+    _evictable = True
+
     def __init__(self, var):
         FaceVariable.__init__(self, mesh=var.mesh, elementshape=var.shape[:-1])
         self.var = self._requires(var)
@@ -527,10 +527,16 @@ class CellVariable(_MeshVariable):
         Used internally to collect the necessary information to ``pickle`` the
         `CellVariable` to persistent storage.
         """
+        from fipy.tools import dump
+        if dump._pickleLocalValues:
+            value = self.value
+        else:
+            value = self.globalValue
+
         return {
             'mesh' : self.mesh,
             'name' : self.name,
-            'value' : self.globalValue,
+            'value' : value,
             'unit' : self.unit,
             'old' : self._old
         }
@@ -39,8 +39,23 @@ __all__ = []
 from fipy.tools import numerix
 
 class _CoupledCellVariable(object):
-    def __init__(self, vars):
+    def __init__(self, vars, ordering="blocked"):
+        """
+        :Parameters:
+          - `vars`: The `CellVariable` objects to couple.
+          - `ordering`: ``"blocked"`` to place all the values of each
+            variable together, or ``"interleaved"`` to place the values
+            of all the variables in each cell together (see
+            `fipy.matrices.blockLayout`).
+        """
         self.vars = vars
+        self.ordering = ordering
+
+    def _join(self, values):
+        if self.ordering == "interleaved":
+            return numerix.array(values).swapaxes(0, 1).ravel()
+        else:
+            return numerix.concatenate(values)
 
     @property
     def shape(self):
@@ -65,18 +80,20 @@ class _CoupledCellVariable(object):
             return meshes[0]
 
     def __getitem__(self, index):
-        return numerix.concatenate([numerix.array(var[index]) for var in self.vars])
+        return self._join([numerix.array(var[index]) for var in self.vars])
 
     def __setitem__(self, index, value):
         N = self.mesh.numberOfCells
         for i, var in enumerate(self.vars):
             if numerix.shape(value) == ():
                 var[index] = value
+            elif self.ordering == "interleaved":
+                var[index] = value[i::len(self.vars)]
             else:
                 var[index] = value[i * N:(i + 1) * N]
 
     def _getValue(self):
-        return numerix.concatenate([numerix.array(var.value) for var in self.vars])
+        return self._join([numerix.array(var.value) for var in self.vars])
 
     def _setValue(self, value):
         self[:] = value
@@ -85,11 +102,11 @@ class _CoupledCellVariable(object):
 
     @property
     def globalValue(self):
-        return numerix.concatenate([numerix.array(var.globalValue) for var in self.vars])
+        return self._join([numerix.array(var.globalValue) for var in self.vars])
 
     @property
     def numericValue(self):
-        return numerix.concatenate([var.numericValue for var in self.vars])
+        return self._join([var.numericValue for var in self.vars])
 
     @property
     def unit(self):
@@ -115,14 +132,25 @@ class _CoupledCellVariable(object):
         >>> v.getsctype() == numerix.NUMERIX.obj2sctype(numerix.array(1))
         True
 
+        With the values of each cell together,
+
+        >>> v = _CoupledCellVariable(vars=(v1, v2), ordering="interleaved")
+        >>> print numerix.allequal([6,8,7,9], numerix.array(v)) # doctest: +PROCESSOR_0
+        True
+        >>> v[:] = (1,2,3,4)
+        >>> print v1
+        [1 3]
+        >>> print v2
+        [2 4]
+
         """
         return numerix.array(self.value, t)
 
     def __neg__(self):
-        return _CoupledCellVariable([-var for var in self.vars])
+        return _CoupledCellVariable([-var for var in self.vars], ordering=self.ordering)
 
     def __abs__(self):
-        return _CoupledCellVariable([abs(var) for var in self.vars])
+        return _CoupledCellVariable([abs(var) for var in self.vars], ordering=self.ordering)
 
     def __iter__(self):
         return iter(self.value)
@@ -136,7 +164,7 @@ class _CoupledCellVariable(object):
         return self.value.ravel()
 
     def copy(self):
-        return self.__class__(vars=[var.copy() for var in self.vars])
+        return self.__class__(vars=[var.copy() for var in self.vars], ordering=self.ordering)
 
 def _test():
     import fipy.tests.doctestPlus
@@ -71,6 +71,8 @@ class _GaussCellGradVariable(CellVariable):
 
     """
 
+    _evictable = True
+
     def __init__(self, var, name=''):
         CellVariable.__init__(self, mesh=var.mesh, name=name, elementshape=(var.mesh.dim,) + var.shape[:-1])
         self.var = self._requires(var)
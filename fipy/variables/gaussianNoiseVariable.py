@@ -36,7 +36,7 @@
 
 __docformat__ = 'restructuredtext'
 
-from fipy.tools.numerix import random, sqrt
+from fipy.tools.numerix import sqrt
 from fipy.variables.noiseVariable import NoiseVariable
 
 __all__ = ["GaussianNoiseVariable"]
@@ -149,18 +149,9 @@ class GaussianNoiseVariable(NoiseVariable):
         self.variance = variance
         NoiseVariable.__init__(self, mesh = mesh, name = name, hasOld = hasOld)
 
-    def parallelRandom(self):
-
-        if hasattr(self.variance, 'globalValue'):
-            variance = self.variance.globalValue
-        else:
-            variance = self.variance
-
-        if self.mesh.communicator.procID == 0:
-            return random.normal(self.mean, sqrt(variance),
-                                 size = [self.mesh.globalNumberOfCells])
-        else:
-            return None
+    def random(self, generator):
+        return generator.normal(self._localValue(self.mean),
+                                sqrt(self._localValue(self.variance)))
 
 def _test():
     import fipy.tests.doctestPlus
@@ -34,6 +34,8 @@
 
 __docformat__ = 'restructuredtext'
 
+from fipy.tools.numerix import random
+from fipy.tools.counterRandom import _CounterRandom
 from fipy.variables.cellVariable import CellVariable
 
 __all__ = ["NoiseVariable"]
@@ -48,15 +50,28 @@ class NoiseVariable(CellVariable):
 
         <Specific>NoiseVariable(...).faceGrad.divergence
 
+    Each processor generates the noise for its own cells only, with
+    counter-based random numbers keyed on the global ID of each cell and
+    on the number of times the noise has been scrambled, so the noise does
+    not depend on the number of processors.
+
     The `seed()` and `get_seed()` functions of the
     `fipy.tools.numerix.random` module can be set and query the random
-    number generated used by all `NoiseVariable` objects.
+    number generated used to key each `NoiseVariable` when it is created.
     """
     def __init__(self, mesh, name = '', hasOld = 0):
         if self.__class__ is NoiseVariable:
             raise NotImplementedError, "can't instantiate abstract base class"
 
         CellVariable.__init__(self, mesh = mesh, name = name, hasOld = hasOld)
+
+        if self.mesh.communicator.procID == 0:
+            key = tuple(int(k) for k in random.random_sample(2) * 2**32)
+        else:
+            key = None
+        self._key = self.mesh.communicator.bcast(key, root=0)
+        self._step = -1
+
         self.scramble()
 
     def copy(self):
@@ -72,26 +87,26 @@ class NoiseVariable(CellVariable):
         """
         Generate a new random distribution.
         """
+        self._step += 1
         self._markStale()
 
-    def random(self):
+    def random(self, generator):
+        """
+        Return noise for the cells of `generator`, a `_CounterRandom`.
+        """
         pass
 
-    def parallelRandom(self):
-
-        if self.mesh.communicator.procID == 0:
-            return self.random()
+    @staticmethod
+    def _localValue(parameter):
+        """
+        Return the value of a distribution parameter on the local cells.
+        """
+        if hasattr(parameter, 'value'):
+            return parameter.value
         else:
-            return None
+            return parameter
 
     def _calcValue(self):
-        from fipy.tools import parallelComm
-
-        rnd = self.parallelRandom()
-
-        if parallelComm.Nproc > 1:
-            rnd = parallelComm.bcast(rnd, root=0)
-
-            return rnd[self.mesh._globalOverlappingCellIDs]
-        else:
-            return rnd
+        return self.random(_CounterRandom(key=self._key,
+                                          IDs=self.mesh._globalOverlappingCellIDs,
+                                          step=self._step))
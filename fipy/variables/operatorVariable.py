@@ -34,6 +34,7 @@ __docformat__ = 'restructuredtext'
 
 __all__ = []
 
+import re
 import sys
 
 from fipy.variables.variable import Variable
@@ -41,6 +42,8 @@ from fipy.tools import numerix
 
 def _OperatorVariableClass(baseClass=object):
     class _OperatorVariable(baseClass):
+        _evictable = True
+
         def __init__(self, op, var, opShape=(), canInline=True, unit=None, inlineComment=None, *args, **kwargs):
             self.op = op
             self.var = var
@@ -71,12 +74,67 @@ def _OperatorVariableClass(baseClass=object):
             if not self.canInline:
                 return self._calcValue_()
             else:
-                from fipy.tools import inline
+                from fipy.tools import inline, fusion
                 if inline.doInline:
                     return self._execInline(comment=self.comment)
+                elif fusion.doFusion and self._fusible:
+                    return self._execFused()
                 else:
                     return self._calcValue_()
 
+        _fusible = True
+
+        def _execFused(self):
+            """
+            Evaluate the stale part of the expression tree below `self` in a
+            single pass with :term:`numexpr`. Interior nodes that are not
+            cached are not evaluated, so only the result array is written.
+
+                >>> from fipy.variables.variable import Variable
+                >>> D0, D1 = Variable(2.), Variable(3.)
+                >>> phi = Variable((0., 0.5, 1.))
+                >>> T = Variable((1., 2., 4.))
+                >>> D = D0 * (1 - phi)**2 + D1 * phi * numerix.exp(-1. / T)
+                >>> print numerix.allclose(D._execFused(), D._calcValue_()) # doctest: +NUMEXPR
+                True
+                >>> print D._getRepresentation(style="numexpr", argDict={}) # doctest: +NUMEXPR
+                (((var000 * ((var00100 - var00101) ** var0011)) + ((var0100 * var0101) * exp((var0110 / var0111)))))
+                >>> D.var[0]._value is None
+                True
+
+            An interior node that something else subscribes to is cached,
+            and so is evaluated once and enters the fused expression as an
+            array.
+
+                >>> D1phi = D1 * phi
+                >>> D = D0 * (1 - phi)**2 + D1phi * numerix.exp(-1. / T)
+                >>> E = D1phi + 1
+                >>> print D._getRepresentation(style="numexpr", argDict={}) # doctest: +NUMEXPR
+                (((var000 * ((var00100 - var00101) ** var0011)) + (var010 * exp((var0110 / var0111)))))
+
+            An expression that :term:`numexpr` cannot evaluate is computed
+            in the usual way, and is not tried again.
+
+                >>> i = numerix.arange(3)
+                >>> v = phi[i] * 2
+                >>> print v._execFused() # doctest: +NUMEXPR
+                [ 0.  1.  2.]
+                >>> print v._fusible # doctest: +NUMEXPR
+                False
+            """
+            from fipy.tools import fusion
+
+            argDict = {}
+            try:
+                return fusion._evaluate(self._getRepresentation(style="numexpr",
+                                                                argDict=argDict,
+                                                                id="",
+                                                                freshen=True),
+                                        argDict)
+            except fusion._FusionError:
+                self._fusible = False
+                return self._calcValue_()
+
         def _calcValue_(self):
             pass
 
@@ -90,7 +148,17 @@ def _OperatorVariableClass(baseClass=object):
             else:
                 s = baseClass._getCstring(self, argDict=argDict, id=id)
             if freshen:
-                self._markFresh()
+                self._markCurrent()
+
+            return s
+
+        def _getNumexprString(self, argDict={}, id="", freshen=False):
+            if self.canInline and self._fusible:
+                s = self._getRepresentation(style="numexpr", argDict=argDict, id=id, freshen=freshen)
+            else:
+                s = baseClass._getNumexprString(self, argDict=argDict, id=id)
+            if freshen:
+                self._markCurrent()
 
             return s
 
@@ -99,7 +167,7 @@ def _OperatorVariableClass(baseClass=object):
 
             :Parameters:
 
-              - `style`: one of `'__repr__'`, `'name'`, `'TeX'`, `'C'`
+              - `style`: one of `'__repr__'`, `'name'`, `'TeX'`, `'C'`, `'numexpr'`
 
             """
             import opcode
@@ -137,13 +205,25 @@ def _OperatorVariableClass(baseClass=object):
                         result = v._variableClass._getCstring(v, argDict,
                                                                    id=id + str(i),
                                                                    freshen=False)
+                elif style == "numexpr":
+                    if not v._isCached():
+                        result = v._getNumexprString(argDict, id=id + str(i), freshen=freshen)
+                        v._value = None
+                    else:
+                        result = v._variableClass._getNumexprString(v, argDict,
+                                                                     id=id + str(i),
+                                                                     freshen=False)
                 else:
                     raise SyntaxError, "Unknown style: %s" % style
 
                 return result
 
             if isinstance(self.op, numerix.ufunc):
-                return "%s(%s)" % (self.op.__name__, ", ".join([__var(i) for i in range(len(self.var))]))
+                name = self.op.__name__
+                if style == "numexpr":
+                    from fipy.tools.fusion import _functionNames
+                    name = _functionNames.get(name, name)
+                return "%s(%s)" % (name, ", ".join([__var(i) for i in range(len(self.var))]))
 
             if sys.version_info < (3,0):
                 bytecodes = [ord(byte) for byte in self.op.func_code.co_code]
@@ -174,6 +254,12 @@ def _OperatorVariableClass(baseClass=object):
                     s = stack.pop()
                     if style == 'C':
                         return s.replace('numerix.', '').replace('arc', 'a')
+                    elif style == 'numexpr':
+                        from fipy.tools.fusion import _functionNames
+                        s = s.replace('numerix.', '')
+                        for name, numexprName in _functionNames.items():
+                            s = re.sub(r"\b%s\(" % name, numexprName + "(", s)
+                        return s
                     else:
                         return s
                 elif opcode.opname[bytecode] == 'LOAD_CONST':
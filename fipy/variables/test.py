@@ -43,6 +43,7 @@ def _suite():
     return _LateImportDocTestSuite(
         docTestModuleNames = (
             'fipy.variables.variable',
+            'fipy.variables.variableCache',
             'fipy.variables.meshVariable',
             'fipy.variables.cellVariable',
             'fipy.variables.faceVariable',
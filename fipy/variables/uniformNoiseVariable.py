@@ -34,7 +34,6 @@
 
 __docformat__ = 'restructuredtext'
 
-from fipy.tools.numerix import random
 from fipy.variables.noiseVariable import NoiseVariable
 
 __all__ = ["UniformNoiseVariable"]
@@ -86,9 +85,9 @@ class UniformNoiseVariable(NoiseVariable):
         self.maximum = maximum
         NoiseVariable.__init__(self, mesh = mesh, name = name, hasOld = hasOld)
 
-    def random(self):
-        return random.uniform(self.minimum, self.maximum,
-                              size=[self.mesh.globalNumberOfCells])
+    def random(self, generator):
+        return generator.uniform(self._localValue(self.minimum),
+                                 self._localValue(self.maximum))
 
 def _test():
     import fipy.tests.doctestPlus
@@ -40,6 +40,7 @@ from fipy.tools.dimensions import physicalField
 from fipy.tools import numerix
 from fipy.tools import parser
 from fipy.tools import inline
+from fipy.variables.variableCache import _cache
 
 __all__ = ["Variable"]
 
@@ -75,6 +76,31 @@ class Variable(object):
 
     _cacheNever = False
 
+    # Whether the cached value is calculated from other `Variable` objects
+    # and may be dropped to keep within the budget of `variableCache`.
+    _evictable = False
+    _evicted = False
+
+    # Staleness is tracked with generation numbers rather than by pushing
+    # notifications to subscribers. `_generation` is shared by every
+    # `Variable` and advances each time any of them is changed. Each
+    # `Variable` records the generation of the latest change to its own
+    # value (`_written`), the generation its value was calculated for
+    # (`_calculated`), and, memoized until the next change anywhere
+    # (`_verified`), the latest change to anything it requires (`_modified`).
+    _generation = 0
+    _written = 0
+    _modified = 0
+    _verified = -1
+    _calculated = 0
+
+    # The value with its constraints applied, kept until the value or any
+    # of the constraints change, as identified by `_constrainedStamp`.
+    # It is read-only, and it is not kept while any constraint holds an
+    # array, which could be changed in place.
+    _constrainedValue = None
+    _constrainedStamp = None
+
     def __new__(cls, *args, **kwds):
         return object.__new__(cls)
 
@@ -114,7 +140,6 @@ class Variable(object):
 
         self._cached = cached
 
-        self.stale = 1
         self._markFresh()
 
 ##    __array_priority__ and __array_wrap__ are required to override
@@ -260,6 +285,7 @@ class Variable(object):
             self._value.unit = unit
         else:
             self._value = physicalField.PhysicalField(value=self._value, unit=unit)
+        self._constrainedStamp = None
 
     unit = property(_getUnit, _setUnit)
 
@@ -453,6 +479,28 @@ class Variable(object):
          else:
              return identifier + self._getCIndexString(shape)
 
+    def _getNumexprString(self, argDict={}, id="", freshen=None):
+        """
+        Generate the name and dictionary entry to be used by
+        `fipy.tools.fusion`
+
+            >>> argDict = {}
+            >>> Variable((1., 2.))._getNumexprString(argDict=argDict, id="0")
+            'var0'
+            >>> print argDict['var0']
+            [ 1.  2.]
+
+        freshen is ignored
+        """
+        identifier = 'var%s' % (id)
+
+        value = self.value
+        if numerix.shape(value) == ():
+            value = numerix.array(value)[()]
+        argDict[identifier] = value
+
+        return identifier
+
     def tostring(self, max_line_width=75, precision=8, suppress_small=False, separator=' '):
         return numerix.tostring(self.value,
                                 max_line_width=max_line_width,
@@ -461,19 +509,19 @@ class Variable(object):
                                 separator=separator)
 
     def __setitem__(self, index, value):
-        if self._value is None:
+        if self._value is None or self._evicted:
             self._getValue()
         self._value[index] = value
         self._markFresh()
 
     def itemset(self, value):
-        if self._value is None:
+        if self._value is None or self._evicted:
             self._getValue()
         self._value.itemset(value)
         self._markFresh()
 
     def put(self, indices, value):
-        if self._value is None:
+        if self._value is None or self._evicted:
             self._getValue()
         numerix.put(self._value, indices, value)
         self._markFresh()
@@ -508,31 +556,53 @@ class Variable(object):
 
         """
 
-        if self.stale or not self._isCached() or self._value is None:
+        if self._evicted or self.stale or not self._isCached() or self._value is None:
+            modified = self._lastModified()
             value = self._calcValue()
             if self._isCached():
                 self._setValueInternal(value=value)
+                if self._evicted:
+                    self._evicted = False
+                if self._evictable and _cache.enabled:
+                    _cache._stored(self)
             else:
                 self._setValueInternal(value=None)
-            self._markFresh()
+            self._markCurrent(modified)
         else:
             value = self._value
+            if self._evictable and _cache.enabled:
+                _cache._read(self)
+
+        constraints = self.constraints
+        if len(constraints) > 0:
+            stamps = tuple((constraint, constraint._stamp()) for constraint in constraints)
+            if (self._isCached()
+                and isinstance(value, numerix.NUMERIX.ndarray)
+                and None not in [stamp for constraint, stamp in stamps]):
+                stamp = (self._calculated, id(self._value)) + stamps
+                if stamp != self._constrainedStamp:
+                    self._constrainedValue = self._constrainValue(value, constraints)
+                    # every read shares it, so it must not be changed in place
+                    self._constrainedValue.setflags(write=False)
+                    self._constrainedStamp = stamp
+                value = self._constrainedValue
+            else:
+                value = self._constrainValue(value, constraints)
 
-        if len(self.constraints) > 0:
-            value = value.copy()
-            for constraint in self.constraints:
-                if constraint.where is None:
-                    value[:] = constraint.value
-                else:
-                    mask = constraint.where
-                    if not hasattr(mask, 'dtype') or mask.dtype != bool:
-                        mask = numerix.array(mask, dtype=numerix.NUMERIX.bool)
+        return value
 
-                    if 0 not in value.shape:
-                        try:
-                            value[..., mask] = constraint.value
-                        except:
-                            value[..., mask] = numerix.array(constraint.value)[..., mask]
+    def _constrainValue(self, value, constraints):
+        """Return a copy of `value` with `constraints` applied."""
+        value = value.copy()
+        for constraint in constraints:
+            if constraint.where is None:
+                value[:] = constraint.value
+            elif 0 not in value.shape:
+                index = constraint._index
+                try:
+                    value[index] = constraint.value
+                except:
+                    value[index] = numerix.array(constraint.value)[index]
 
         return value
 
@@ -576,6 +646,47 @@ class Variable(object):
         >>> print v
         [ 2 10  5 10]
 
+        The constrained value is kept until the value or the constraints
+        change, as long as the constraints are made of `Variable` objects,
+
+        >>> v = Variable((0,1,2,3))
+        >>> mask = Variable(numerix.array((False, False, False, True)))
+        >>> v.constrain(7, where=mask)
+        >>> v.value is v.value
+        True
+        >>> constrained = v.value
+        >>> v[1] = 3
+        >>> print v.value is constrained, v
+        False [0 3 2 7]
+        >>> mask[:] = (False, True, False, False)
+        >>> print v
+        [0 7 2 3]
+
+        and it cannot be changed in place.
+
+        >>> v.value[0] = 5 # doctest: +IGNORE_EXCEPTION_DETAIL
+        Traceback (most recent call last):
+            ...
+        ValueError: assignment destination is read-only
+
+        A constraint made of an array is applied afresh on every read, so
+        the array can be changed in place.
+
+        >>> v = Variable((0,1,2,3))
+        >>> value = numerix.array((5, 5, 5, 5))
+        >>> where = numerix.array((True, False, False, True))
+        >>> v.constrain(value, where=where)
+        >>> v.value is v.value
+        False
+        >>> print v
+        [5 1 2 5]
+        >>> value[:] = 6
+        >>> print v
+        [6 1 2 6]
+        >>> where[:] = (False, True, True, False)
+        >>> print v
+        [0 6 6 3]
+
         >>> from fipy.variables.cellVariable import CellVariable
         >>> from fipy.meshes import Grid2D
         >>> m = Grid2D(nx=2, ny=2)
@@ -636,6 +747,21 @@ class Variable(object):
             for var in self.requiredVariables:
                 var.dontCacheMe(recursive=False)
 
+    def _evict(self):
+        """
+        Drop the cached value, to be recalculated when next read. It is
+        replaced by a read-only array of the same shape and type that
+        takes no memory, for the code that only needs those.
+        """
+        value = self._value
+        placeholder = numerix.NUMERIX.lib.stride_tricks.as_strided(numerix.zeros((1,), dtype=value.dtype),
+                                                                   shape=value.shape,
+                                                                   strides=(0,) * len(value.shape))
+        placeholder.flags.writeable = False
+        self._value = placeholder
+        self._evicted = True
+        self._constrainedValue = self._constrainedStamp = None
+
     def _setValueInternal(self, value, unit=None, array=None):
         self._value = self._makeValue(value=value, unit=unit, array=array)
 
@@ -823,25 +949,76 @@ class Variable(object):
     subscribedVariables = property(_getSubscribedVariables,
                                    _setSubscribedVariables)
 
-    def __markStale(self):
-        for subscriber in self.subscribedVariables:
-            if subscriber() is not None:
-                ## Even though getSubscribedVariables() strips out dead
-                ## references, subscriber() might still be dead due to the
-                ## vagaries of garbage collection and the possibility that
-                ## later subscribedVariables were removed, changing the
-                ## dependencies of this subscriber.
-                ## See <https://github.com/usnistgov/fipy/issues/103> for more explanation.
-                subscriber()._markStale()
+    def _lastModified(self):
+        """
+        Generation of the latest change to `self` or to any `Variable` it
+        requires. Nothing is walked on write; instead, the requirements are
+        checked at most once per generation, so repeated reads between
+        changes cost a single comparison.
+
+            >>> a = Variable(value=3)
+            >>> b = a * 4
+            >>> c = b + 1
+            >>> print c.stale
+            True
+            >>> print c
+            13
+            >>> print c.stale, b.stale
+            False False
+            >>> a.value = 5
+            >>> print c._lastModified() == a._lastModified() > c._calculated
+            True
+            >>> print c.stale, b.stale
+            True True
+            >>> print c
+            21
+        """
+        if self._verified != Variable._generation:
+            # record the verification before recursing, in case of cycles
+            self._verified = Variable._generation
+            self._modified = self._written
+            modified = self._written
+            for var in self.requiredVariables:
+                modified = max(modified, var._lastModified())
+            self._modified = modified
+
+        return self._modified
+
+    @property
+    def stale(self):
+        """
+        Whether the value of `self` is out of date with respect to the
+        `Variable` objects it requires
+        """
+        return self._lastModified() > self._calculated
+
+    def __changed(self):
+        Variable._generation += 1
+        self._written = self._modified = self._verified = Variable._generation
 
     def _markFresh(self):
-        self.stale = 0
-        self.__markStale()
+        """
+        The value of `self` has been changed directly; it is current, but
+        any `Variable` that requires it is not.
+        """
+        self.__changed()
+        self._calculated = self._written
+
+    def _markCurrent(self, modified=None):
+        """
+        The value of `self` has been (re)calculated from the `Variable`
+        objects it requires, as they were at generation `modified`.
+        """
+        if modified is None:
+            modified = self._lastModified()
+        self._calculated = modified
 
     def _markStale(self):
-        if not self.stale:
-            self.stale = 1
-            self.__markStale()
+        """
+        The value of `self`, and of any `Variable` that requires it, must
+        be recalculated.
+        """
+        self.__changed()
 
     def _requires(self, var):
         if isinstance(var, Variable):
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+
+## -*-Pyth-*-
+ # ###################################################################
+ #  FiPy - Python-based finite volume PDE solver
+ #
+ #  FILE: "variableCache.py"
+ #
+ #  Author: Jonathan Guyer <guyer@nist.gov>
+ #  Author: Daniel Wheeler <daniel.wheeler@nist.gov>
+ #  Author: James Warren   <jwarren@nist.gov>
+ #    mail: NIST
+ #     www: http://www.ctcms.nist.gov/fipy/
+ #
+ # ========================================================================
+ # This software was developed at the National Institute of Standards
+ # and Technology by employees of the Federal Government in the course
+ # of their official duties.  Pursuant to title 17 Section 105 of the
+ # United States Code this software is not subject to copyright
+ # protection and is in the public domain.  FiPy is an experimental
+ # system.  NIST assumes no responsibility whatsoever for its use by
+ # other parties, and makes no guarantees, expressed or implied, about
+ # its quality, reliability, or any other characteristic.  We would
+ # appreciate acknowledgement if the software is used.
+ #
+ # This software can be redistributed and/or modified freely
+ # provided that any derivative works bear some notice that they are
+ # derived from it, and any modified versions bear some notice that
+ # they have been modified.
+ # ========================================================================
+ #  See the file "license.terms" for information on usage and  redistribution
+ #  of this file, and for a DISCLAIMER OF ALL WARRANTIES.
+ #
+ # ###################################################################
+ ##
+
+"""
+A memory budget for the values cached by derived `Variable` objects.
+
+A `CellVariable` creates its `grad`, `faceGrad`, `arithmeticFaceValue`,
+`harmonicFaceValue`, `leastSquaresGrad`, etc., when they are first used,
+and each of them keeps its full-size value for as long as it exists.
+With a budget set, the bytes held by these derived values are counted,
+and the values read least recently are dropped whenever the total
+exceeds the budget. A dropped value is recalculated the next time it is
+read. The values of `Variable` objects that are not calculated from
+others, such as the solution variables, are never dropped.
+
+    >>> from fipy import *
+    >>> mesh = Grid2D(nx=10, ny=10)
+    >>> var = CellVariable(mesh=mesh, value=mesh.x * mesh.y)
+    >>> setBudget(1000000)
+    >>> arithmetic = var.arithmeticFaceValue
+    >>> harmonic = var.harmonicFaceValue
+    >>> print arithmetic.value.nbytes, harmonic.value.nbytes
+    1760 1760
+    >>> print bytesHeld() >= 3520
+    True
+
+The value read least recently goes first,
+
+    >>> harmonic0 = harmonic.value.copy()
+    >>> arithmetic0 = arithmetic.value.copy()
+    >>> setBudget(2000)
+    >>> print arithmetic._evicted, harmonic._evicted
+    False True
+
+and is recalculated when needed, at the expense of another.
+
+    >>> print numerix.allclose(harmonic, harmonic0), harmonic._evicted
+    True False
+    >>> print arithmetic._evicted
+    True
+
+A report lists the largest values held
+
+    >>> print largest(1)[0][1] is harmonic
+    True
+
+and no budget stops the counting.
+
+    >>> setBudget(None)
+    >>> print bytesHeld()
+    0
+
+The budget can also be given in bytes, or with a suffix of ``K``, ``M``
+or ``G``, by the :envvar:`FIPY_CACHE_BUDGET` environment variable.
+"""
+__docformat__ = 'restructuredtext'
+
+__all__ = ["setBudget", "getBudget", "bytesHeld", "largest", "report"]
+
+import os
+import weakref
+
+from fipy.tools import numerix
+
+def _parseBytes(text):
+    """
+        >>> print _parseBytes("512M"), _parseBytes("1000")
+        536870912 1000
+    """
+    text = text.strip().upper().rstrip("B")
+    factor = 1
+    for suffix, power in (("K", 1), ("M", 2), ("G", 3)):
+        if text.endswith(suffix):
+            text = text[:-1]
+            factor = 1024**power
+    return int(float(text) * factor)
+
+class _VariableCache(object):
+    def __init__(self, budget=None):
+        # id(var) -> (weakref to var, bytes), least recently read first
+        from collections import OrderedDict
+        self.entries = OrderedDict()
+        self.held = 0
+        self.budget = budget
+        self.enabled = budget is not None
+
+    def setBudget(self, budget):
+        self.budget = budget
+        self.enabled = budget is not None
+        if self.enabled:
+            self._evict()
+        else:
+            self.entries.clear()
+            self.held = 0
+
+    def _forget(self, key):
+        ref, nbytes = self.entries.pop(key, (None, 0))
+        self.held -= nbytes
+
+    def _stored(self, var):
+        """`var` has just calculated and cached a new value."""
+        key = id(var)
+        self._forget(key)
+        value = var._value
+        if type(value) is type(numerix.array(1)) and value.shape != ():
+            ref = weakref.ref(var, lambda ref, key=key: self._forget(key))
+            self.entries[key] = (ref, value.nbytes)
+            self.held += value.nbytes
+            if self.held > self.budget:
+                self._evict(keep=key)
+
+    def _read(self, var):
+        """`var` has just returned its cached value."""
+        key = id(var)
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.entries[key] = entry
+
+    def _evict(self, keep=None):
+        for key in list(self.entries.keys()):
+            if self.held <= self.budget:
+                break
+            if key == keep:
+                continue
+            ref, nbytes = self.entries[key]
+            self._forget(key)
+            var = ref()
+            if var is not None:
+                var._evict()
+
+    def largest(self, n):
+        holders = []
+        for ref, nbytes in self.entries.values():
+            var = ref()
+            if var is not None:
+                holders.append((nbytes, var))
+        holders.sort(key=lambda holder: -holder[0])
+        return holders[:n]
+
+_budget = os.environ.get("FIPY_CACHE_BUDGET")
+if _budget is not None:
+    _budget = _parseBytes(_budget)
+_cache = _VariableCache(budget=_budget)
+del _budget
+
+def setBudget(budget):
+    """
+    Keep the values cached by derived `Variable` objects within `budget`
+    bytes, or stop counting them if `budget` is `None`.
+    """
+    _cache.setBudget(budget)
+
+def getBudget():
+    return _cache.budget
+
+def bytesHeld():
+    """
+    The number of bytes held by the cached values of derived `Variable`
+    objects, while a budget is set.
+    """
+    return _cache.held
+
+def largest(n=10):
+    """
+    Return the `n` derived `Variable` objects holding the most memory,
+    as a list of (bytes, `Variable`), largest first.
+    """
+    return _cache.largest(n)
+
+def report(n=10):
+    """
+    Describe the `n` derived `Variable` objects holding the most memory.
+    """
+    lines = ["%d bytes held of a budget of %s" % (_cache.held, _cache.budget)]
+    for nbytes, var in largest(n):
+        lines.append("%12d  %s %s %s" % (nbytes, var.__class__.__name__, var.name, var.shape))
+    return "\n".join(lines)
+
+def _test():
+    import fipy.tests.doctestPlus
+    return fipy.tests.doctestPlus.testmod()
+
+if __name__ == "__main__":
+    _test()
@@ -36,7 +36,7 @@
 import os
 
 from distutils.core import Command
-from fipy.tools.performance.efficiency_test import Efficiency_test
+from fipy.tools.performance.benchmark import Benchmark
 from fipy.tools.copy_script import Copy_script
 from fipy.tests.testClass import _TestClass
 
@@ -271,7 +271,7 @@ dist = setup(	name = "FiPy",
             'test':test,
             'unittest':unittest,
             'copy_script': Copy_script,
-            'efficiency_test': Efficiency_test
+            'benchmark': Benchmark
         },
         test_suite="fipy.testFiPy._suite",
         packages = find_packages(exclude=["examples", "examples.*", "utils", "utils.*"]),